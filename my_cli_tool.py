@@ -0,0 +1,5330 @@
+import os
+import sys
+
+_counters = None
+_counters_lock = None
+
+def _enable_counters():
+    """Turns on the per-command counters fed by _bump (off by default, so hot loops pay nothing)."""
+    global _counters, _counters_lock
+    import threading
+    _counters = {}
+    _counters_lock = threading.Lock()
+
+def _bump(name, n=1):
+    """Adds n to a named instrumentation counter, if counters are enabled."""
+    if _counters is None:
+        return
+    with _counters_lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def _take_counters():
+    """Returns the counters collected so far and resets them; None if counters are disabled."""
+    if _counters is None:
+        return None
+    with _counters_lock:
+        taken = dict(_counters)
+        _counters.clear()
+    return taken
+
+def _merge_counters(counters):
+    """Adds counters returned by a worker process to this process's counters."""
+    for name, n in (counters or {}).items():
+        _bump(name, n)
+
+OUTPUT_BUFFER_SIZE = 256 * 1024
+OUTPUT_FORMATS = ("plain", "nul", "ndjson")
+
+_failed_threads = set()
+
+def _mark_failed():
+    """Records that the command running in this thread reported an error; see run_command."""
+    import _thread
+    _failed_threads.add(_thread.get_ident())
+
+def _print_error(*args, **kwargs):
+    """Prints an error or usage message like print() and marks the running command as failed."""
+    _mark_failed()
+    print(*args, **kwargs)
+
+class _RecordWriter:
+    """Streams result records to stdout through one large buffer.
+
+    Each record is a dict rendered as a plain text line, as a NUL-terminated
+    field for 'xargs -0' and friends, or as one NDJSON object per line.
+    """
+
+    def __init__(self, fmt="plain", buffer_size=OUTPUT_BUFFER_SIZE):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'.")
+        self.fmt = fmt
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buf = bytearray()
+        self._out = None
+        self._dumps = None
+        if fmt == "ndjson":
+            import json
+            self._dumps = json.dumps
+
+    def __enter__(self):
+        sys.stdout.flush()
+        self._out = sys.stdout.buffer
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.flush()
+            except BrokenPipeError:
+                self._silence_stdout()
+        elif issubclass(exc_type, BrokenPipeError):
+            # The reader went away (e.g. '| head'): stop quietly, like coreutils.
+            self._buf.clear()
+            self._silence_stdout()
+            return True
+
+    def _append(self, text, terminator=b"\n"):
+        self._buf += text.encode("utf-8", "surrogateescape")
+        self._buf += terminator
+        if len(self._buf) >= self.buffer_size:
+            self.flush()
+
+    def header(self, text):
+        """Writes a line that only belongs in plain output."""
+        if self.fmt == "plain":
+            self._append(text)
+
+    def write(self, record, plain, nul=None):
+        """Writes one record; plain and nul render it as text for the respective format."""
+        if self.fmt == "ndjson":
+            self._append(self._dumps(record))
+        elif self.fmt == "nul":
+            self._append((nul or plain)(record), b"\0")
+        else:
+            self._append(plain(record))
+        self.count += 1
+
+    def error(self, message):
+        """Reports a per-record error without interleaving it into machine-readable output."""
+        _mark_failed()
+        if self.fmt == "plain":
+            self._append(message)
+        else:
+            self.flush()
+            print(message, file=sys.stderr)
+
+    def flush(self):
+        if self._buf:
+            self._out.write(self._buf)
+            self._buf.clear()
+        self._out.flush()
+
+    @staticmethod
+    def _silence_stdout():
+        # Point stdout at /dev/null so the interpreter's final flush does not raise again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        try:
+            os.dup2(devnull, sys.stdout.fileno())
+        except (OSError, ValueError):
+            pass
+        finally:
+            os.close(devnull)
+
+def _pop_output_format(args):
+    """Removes -0 / --ndjson from args and returns the selected output format."""
+    fmt = "plain"
+    if "-0" in args:
+        args.remove("-0")
+        fmt = "nul"
+    if "--ndjson" in args:
+        args.remove("--ndjson")
+        fmt = "ndjson"
+    return fmt
+
+def _entry_type(entry):
+    """Classifies a DirEntry as 'dir', 'file', 'symlink' or 'other' without following links."""
+    try:
+        if entry.is_symlink():
+            return "symlink"
+        if entry.is_dir(follow_symlinks=False):
+            return "dir"
+        if entry.is_file(follow_symlinks=False):
+            return "file"
+    except OSError:
+        pass
+    return "other"
+
+def _directory_records(entries):
+    """Yields a record for each DirEntry of an open scandir iterator, in directory order."""
+    for entry in entries:
+        yield {"name": entry.name, "path": entry.path, "type": _entry_type(entry)}
+
+def list_directory_contents(path, fmt="plain"):
+    """Lists the contents of a given directory."""
+    try:
+        with os.scandir(path) as entries, _RecordWriter(fmt) as out:
+            out.header(f"Contents of '{path}':")
+            for record in _directory_records(entries):
+                out.write(record, lambda r: f"- {r['name']}{'/' if r['type'] == 'dir' else ''}",
+                          lambda r: r["path"])
+    except FileNotFoundError:
+        _print_error(f"Error: Directory '{path}' not found.")
+    except NotADirectoryError:
+        _print_error(f"Error: '{path}' is not a directory.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def create_folder(path, folder_name):
+    """Creates a new folder at the specified path."""
+    new_folder_path = os.path.join(path, folder_name)
+    try:
+        os.makedirs(new_folder_path)
+        print(f"Folder '{folder_name}' created successfully at '{path}'.")
+    except FileExistsError:
+        _print_error(f"Error: Folder '{folder_name}' already exists at '{path}'.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def create_empty_file(path, file_name):
+    """Creates a new empty file at the specified path.
+
+    Neither the file nor its directory entry is fsynced; see write_batch.
+    """
+    new_file_path = os.path.join(path, file_name)
+    try:
+        with open(new_file_path, 'w') as f:
+            pass # Create an empty file
+        print(f"Empty file '{file_name}' created successfully at '{path}'.")
+    except FileExistsError:
+        _print_error(f"Error: File '{file_name}' already exists at '{path}'.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+RM_PROGRESS_INTERVAL = 0.5
+
+class _RemoveStats:
+    """Counters shared by the workers of a recursive delete; updated once per directory."""
+
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.errors = []
+
+    def add(self, files=0, dirs=0, size=0):
+        with self.lock:
+            self.files += files
+            self.dirs += dirs
+            self.bytes += size
+
+    def error(self, path, e):
+        with self.lock:
+            self.errors.append((path, e))
+
+def _rmtree_fd_supported():
+    """True where the dir_fd-relative calls used by remove_tree exist (the same test shutil.rmtree makes)."""
+    return ({os.open, os.stat, os.unlink, os.rmdir} <= os.supports_dir_fd
+            and os.scandir in os.supports_fd
+            and os.stat in os.supports_follow_symlinks)
+
+def _open_dir_nofollow(name, dir_fd, st):
+    """Opens a subdirectory relative to dir_fd, refusing it if it is no longer the directory st describes."""
+    fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+    if not os.path.samestat(st, os.fstat(fd)):
+        os.close(fd)
+        raise OSError("Cannot call rmtree on a symbolic link")
+    return fd
+
+def _scan_remove_dir(fd, path, stats, dry_run):
+    """Unlinks every non-directory entry of an open directory; returns its subdirectories as (name, stat)."""
+    import stat
+    files = size = 0
+    subdirs = []
+    with os.scandir(fd) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    if stat.S_ISDIR(st.st_mode):
+                        subdirs.append((entry.name, st))
+                        continue
+                if dry_run:
+                    size += entry.stat(follow_symlinks=False).st_size
+                else:
+                    os.unlink(entry.name, dir_fd=fd)
+                files += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                stats.error(os.path.join(path, entry.name), e)
+    stats.add(files=files, size=size)
+    return subdirs
+
+def _remove_subtree(parent_fd, name, st, path, stats, dry_run):
+    """Deletes one directory subtree relative to parent_fd, depth-first, holding one fd per level.
+
+    The walk keeps its own stack instead of recursing, so deep trees do not hit
+    the interpreter's recursion limit.
+    """
+    stack = []
+
+    def enter(parent_fd, name, st, path):
+        try:
+            fd = _open_dir_nofollow(name, parent_fd, st)
+        except OSError as e:
+            stats.error(path, e)
+            return
+        try:
+            subdirs = _scan_remove_dir(fd, path, stats, dry_run)
+        except OSError as e:
+            stats.error(path, e)
+            subdirs = []
+        stack.append((parent_fd, name, path, fd, iter(subdirs)))
+
+    enter(parent_fd, name, st, path)
+    try:
+        while stack:
+            parent_fd, name, path, fd, subdirs = stack[-1]
+            sub = next(subdirs, None)
+            if sub is not None:
+                enter(fd, sub[0], sub[1], os.path.join(path, sub[0]))
+                continue
+            stack.pop()
+            os.close(fd)
+            try:
+                if not dry_run:
+                    os.rmdir(name, dir_fd=parent_fd)
+                stats.add(dirs=1)
+            except OSError as e:
+                stats.error(path, e)
+    finally:
+        for frame in stack:
+            os.close(frame[3])
+
+def _print_remove_progress(stats, start, final=False):
+    """Shows a files/s progress line on stderr while deleting, if stderr is a terminal."""
+    import time
+    if not sys.stderr.isatty():
+        return
+    elapsed = time.monotonic() - start
+    rate = stats.files / elapsed if elapsed > 0 else 0
+    line = f"{stats.files} files, {stats.dirs} directories ({rate:.0f} files/s)"
+    print(f"\r{line}\033[K", end="\n" if final else "", file=sys.stderr, flush=True)
+
+def remove_tree(path, jobs=None, dry_run=False):
+    """Recursively deletes a directory tree, removing sibling subtrees in parallel.
+
+    All operations are relative to directory file descriptors, and like
+    shutil.rmtree, symlinks are unlinked, never followed, and a directory that
+    is swapped for a symlink during the walk is refused. The top of the tree is
+    expanded breadth-first until there are enough subtrees to keep the workers
+    busy; each subtree is then deleted depth-first on the thread pool. With
+    dry_run nothing is removed and only counts and sizes are collected.
+    Returns the _RemoveStats.
+    """
+    import concurrent.futures
+    import stat
+    import time
+    jobs = jobs or _default_jobs()
+    stats = _RemoveStats()
+    start = time.monotonic()
+    root_st = os.lstat(path)
+    if stat.S_ISLNK(root_st.st_mode):
+        raise OSError("Cannot call rmtree on a symbolic link")
+    abs_path = os.path.abspath(path)
+    top_fd = os.open(os.path.dirname(abs_path), os.O_RDONLY | os.O_DIRECTORY)
+    expanded = []
+    try:
+        frontier = [(top_fd, os.path.basename(abs_path), root_st, path)]
+        while frontier and len(frontier) < jobs * 2 and len(expanded) < jobs * 4:
+            next_level = []
+            for parent_fd, name, st, dir_path in frontier:
+                try:
+                    fd = _open_dir_nofollow(name, parent_fd, st)
+                except OSError as e:
+                    if dir_path == path:
+                        raise
+                    stats.error(dir_path, e)
+                    continue
+                expanded.append((parent_fd, name, fd, dir_path))
+                for sub_name, sub_st in _scan_remove_dir(fd, dir_path, stats, dry_run):
+                    next_level.append((fd, sub_name, sub_st, os.path.join(dir_path, sub_name)))
+            frontier = next_level
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            pending = {executor.submit(_remove_subtree, *item, stats, dry_run) for item in frontier}
+            while pending:
+                _, pending = concurrent.futures.wait(pending, timeout=RM_PROGRESS_INTERVAL)
+                _print_remove_progress(stats, start)
+    finally:
+        for parent_fd, name, fd, dir_path in reversed(expanded):
+            os.close(fd)
+            try:
+                if not dry_run:
+                    os.rmdir(name, dir_fd=parent_fd)
+                stats.add(dirs=1)
+            except OSError as e:
+                stats.error(dir_path, e)
+        os.close(top_fd)
+    _print_remove_progress(stats, start, final=True)
+    return stats
+
+def delete_item(path, recursive=False, jobs=None, dry_run=False):
+    """Deletes a file or a directory. Can delete non-empty directories if recursive is True."""
+    import shutil
+    import time
+    try:
+        if os.path.islink(path) and recursive and os.path.isdir(path):
+            _print_error(f"Error deleting '{path}': Cannot call rmtree on a symbolic link.")
+        elif dry_run:
+            if os.path.isdir(path) and not os.path.islink(path):
+                if recursive:
+                    stats = remove_tree(path, jobs, dry_run=True)
+                    print(f"Would delete '{path}': {stats.files} files, {stats.dirs} directories, {stats.bytes} bytes.")
+                else:
+                    with os.scandir(path) as it:
+                        empty = next(it, None) is None
+                    if empty:
+                        print(f"Would delete empty directory '{path}'.")
+                    else:
+                        _print_error(f"Error: '{path}' is not empty and would not be deleted; use -r for recursive deletion.")
+            else:
+                print(f"Would delete '{path}': 1 file, {os.lstat(path).st_size} bytes.")
+        elif os.path.isfile(path):
+            os.remove(path)
+            print(f"File '{path}' deleted successfully.")
+        elif os.path.isdir(path):
+            if recursive and _rmtree_fd_supported():
+                start = time.monotonic()
+                stats = remove_tree(path, jobs)
+                for error_path, e in stats.errors:
+                    _print_error(f"Error deleting '{error_path}': {e}")
+                elapsed = time.monotonic() - start
+                rate = stats.files / elapsed if elapsed > 0 else 0
+                summary = f"{stats.files} files, {stats.dirs} directories in {elapsed:.2f}s ({rate:.0f} files/s)"
+                if stats.errors:
+                    print(f"Directory '{path}' partially deleted: {summary}, {len(stats.errors)} errors.")
+                else:
+                    print(f"Directory '{path}' and its contents deleted successfully (recursively): {summary}.")
+            elif recursive:
+                shutil.rmtree(path)
+                print(f"Directory '{path}' and its contents deleted successfully (recursively).")
+            else:
+                os.rmdir(path)
+                print(f"Empty directory '{path}' deleted successfully.")
+        else:
+            _print_error(f"Error: '{path}' is neither a file nor a directory.")
+    except FileNotFoundError:
+        _print_error(f"Error: '{path}' not found.")
+    except OSError as e:
+        _print_error(f"Error deleting '{path}': {e}. Make sure the directory is empty or use -r for recursive deletion.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def rename_item(old_path, new_path):
+    """Renames or moves a file or directory."""
+    try:
+        os.rename(old_path, new_path)
+        print(f"'{old_path}' successfully renamed/moved to '{new_path}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: '{old_path}' not found.")
+    except FileExistsError:
+        _print_error(f"Error: '{new_path}' already exists.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+CAT_BUFFER_SIZE = 1024 * 1024
+LINE_INDEX_BLOCK_SIZE = 1024 * 1024
+
+def _user_cache_path(*parts):
+    """Returns a path under the per-user cache directory ($XDG_CACHE_HOME/my_cli_tool)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "my_cli_tool", *parts)
+
+def _send_to_stdout(fd, offset, length):
+    """Copies a byte range of fd to stdout, zero-copy with os.sendfile when stdout is a real descriptor."""
+    end = offset + length
+    sys.stdout.flush()
+    try:
+        out_fd = sys.stdout.fileno()
+        while offset < end:
+            sent = os.sendfile(out_fd, fd, offset, min(end - offset, 1 << 30))
+            if sent == 0:
+                return
+            offset += sent
+        return
+    except (AttributeError, OSError, ValueError):
+        # No descriptor (captured output) or a target sendfile refuses; copy the rest by hand.
+        pass
+    out = sys.stdout.buffer
+    while offset < end:
+        data = os.pread(fd, min(CAT_BUFFER_SIZE, end - offset), offset)
+        if not data:
+            break
+        out.write(data)
+        offset += len(data)
+    out.flush()
+
+def _line_start(fd, line, offset=0, newlines=0):
+    """Returns the byte offset at which a 1-based line starts, or the file size if there are fewer lines.
+
+    Scanning starts at offset, which must have exactly `newlines` newlines
+    before it, fewer than line - 1.
+    """
+    if line <= 1:
+        return 0
+    needed = line - 1 - newlines
+    while True:
+        block = os.pread(fd, LINE_INDEX_BLOCK_SIZE, offset)
+        if not block:
+            return offset
+        count = block.count(b"\n")
+        if count >= needed:
+            pos = -1
+            for _ in range(needed):
+                pos = block.find(b"\n", pos + 1)
+            return offset + pos + 1
+        needed -= count
+        offset += len(block)
+
+def _line_index_probe(fd, size):
+    """Fingerprints the head of a file and the bytes just before size, to detect rewrites behind an append."""
+    import hashlib
+    return hashlib.sha1(os.pread(fd, 4096, 0) + os.pread(fd, 4096, max(0, size - 4096))).hexdigest()
+
+def _load_line_index(path, fd, st):
+    """Returns cumulative newline counts per LINE_INDEX_BLOCK_SIZE block of a file, from a cache if possible.
+
+    counts[i] is the number of newlines before offset i * LINE_INDEX_BLOCK_SIZE.
+    A cached index for the same inode is extended rather than rebuilt when the
+    file has only grown and its already indexed bytes still look the same, so
+    slicing a live log stays cheap.
+    """
+    import hashlib
+    import json
+    cache_path = _user_cache_path("lines", hashlib.sha1(os.fsencode(os.path.abspath(path))).hexdigest() + ".json")
+    counts = []
+    try:
+        with open(cache_path, "rb") as f:
+            cached = json.load(f)
+        if cached.get("version") == 1 and cached["block_size"] == LINE_INDEX_BLOCK_SIZE and cached["ino"] == st.st_ino:
+            if cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                return cached["counts"]
+            if cached["size"] <= st.st_size and cached["probe"] == _line_index_probe(fd, cached["size"]):
+                counts = cached["counts"][:cached["size"] // LINE_INDEX_BLOCK_SIZE + 1]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    offset = (len(counts) - 1) * LINE_INDEX_BLOCK_SIZE if counts else 0
+    total = counts.pop() if counts else 0
+    while True:
+        counts.append(total)
+        block = os.pread(fd, LINE_INDEX_BLOCK_SIZE, offset)
+        total += block.count(b"\n")
+        offset += len(block)
+        if len(block) < LINE_INDEX_BLOCK_SIZE or offset >= st.st_size:
+            break
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    _atomic_write(cache_path, json.dumps({
+        "version": 1, "block_size": LINE_INDEX_BLOCK_SIZE, "ino": st.st_ino,
+        "size": st.st_size, "mtime_ns": st.st_mtime_ns, "probe": _line_index_probe(fd, st.st_size),
+        "counts": counts,
+    }).encode())
+    return counts
+
+def _parse_line_range(spec):
+    """Parses 'a:b' (1-based, inclusive; either side may be empty) into (first, last or None)."""
+    first, sep, last = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Invalid line range '{spec}', expected <first>:<last>.")
+    first = int(first) if first else 1
+    last = int(last) if last else None
+    if first < 1 or (last is not None and last < first):
+        raise ValueError(f"Invalid line range '{spec}'.")
+    return first, last
+
+def display_file_content(path, offset=0, length=None, lines=None, use_index=False):
+    """Displays the content of a given file, or a byte or line range of it.
+
+    The file is streamed as bytes, so binary data and files larger than
+    memory are fine. lines is a (first, last) pair of 1-based inclusive line
+    numbers; with use_index, line positions come from a cached per-file index.
+    """
+    import bisect
+    try:
+        with open(path, 'rb') as f:
+            fd = f.fileno()
+            st = os.fstat(fd)
+            if lines:
+                first, last = lines
+                counts = _load_line_index(path, fd, st) if use_index else [0]
+                i = bisect.bisect_left(counts, first - 1) - 1
+                start = _line_start(fd, first, i * LINE_INDEX_BLOCK_SIZE, counts[i]) if i >= 0 else 0
+                if last is None:
+                    end = st.st_size
+                else:
+                    j = bisect.bisect_left(counts, last) - 1
+                    if j * LINE_INDEX_BLOCK_SIZE > start:
+                        end = _line_start(fd, last + 1, j * LINE_INDEX_BLOCK_SIZE, counts[j])
+                    else:
+                        end = _line_start(fd, last + 1, start, first - 1)
+            else:
+                start = min(offset, st.st_size)
+                end = st.st_size if length is None else min(st.st_size, start + length)
+            if sys.stdout.isatty():
+                print(f"Content of '{path}':")
+            _send_to_stdout(fd, start, end - start)
+    except FileNotFoundError:
+        _print_error(f"Error: File '{path}' not found.")
+    except IsADirectoryError:
+        _print_error(f"Error: '{path}' is a directory, not a file.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+INDEX_MAGIC = b"MCLIIDX2"
+
+def _compile_name_matcher(search_term, mode="substring"):
+    """Returns a predicate for file names: plain substring, shell glob or regular expression."""
+    import fnmatch
+    import re
+    if mode == "glob":
+        return re.compile(fnmatch.translate(search_term)).match
+    if mode == "regex":
+        return re.compile(search_term).search
+    return lambda name: search_term in name
+
+def _scan_index_dir(root, rel_dir):
+    """Lists one directory for the filename index, returning (mtime_ns, file_names, subdir_names)."""
+    path = os.path.join(root, rel_dir) if rel_dir else root
+    files = []
+    subdirs = []
+    with os.scandir(path) as entries:
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.name)
+                else:
+                    files.append(e.name)
+            except OSError:
+                continue
+    return os.stat(path).st_mtime_ns, files, subdirs
+
+def _write_index(index_path, root, dirs):
+    """Writes the filename index. dirs maps a relative directory to (mtime_ns, file_names, subdir_names).
+
+    The body is every file name terminated by NUL, grouped by directory; the
+    header lists each directory with the offset and count of its names, so a
+    search can run over the raw bytes and only the hits need decoding. Names
+    are stored whole rather than prefix-compressed: decoding front-coded
+    blocks record by record in Python cost more than a plain directory walk.
+    """
+    import json
+    import struct
+    body = bytearray()
+    entries = []
+    count = 0
+    for rel_dir in sorted(dirs):
+        mtime_ns, files, _ = dirs[rel_dir]
+        names = sorted(os.fsencode(name) for name in files)
+        entries.append([rel_dir, mtime_ns, len(body), len(names)])
+        for name in names:
+            body += name + b"\0"
+        count += len(names)
+    header = json.dumps({"root": root, "count": count, "dirs": entries}).encode()
+    _atomic_write(index_path, INDEX_MAGIC + struct.pack("<I", len(header)) + header + body)
+    return count
+
+def _read_index(index_path):
+    """Reads a filename index, returning (header, names) with names the NUL-terminated name records."""
+    import json
+    import struct
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    if data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+        raise ValueError(f"'{index_path}' is not a filename index (rebuild it with 'index build')")
+    pos = len(INDEX_MAGIC)
+    (header_len,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    header = json.loads(data[pos:pos + header_len])
+    return header, data[pos + header_len:]
+
+def _index_dirs(header, names):
+    """Rebuilds the per-directory listing of an index, as used by _write_index."""
+    dirs = {}
+    for rel_dir, mtime_ns, offset, count in header["dirs"]:
+        records = names[offset:].split(b"\0", count)[:count] if count else []
+        dirs[rel_dir] = (mtime_ns, [os.fsdecode(n) for n in records], [])
+    for rel_dir in dirs:
+        if rel_dir:
+            parent, name = os.path.split(rel_dir)
+            if parent in dirs:
+                dirs[parent][2].append(name)
+    return dirs
+
+def build_index(directory, index_path, file=None):
+    """Builds an on-disk filename index for a directory tree, reporting the result to file (default stdout)."""
+    try:
+        root = os.path.abspath(directory)
+        if not os.path.isdir(root):
+            _print_error(f"Error: Directory '{directory}' not found.")
+            return
+        dirs = {}
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            try:
+                dirs[rel_dir] = _scan_index_dir(root, rel_dir)
+            except OSError:
+                continue
+            pending.extend(os.path.join(rel_dir, name) if rel_dir else name for name in dirs[rel_dir][2])
+        count = _write_index(index_path, root, dirs)
+        print(f"Indexed {count} files in {len(dirs)} directories of '{root}' into '{index_path}'.", file=file or sys.stdout)
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def update_index(index_path):
+    """Refreshes a filename index, rescanning only directories whose mtime changed."""
+    try:
+        header, names = _read_index(index_path)
+        root = header["root"]
+        old_dirs = _index_dirs(header, names)
+        dirs = {}
+        rescanned = 0
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            path = os.path.join(root, rel_dir) if rel_dir else root
+            try:
+                old = old_dirs.get(rel_dir)
+                if old is not None and os.stat(path).st_mtime_ns == old[0]:
+                    dirs[rel_dir] = old
+                else:
+                    dirs[rel_dir] = _scan_index_dir(root, rel_dir)
+                    rescanned += 1
+            except OSError:
+                continue
+            pending.extend(os.path.join(rel_dir, name) if rel_dir else name for name in dirs[rel_dir][2])
+        count = _write_index(index_path, root, dirs)
+        print(f"Updated '{index_path}': {count} files, {rescanned} of {len(dirs)} directories rescanned.")
+    except FileNotFoundError:
+        _print_error(f"Error: Index '{index_path}' not found.")
+    except ValueError as e:
+        _print_error(f"Error: {e}")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _iter_index_hits(directory, index, search_term, mode, matches):
+    """Yields the paths of index records whose name matches.
+
+    Substring searches run bytes.find over the raw records and decode only the
+    hits; glob and regex searches decode the whole name table in one call and
+    filter it without a per-record Python loop.
+    """
+    import bisect
+    import itertools
+    header, names = index
+    dirs = header["dirs"]
+    prefixes = [os.path.join(directory, rel_dir, "") for rel_dir, _, _, _ in dirs]
+    if mode == "substring" and search_term:
+        offsets = [offset for _, _, offset, _ in dirs]
+        term = os.fsencode(search_term)
+        pos = 0
+        while True:
+            hit = names.find(term, pos)
+            if hit < 0:
+                return
+            start = names.rfind(b"\0", 0, hit) + 1
+            end = names.find(b"\0", hit)
+            if end < 0:
+                return
+            name = os.fsdecode(names[start:end])
+            if matches(name):
+                yield prefixes[bisect.bisect_right(offsets, start) - 1] + name
+            pos = end + 1
+    table = os.fsdecode(names).split("\0")
+    first = 0
+    for prefix, (_, _, _, count) in zip(prefixes, dirs):
+        group = table[first:first + count]
+        first += count
+        yield from map(prefix.__add__, itertools.compress(group, map(matches, group)))
+
+def _iter_found_files(directory, matches, index=None, search_term=None, mode="substring"):
+    """Yields the paths of files whose name matches, from an index or a live walk."""
+    if index is not None:
+        yield from _iter_index_hits(directory, index, search_term, mode, matches)
+        return
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if matches(file):
+                yield os.path.join(root, file)
+
+def find_files(directory, search_term, mode="substring", index_path=None, fmt="plain"):
+    """Recursively searches for files by name within a given directory, optionally through a filename index."""
+    import re
+    try:
+        matches = _compile_name_matcher(search_term, mode)
+        index = None
+        if index_path:
+            if not os.path.exists(index_path):
+                # Keep stdout for the search results; -0 and --ndjson output must stay parseable.
+                build_index(directory, index_path, file=sys.stderr)
+            index = _read_index(index_path)
+            root = index[0]["root"]
+            if os.path.abspath(directory) != root:
+                _print_error(f"Error: Index '{index_path}' covers '{root}', not '{directory}'.")
+                return
+        elif not os.path.isdir(directory):
+            raise FileNotFoundError(directory)
+        with _RecordWriter(fmt) as out:
+            for path in _iter_found_files(directory, matches, index, search_term, mode):
+                if out.count == 0:
+                    out.header(f"Found files matching '{search_term}' in '{directory}':")
+                out.write({"path": path}, lambda r: f"- {r['path']}", lambda r: r["path"])
+            if out.count == 0:
+                out.header(f"No files matching '{search_term}' found in '{directory}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Directory '{directory}' not found.")
+    except re.error as e:
+        _print_error(f"Error: Invalid pattern '{search_term}': {e}")
+    except ValueError as e:
+        _print_error(f"Error: {e}")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def copy_item(source_path, destination_path):
+    """Copies a file or a directory."""
+    import shutil
+    try:
+        if os.path.isfile(source_path):
+            shutil.copy2(source_path, destination_path)
+            print(f"File '{source_path}' copied to '{destination_path}'.")
+        elif os.path.isdir(source_path):
+            shutil.copytree(source_path, destination_path)
+            print(f"Directory '{source_path}' copied to '{destination_path}'.")
+        else:
+            _print_error(f"Error: '{source_path}' is neither a file nor a directory.")
+    except FileNotFoundError:
+        _print_error(f"Error: Source '{source_path}' not found.")
+    except FileExistsError:
+        _print_error(f"Error: Destination '{destination_path}' already exists. Cannot copy to an existing directory.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+def _copy_range(src_fd, dst_fd, offset, count):
+    """Copies count bytes starting at offset between two file descriptors, using kernel copy paths when available."""
+    end = offset + count
+    while offset < end:
+        n = min(COPY_CHUNK_SIZE, end - offset)
+        try:
+            copied = os.copy_file_range(src_fd, dst_fd, n, offset, offset)
+        except (AttributeError, OSError):
+            try:
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+                copied = os.sendfile(dst_fd, src_fd, offset, n)
+            except (AttributeError, OSError):
+                data = os.pread(src_fd, n, offset)
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+                copied = os.write(dst_fd, data)
+        if copied == 0:
+            break
+        offset += copied
+
+SYNC_PART_PATTERN = r"\.(.+)\.\d+-\d+\.part"
+
+def _sync_part_name(name, st):
+    """Name of the partial file for a copy of a file with stat result st."""
+    return f".{name}.{st.st_size}-{st.st_mtime_ns}.part"
+
+def _remove_stale_parts(dir_path, parts, source_names):
+    """Deletes partial files left in a destination directory by an older version of a synced file.
+
+    parts maps the name of every regular source file in the directory to the
+    partial file a pending copy would resume (None if the file is up to date).
+    Only partial files of those source files are touched, never one that is
+    itself a source entry or belongs to a name the sync does not know about.
+    """
+    import re
+    pattern = re.compile(SYNC_PART_PATTERN)
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            m = pattern.fullmatch(entry.name)
+            if (m is None or entry.name in source_names or m.group(1) not in parts
+                    or parts[m.group(1)] == entry.name):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+def _sync_file(src_path, dst_path, st):
+    """Copies one file into place through a resumable partial file, then applies its metadata.
+
+    The partial file name encodes the source size and mtime, so after an
+    interrupt the copy continues where it stopped as long as the source is unchanged;
+    partial files left by an older version of the source are removed by sync_tree.
+    """
+    import shutil
+    part_path = os.path.join(os.path.dirname(dst_path), _sync_part_name(os.path.basename(dst_path), st))
+    with open(src_path, 'rb') as src:
+        flags = os.O_WRONLY | os.O_CREAT
+        dst_fd = os.open(part_path, flags, 0o600)
+        try:
+            done = os.fstat(dst_fd).st_size
+            if done > st.st_size:
+                done = 0
+            _copy_range(src.fileno(), dst_fd, done, st.st_size - done)
+            os.ftruncate(dst_fd, st.st_size)
+        finally:
+            os.close(dst_fd)
+    shutil.copystat(src_path, part_path)
+    os.replace(part_path, dst_path)
+    return st.st_size - done
+
+def sync_tree(source_path, destination_path, jobs=None):
+    """Copies a directory tree incrementally: only files whose size or mtime differ are copied.
+
+    Files are copied concurrently; files that only exist in the destination are left alone.
+    An entry or a directory that cannot be read is reported and skipped.
+    """
+    import concurrent.futures
+    import shutil
+    try:
+        if not os.path.isdir(source_path):
+            _print_error(f"Error: Source directory '{source_path}' not found.")
+            return
+        source_path = os.path.abspath(source_path)
+        destination_path = os.path.abspath(destination_path)
+        to_copy = []
+        dirs = [source_path]
+        skipped = 0
+        errors = 0
+        os.makedirs(destination_path, exist_ok=True)
+        stack = [source_path]
+        while stack:
+            dir_path = stack.pop()
+            target_dir = os.path.join(destination_path, os.path.relpath(dir_path, source_path))
+            parts = {}
+            source_names = set()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        source_names.add(entry.name)
+                        target = os.path.join(target_dir, entry.name)
+                        try:
+                            if entry.is_symlink():
+                                link = os.readlink(entry.path)
+                                if not os.path.islink(target) or os.readlink(target) != link:
+                                    if os.path.lexists(target):
+                                        os.unlink(target)
+                                    os.symlink(link, target)
+                            elif entry.is_dir():
+                                os.makedirs(target, exist_ok=True)
+                                dirs.append(entry.path)
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                parts[entry.name] = None
+                                try:
+                                    dst_st = os.stat(target, follow_symlinks=False)
+                                    if dst_st.st_size == st.st_size and dst_st.st_mtime_ns == st.st_mtime_ns:
+                                        skipped += 1
+                                        continue
+                                except FileNotFoundError:
+                                    pass
+                                parts[entry.name] = _sync_part_name(entry.name, st)
+                                to_copy.append((entry.path, target, st))
+                        except OSError as e:
+                            errors += 1
+                            _print_error(f"Error syncing '{entry.path}': {e}")
+                _remove_stale_parts(target_dir, parts, source_names)
+            except OSError as e:
+                errors += 1
+                _print_error(f"Error reading directory '{dir_path}': {e}")
+
+        copied_bytes = 0
+        copy_errors = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or _default_jobs()) as executor:
+            futures = {executor.submit(_sync_file, *item): item[0] for item in to_copy}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    copied_bytes += future.result()
+                except OSError as e:
+                    copy_errors += 1
+                    _print_error(f"Error copying '{futures[future]}': {e}")
+        # Directory mtimes are applied last, deepest first, since creating entries changes them.
+        for dir_path in reversed(dirs):
+            try:
+                shutil.copystat(dir_path, os.path.join(destination_path, os.path.relpath(dir_path, source_path)))
+            except OSError as e:
+                _print_error(f"Error copying metadata of '{dir_path}': {e}")
+        print(f"Synced '{source_path}' to '{destination_path}': {len(to_copy) - copy_errors} files copied "
+              f"({copied_bytes} bytes), {skipped} unchanged, {errors + copy_errors} errors.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def edit_file_content(path, content, append=False):
+    """Writes content to a file. Overwrites by default, appends if append is True.
+
+    The data is handed to the OS but not fsynced, so a crash or power loss
+    shortly afterwards can lose it; use write_batch with fsync for durability.
+    """
+    mode = 'a' if append else 'w'
+    try:
+        with open(path, mode) as f:
+            f.write(content + '\n')
+        print(f"Content written to '{path}' (mode: {'append' if append else 'overwrite'}).")
+    except FileNotFoundError:
+        _print_error(f"Error: File '{path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+WRITE_BUFFER_SIZE = 64 * 1024
+WRITE_MAX_OPEN = 128
+FSYNC_MODES = ("none", "batch", "each")
+GROUP_COMMIT_INTERVAL = 1.0
+
+class _GroupCommitWriter:
+    """Buffered appends to many files through a bounded LRU cache of open handles.
+
+    fsync selects the durability: "none" leaves data to the OS page cache,
+    "batch" flushes and fsyncs every file written since the last commit()
+    (a group commit), and "each" makes every write durable before the next.
+    Directories that gained a file are fsynced as well, so the new entry
+    survives a crash. Files are tracked by their real path, so "a", "./a" and
+    a symlink to it share one handle and one position in the write order.
+    """
+
+    def __init__(self, fsync="batch", max_open=WRITE_MAX_OPEN):
+        import collections
+        self.fsync = fsync
+        self.max_open = max_open
+        self.handles = collections.OrderedDict()
+        self.dirty = set()
+        self.closed_dirty = set()
+        self.new_dirs = set()
+        self.commits = 0
+
+    def _sync(self, f):
+        f.flush()
+        if self.fsync != "none":
+            getattr(os, "fdatasync", os.fsync)(f.fileno())
+
+    def _sync_dirs(self):
+        if self.fsync != "none":
+            for directory in self.new_dirs:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.new_dirs.clear()
+
+    def _handle(self, path):
+        f = self.handles.get(path)
+        if f is not None:
+            self.handles.move_to_end(path)
+            return f
+        if len(self.handles) >= self.max_open:
+            old_path, old = self.handles.popitem(last=False)
+            old.close()
+            if old_path in self.dirty:
+                # Evicted files are fsynced by path at the next commit, not now.
+                self.dirty.discard(old_path)
+                self.closed_dirty.add(old_path)
+        existed = os.path.exists(path)
+        f = open(path, 'ab', buffering=WRITE_BUFFER_SIZE)
+        if not existed:
+            self.new_dirs.add(os.path.dirname(os.path.abspath(path)))
+        self.handles[path] = f
+        return f
+
+    def append(self, path, data, truncate=False):
+        path = os.path.realpath(path)
+        f = self._handle(path)
+        if truncate:
+            f.flush()
+            os.ftruncate(f.fileno(), 0)
+        f.write(data)
+        self.dirty.add(path)
+        if self.fsync == "each":
+            self.commit()
+
+    def touch(self, path):
+        """Creates (or truncates) a file, like create_empty_file."""
+        path = os.path.realpath(path)
+        existed = os.path.exists(path)
+        f = self.handles.get(path)
+        if f is not None:
+            f.flush()
+            os.ftruncate(f.fileno(), 0)
+            self.dirty.add(path)
+        else:
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666))
+        if not existed:
+            self.new_dirs.add(os.path.dirname(os.path.abspath(path)))
+        if self.fsync == "each":
+            self.commit()
+
+    def commit(self):
+        """Flushes every file written since the last commit and, unless fsync is "none", makes it durable."""
+        for path in self.dirty:
+            self._sync(self.handles[path])
+        self.dirty.clear()
+        if self.fsync != "none":
+            for path in self.closed_dirty:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.closed_dirty.clear()
+        self._sync_dirs()
+        self.commits += 1
+
+    def close(self):
+        self.commit()
+        for f in self.handles.values():
+            f.close()
+        self.handles.clear()
+
+def _iter_stdin_lines(interval):
+    """Yields non-empty lines from stdin, or None whenever interval seconds pass without input."""
+    import select
+    fd = sys.stdin.fileno()
+    pending = b""
+    while True:
+        try:
+            ready, _, _ = select.select([fd], [], [], interval)
+        except (OSError, ValueError):
+            ready = [fd]
+        if not ready:
+            yield None
+            continue
+        data = os.read(fd, 1024 * 1024)
+        if not data:
+            break
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+def write_batch(kind="echo", fsync="batch", interval=GROUP_COMMIT_INTERVAL, max_open=WRITE_MAX_OPEN):
+    """Applies a stream of echo or touch records from stdin with buffered, group-committed writes.
+
+    echo records are {"path": ..., "content": ..., "append": true}; content is
+    written with a trailing newline and append defaults to true. touch records
+    are {"path": <directory>, "name": ...} or {"path": <file>}. With
+    fsync="batch", a group commit happens every interval seconds, also while
+    stdin is idle, and at the end of the stream.
+    """
+    import json
+    import time
+    writer = _GroupCommitWriter(fsync, max_open)
+    records = 0
+    errors = 0
+    written = 0
+    next_commit = time.monotonic() + interval
+    try:
+        for line in _iter_stdin_lines(interval):
+            if line is not None:
+                try:
+                    record = json.loads(line)
+                    path = record["path"]
+                    if kind == "touch":
+                        writer.touch(os.path.join(path, record["name"]) if "name" in record else path)
+                    else:
+                        data = (str(record["content"]) + "\n").encode()
+                        writer.append(path, data, truncate=not record.get("append", True))
+                        written += len(data)
+                    records += 1
+                except OSError as e:
+                    errors += 1
+                    _print_error(f"Error: {e}")
+                except (ValueError, KeyError, TypeError):
+                    errors += 1
+                    _print_error(f"Error: Invalid record: {line.decode('utf-8', 'replace')}")
+            if fsync != "each" and time.monotonic() >= next_commit:
+                writer.commit()
+                next_commit = time.monotonic() + interval
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+    summary = f"{records} records" + (f" ({written} bytes)" if kind == "echo" else "")
+    print(f"Applied {summary}, {writer.commits} commits (fsync={fsync})" + (f", {errors} errors." if errors else "."))
+
+_MODE_WHO_BITS = {"u": 0o4700, "g": 0o2070, "o": 0o1007}
+_MODE_PERM_BITS = {"r": 0o444, "w": 0o222, "x": 0o111, "s": 0o6000, "t": 0o1000}
+
+def _parse_mode(spec):
+    """Parses an octal or symbolic (u+rwX,go-w,o=g) mode; returns a function (mode, is_dir) -> new mode.
+
+    As with chmod(1), X means execute only for directories and for files that
+    already have an execute bit. A missing who means 'a' (the umask is not applied).
+    """
+    import re
+    if re.fullmatch(r"[0-7]{1,4}", spec):
+        value = int(spec, 8)
+        return lambda mode, is_dir: value
+    clauses = []
+    for clause in spec.split(","):
+        m = re.fullmatch(r"([ugoa]*)((?:[-+=](?:[ugo]|[rwxXst]*))+)", clause)
+        if not m:
+            raise ValueError(f"Invalid mode '{spec}'.")
+        who = m.group(1).replace("a", "ugo") or "ugo"
+        who_mask = 0
+        for w in set(who):
+            who_mask |= _MODE_WHO_BITS[w]
+        clauses.append((who_mask, re.findall(r"([-+=])([ugo]|[rwxXst]*)", m.group(2))))
+
+    def apply(mode, is_dir):
+        for who_mask, actions in clauses:
+            for op, perms in actions:
+                if perms in _MODE_WHO_BITS:
+                    shift = {"u": 6, "g": 3, "o": 0}[perms]
+                    bits = ((mode >> shift) & 0o7) * 0o111
+                else:
+                    bits = 0
+                    for p in perms:
+                        if p == "X":
+                            if is_dir or mode & 0o111:
+                                bits |= 0o111
+                        else:
+                            bits |= _MODE_PERM_BITS[p]
+                bits &= who_mask
+                if op == "+":
+                    mode |= bits
+                elif op == "-":
+                    mode &= ~bits
+                elif is_dir and "s" not in perms:
+                    # Like chmod(1), '=' keeps a directory's setuid/setgid bits unless 's' is given.
+                    mode = (mode & ~(who_mask & ~0o6000)) | bits
+                else:
+                    mode = (mode & ~who_mask) | bits
+        return mode
+    return apply
+
+def _chmod_scan_dir(item, file_mode, dir_mode):
+    """Applies modes to the entries of one directory through its file descriptor.
+
+    item is (path, st) of the directory as seen by its parent; the directory is
+    opened with O_NOFOLLOW and must still be that inode. Returns
+    ((changed, skipped, errors), subdirectory items).
+    """
+    import stat
+    path, dir_st = item
+    changed = 0
+    skipped = 0
+    errors = []
+    subdirs = []
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW)
+    except OSError as e:
+        return (0, 0, [(path, e)]), []
+    try:
+        if not os.path.samestat(dir_st, os.fstat(fd)):
+            return (0, 0, [(path, OSError("directory was replaced during the walk"))]), []
+        with os.scandir(fd) as it:
+            for entry in it:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    if stat.S_ISLNK(st.st_mode):
+                        continue
+                    is_dir = stat.S_ISDIR(st.st_mode)
+                    mode_fn = dir_mode if is_dir else file_mode
+                    if mode_fn is not None:
+                        old = stat.S_IMODE(st.st_mode)
+                        new = mode_fn(old, is_dir)
+                        if new == old:
+                            skipped += 1
+                        else:
+                            os.chmod(entry.name, new, dir_fd=fd)
+                            changed += 1
+                    if is_dir:
+                        subdirs.append((os.path.join(path, entry.name), st))
+                except OSError as e:
+                    errors.append((os.path.join(path, entry.name), e))
+    except OSError as e:
+        errors.append((path, e))
+    finally:
+        os.close(fd)
+    return (changed, skipped, errors), subdirs
+
+def change_permissions(path, mode_str, recursive=False, file_mode_str=None, dir_mode_str=None, jobs=None):
+    """Changes the permissions of a file or directory, or with recursive of a whole tree.
+
+    Modes are octal or symbolic; file_mode_str and dir_mode_str override
+    mode_str for files and directories. Entries that already have the target
+    mode are not touched. The recursive walk uses scandir and dir_fd-relative
+    chmod per directory, with directories spread over a thread pool.
+    """
+    import stat
+    try:
+        mode_fn = _parse_mode(mode_str) if mode_str else None
+        file_mode = _parse_mode(file_mode_str) if file_mode_str else mode_fn
+        dir_mode = _parse_mode(dir_mode_str) if dir_mode_str else mode_fn
+        st = os.stat(path)
+        is_dir = stat.S_ISDIR(st.st_mode)
+        target_fn = dir_mode if is_dir else file_mode
+        old = stat.S_IMODE(st.st_mode)
+        new = target_fn(old, is_dir) if target_fn else old
+        if new != old:
+            os.chmod(path, new)
+        if not recursive:
+            if new == old:
+                print(f"Permissions of '{path}' already {oct(new)[2:]}.")
+            else:
+                print(f"Permissions of '{path}' changed to {mode_str or oct(new)[2:]}.")
+            return
+        changed, skipped = (1, 0) if new != old else (0, 1)
+        errors = []
+        if is_dir and not os.path.islink(path):
+            results = _parallel_scan((path, os.stat(path)), lambda item: _chmod_scan_dir(item, file_mode, dir_mode), jobs)
+            for c, s, e in results.values():
+                changed += c
+                skipped += s
+                errors.extend(e)
+        for error_path, e in errors:
+            _print_error(f"Error: '{error_path}': {e}")
+        print(f"Permissions under '{path}': {changed} changed, {skipped} already correct"
+              + (f", {len(errors)} errors." if errors else "."))
+    except FileNotFoundError:
+        _print_error(f"Error: '{path}' not found.")
+    except ValueError as e:
+        _print_error(f"Error: {e} Please use an octal number (e.g., 755) or a symbolic mode (e.g., u+rwX,go-w).")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+DEFLATE_BLOCK_SIZE = 128 * 1024
+DEFLATE_DICT_SIZE = 32 * 1024
+ZIP64_LIMIT = 0xFFFFFFFF
+
+def _deflate_block(data, level, zdict, last):
+    """Raw-deflates one block; non-final blocks end on a byte-aligned sync flush so blocks can be concatenated."""
+    import zlib
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+class _BlockCompressor:
+    """Deflates blocks on a thread pool (zlib releases the GIL) and hands results back in submission order.
+
+    on_result(compressed, context) is called from the submitting thread; at most
+    2 * jobs blocks are in flight, which bounds memory use.
+    """
+
+    def __init__(self, level, jobs, on_result):
+        import collections
+        import concurrent.futures
+        self.level = level
+        self._jobs = jobs or os.cpu_count() or 1
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._jobs)
+        self._window = collections.deque()
+        self._on_result = on_result
+
+    def submit(self, data, zdict, last, context=None):
+        future = self._executor.submit(_deflate_block, data, self.level, zdict, last)
+        self._window.append((future, context))
+        while len(self._window) > 2 * self._jobs:
+            self._emit()
+
+    def submit_raw(self, data, context=None):
+        """Queues already-encoded bytes so they are emitted in order with the compressed blocks."""
+        import concurrent.futures
+        future = concurrent.futures.Future()
+        future.set_result(data)
+        self._window.append((future, context))
+
+    def _emit(self):
+        future, context = self._window.popleft()
+        self._on_result(future.result(), context)
+
+    def finish(self):
+        while self._window:
+            self._emit()
+        self._executor.shutdown()
+
+def _zip_dos_time(mtime):
+    """Converts a timestamp to the (time, date) pair stored in zip headers."""
+    import time
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+def _write_parallel_zip(out, members, level, jobs):
+    """Writes a zip archive whose members are deflated in parallel, block by block.
+
+    members is a list of (arcname, path, stat_result). File entries use data
+    descriptors, so local headers can be written before the compressed size is
+    known; ZIP64 records are added where sizes or offsets need them.
+    """
+    import struct
+    import zlib
+    central = []
+
+    def on_result(data, context):
+        entry, first, last = context
+        if first:
+            entry["offset"] = out.tell()
+            zip64 = entry["zip64"]
+            extra = struct.pack("<HHQQ", 1, 16, 0, 0) if zip64 else b""
+            size_field = ZIP64_LIMIT if zip64 else 0
+            out.write(struct.pack("<4s2B4HL2L2H", b"PK\x03\x04", 45 if zip64 else 20, 0, entry["flags"],
+                                  entry["method"], entry["time"], entry["date"], 0, size_field, size_field,
+                                  len(entry["name"]), len(extra)))
+            out.write(entry["name"] + extra)
+        out.write(data)
+        entry["csize"] += len(data)
+        if last and entry["flags"] & 0x08:
+            if entry["zip64"]:
+                out.write(struct.pack("<4sLQQ", b"PK\x07\x08", entry["crc"], entry["csize"], entry["usize"]))
+            else:
+                if entry["csize"] > ZIP64_LIMIT:
+                    raise ValueError(f"'{entry['name'].decode()}' grew past 4 GiB while being archived")
+                out.write(struct.pack("<4sLLL", b"PK\x07\x08", entry["crc"], entry["csize"], entry["usize"]))
+
+    compressor = _BlockCompressor(level, jobs, on_result)
+    try:
+        for arcname, path, st in members:
+            is_dir = os.path.isdir(path)
+            dos_time, dos_date = _zip_dos_time(st.st_mtime)
+            entry = {
+                "name": (arcname + "/" if is_dir else arcname).encode("utf-8"),
+                "flags": 0x800 if is_dir else 0x808,
+                "method": 0 if is_dir else 8,
+                "time": dos_time,
+                "date": dos_date,
+                "mode": st.st_mode,
+                "is_dir": is_dir,
+                "zip64": not is_dir and st.st_size * 1.05 > ZIP64_LIMIT,
+                "crc": 0,
+                "csize": 0,
+                "usize": 0,
+            }
+            central.append(entry)
+            if is_dir:
+                compressor.submit_raw(b"", (entry, True, True))
+                continue
+            with open(path, 'rb') as f:
+                previous = None
+                block = f.read(DEFLATE_BLOCK_SIZE)
+                first = True
+                while True:
+                    next_block = f.read(DEFLATE_BLOCK_SIZE)
+                    last = not next_block
+                    entry["crc"] = zlib.crc32(block, entry["crc"])
+                    entry["usize"] += len(block)
+                    compressor.submit(block, previous, last, (entry, first, last))
+                    if last:
+                        break
+                    previous = block[-DEFLATE_DICT_SIZE:]
+                    block = next_block
+                    first = False
+    finally:
+        compressor.finish()
+
+    cd_offset = out.tell()
+    for entry in central:
+        extra_fields = []
+        usize, csize, offset = entry["usize"], entry["csize"], entry["offset"]
+        if usize >= ZIP64_LIMIT:
+            extra_fields.append(usize)
+            usize = ZIP64_LIMIT
+        if csize >= ZIP64_LIMIT:
+            extra_fields.append(csize)
+            csize = ZIP64_LIMIT
+        if offset >= ZIP64_LIMIT:
+            extra_fields.append(offset)
+            offset = ZIP64_LIMIT
+        extra = struct.pack(f"<HH{len(extra_fields)}Q", 1, 8 * len(extra_fields), *extra_fields) if extra_fields else b""
+        version = 45 if extra_fields or entry["zip64"] else 20
+        external_attr = (entry["mode"] & 0xFFFF) << 16 | (0x10 if entry["is_dir"] else 0)
+        out.write(struct.pack("<4s4B4HL2L5H2L", b"PK\x01\x02", version, 3, version, 0, entry["flags"],
+                              entry["method"], entry["time"], entry["date"], entry["crc"], csize, usize,
+                              len(entry["name"]), len(extra), 0, 0, 0, external_attr, offset))
+        out.write(entry["name"] + extra)
+    cd_end = out.tell()
+    cd_size = cd_end - cd_offset
+    count = len(central)
+    if count >= 0xFFFF or cd_offset >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT:
+        out.write(struct.pack("<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0, count, count, cd_size, cd_offset))
+        out.write(struct.pack("<4sLQL", b"PK\x06\x07", 0, cd_end, 1))
+    out.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                          min(cd_size, ZIP64_LIMIT), min(cd_offset, ZIP64_LIMIT), 0))
+
+def _archive_members(source_path):
+    """Lists (arcname, path, stat_result) for a file or directory tree, in sorted order, as archives store them."""
+    base = os.path.basename(os.path.normpath(source_path))
+    st = os.stat(source_path)
+    members = [(base, source_path, st)]
+    if os.path.isdir(source_path):
+        for root, dirs, files in os.walk(source_path):
+            dirs.sort()
+            rel_root = os.path.relpath(root, source_path)
+            for name in dirs + sorted(files):
+                path = os.path.join(root, name)
+                arcname = name if rel_root == "." else os.path.join(rel_root, name)
+                members.append((f"{base}/{arcname}".replace(os.sep, "/"), path, os.stat(path)))
+    return members
+
+def zip_item(source_path, output_filename, level=6, jobs=None):
+    """Compresses a file or directory into a zip archive, deflating members in parallel."""
+    try:
+        base_name = os.path.basename(output_filename)
+        archive_name = os.path.join(os.path.dirname(output_filename), base_name.split('.')[0]) + ".zip"
+        members = _archive_members(source_path)
+        with open(archive_name, 'wb') as out:
+            _write_parallel_zip(out, members, level, jobs)
+        print(f"'{source_path}' compressed to '{archive_name}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Source '{source_path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def unzip_item(source_path, destination_path):
+    """Decompresses a zip archive."""
+    import shutil
+    try:
+        shutil.unpack_archive(source_path, destination_path, 'zip')
+        print(f"'{source_path}' decompressed to '{destination_path}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Archive '{source_path}' not found.")
+    except shutil.ReadError:
+        _print_error(f"Error: '{source_path}' is not a valid zip archive.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _atomic_write(path, data):
+    """Writes bytes to a file via a temporary file and rename, so readers never see a partial file.
+
+    The result keeps the mode of an existing target, or gets 0666 minus the umask
+    like a file created with open(); mkstemp alone would leave it 0600.
+    """
+    import stat
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _default_jobs():
+    """Default worker count for I/O-bound thread pools."""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+def _parallel_scan(root, scan_dir, jobs=None):
+    """Runs scan_dir over a directory tree on a thread pool.
+
+    scan_dir(path) returns (result, subdirectory_paths); every returned subdirectory
+    is queued as a new task as soon as its parent finishes, so idle workers always
+    pick up the next pending directory instead of waiting for a whole subtree.
+    Returns a dict mapping each scanned directory to its result; a directory whose
+    scan_dir raised OSError is left out and the walk continues with the rest.
+    """
+    import concurrent.futures
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or _default_jobs()) as executor:
+        pending = {executor.submit(scan_dir, root): root}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                dir_path = pending.pop(future)
+                try:
+                    result, subdirs = future.result()
+                except OSError:
+                    continue
+                results[dir_path] = result
+                for subdir in subdirs:
+                    pending[executor.submit(scan_dir, subdir)] = subdir
+    return results
+
+def _load_du_cache(cache_path):
+    """Loads the du cache file, returning an empty cache if it is missing or unreadable."""
+    import json
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        if cache.get("version") == 1:
+            return cache["dirs"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def _scan_du_dir(path, cache=None):
+    """Scans one directory for du, reusing the cached entry if the directory mtime is unchanged.
+
+    Without a cache, the entry keeps only what the totals need: no mtime and
+    no subdirectory names. An unreadable directory yields an entry with an
+    "error" key and no subdirectories.
+    """
+    mtime_ns = None
+    if cache is not None:
+        try:
+            mtime_ns = os.stat(path, follow_symlinks=False).st_mtime_ns
+        except OSError as e:
+            return {"mtime_ns": None, "size": 0, "files": 0, "hardlinks": [], "subdirs": [],
+                    "cached": False, "error": e}, []
+    cached = cache.get(path) if cache is not None else None
+    if cached is not None and cached["mtime_ns"] == mtime_ns:
+        entry = dict(cached, cached=True)
+        _bump("du.dirs_cached")
+    else:
+        size = 0
+        files = 0
+        hardlinks = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for e in entries:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.name)
+                        elif e.is_file(follow_symlinks=False):
+                            st = e.stat(follow_symlinks=False)
+                            files += 1
+                            if st.st_nlink > 1:
+                                hardlinks.append([st.st_dev, st.st_ino, st.st_size])
+                            else:
+                                size += st.st_size
+                    except OSError:
+                        continue
+        except OSError as e:
+            return {"mtime_ns": None, "size": size, "files": files, "hardlinks": hardlinks,
+                    "subdirs": [], "cached": False, "error": e}, []
+        _bump("du.dirs_scanned")
+        _bump("du.files_visited", files)
+        if cache is None:
+            entry = {"size": size, "files": files, "hardlinks": hardlinks, "cached": False}
+            return entry, [os.path.join(path, name) for name in subdirs]
+        entry = {"mtime_ns": mtime_ns, "size": size, "files": files,
+                 "hardlinks": hardlinks, "subdirs": subdirs, "cached": False}
+    return entry, [os.path.join(path, name) for name in entry["subdirs"]]
+
+def _directory_sizes(path, jobs=None, cache_path=None):
+    """Computes the recursive size of every directory below path.
+
+    Hardlinked files are counted once per (st_dev, st_ino). If cache_path is given,
+    directories whose mtime has not changed since the last run are not rescanned;
+    note that a directory mtime only changes when entries are added, removed or
+    renamed, so files rewritten in place keep their cached size.
+    Unreadable directories are skipped and count with whatever could be read.
+    Returns (totals, scanned, errors) where totals maps each directory to its
+    recursive size and errors lists (directory, exception) pairs.
+    """
+    import json
+    path = os.path.abspath(path)
+    cache = _load_du_cache(cache_path) if cache_path else None
+    results = _parallel_scan(path, lambda d: _scan_du_dir(d, cache), jobs)
+
+    seen_inodes = set()
+    totals = {}
+    for dir_path in sorted(results):
+        own = results[dir_path]["size"]
+        for dev, ino, size in results[dir_path]["hardlinks"]:
+            if (dev, ino) not in seen_inodes:
+                seen_inodes.add((dev, ino))
+                own += size
+        totals[dir_path] = own
+    for dir_path in sorted(totals, key=lambda d: d.count(os.sep), reverse=True):
+        if dir_path != path:
+            parent = os.path.dirname(dir_path)
+            if parent in totals:
+                totals[parent] += totals[dir_path]
+
+    if cache_path:
+        dirs = {d: {k: v for k, v in r.items() if k != "cached"}
+                for d, r in results.items() if "error" not in r}
+        _atomic_write(cache_path, json.dumps({"version": 1, "dirs": dirs}).encode())
+    scanned = sum(1 for r in results.values() if not r["cached"])
+    errors = [(d, r["error"]) for d, r in sorted(results.items()) if "error" in r]
+    return totals, scanned, errors
+
+def display_size(path, jobs=None, cache_path=None):
+    """Displays the size of a file or a directory, with per-subdirectory totals."""
+    try:
+        if os.path.isfile(path):
+            size = os.path.getsize(path)
+            print(f"Size of '{path}': {size} bytes")
+        elif os.path.isdir(path):
+            totals, scanned, errors = _directory_sizes(path, jobs, cache_path)
+            root = os.path.abspath(path)
+            for error_path, e in errors:
+                _print_error(f"Error: cannot read directory '{error_path}': {e.strerror or e}")
+            for dir_path in sorted(d for d in totals if os.path.dirname(d) == root and d != root):
+                print(f"  {totals[dir_path]:>15} bytes  {os.path.basename(dir_path)}/")
+            print(f"Size of directory '{path}': {totals[root]} bytes")
+            if cache_path:
+                print(f"({scanned} of {len(totals)} directories rescanned)")
+        else:
+            _print_error(f"Error: '{path}' not found or is not a file or directory.")
+    except FileNotFoundError:
+        _print_error(f"Error: '{path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+DIFF_CONTEXT = 3
+DIFF_MIN_COST_LIMIT = 64
+
+def _read_line_ids(path, ids, lines):
+    """Reads a file as a list of integer line IDs; each distinct line is stored once in lines."""
+    result = []
+    with open(path, 'rb') as f:
+        for line in f:
+            line_id = ids.get(line)
+            if line_id is None:
+                line_id = ids[line] = len(lines)
+                lines.append(line)
+            result.append(line_id)
+    return result
+
+def _myers_middle_snake(a, b, left, top, right, bottom, cost_limit):
+    """Finds the middle snake of the box between (left, top) and (right, bottom) in linear space.
+
+    Returns (start, finish, run): the path passes from start to finish through
+    at most one edit step and the diagonal run (x, y, length). Once the search
+    reaches cost_limit edits it gives up on the optimal split, like GNU diff's
+    TOO_EXPENSIVE heuristic, and splits at the forward path that got furthest.
+    """
+    width = right - left
+    height = bottom - top
+    size = width + height
+    if size == 0:
+        return None
+    max_d = (size + 1) // 2
+    delta = width - height
+    odd = delta % 2 == 1
+    # Negative diagonals wrap around to the end of the lists.
+    vf = [0] * (2 * max_d + 2)
+    vb = [0] * (2 * max_d + 2)
+    vf[1] = left
+    vb[1] = bottom
+    for d in range(max_d + 1):
+        for k in range(d, -d - 1, -2):
+            c = k - delta
+            if k == -d or (k != d and vf[k - 1] < vf[k + 1]):
+                px = x = vf[k + 1]
+            else:
+                px = vf[k - 1]
+                x = px + 1
+            y = top + (x - left) - k
+            py = y if (d == 0 or x != px) else y - 1
+            sx = x
+            while x < right and y < bottom and a[x] == b[y]:
+                x += 1
+                y += 1
+            vf[k] = x
+            if odd and -(d - 1) <= c <= d - 1 and y >= vb[c]:
+                return (px, py), (x, y), (sx, y - (x - sx), x - sx)
+        for c in range(d, -d - 1, -2):
+            k = c + delta
+            if c == -d or (c != d and vb[c - 1] > vb[c + 1]):
+                py = y = vb[c + 1]
+            else:
+                py = vb[c - 1]
+                y = py - 1
+            x = left + (y - top) + k
+            px = x if (d == 0 or y != py) else x + 1
+            ey = y
+            while x > left and y > top and a[x - 1] == b[y - 1]:
+                x -= 1
+                y -= 1
+            vb[c] = y
+            if not odd and -d <= k <= d and x <= vf[k]:
+                return (x, y), (px, py), (x, y, ey - y)
+        if d >= cost_limit:
+            best = None
+            for k in range(d, -d - 1, -2):
+                x = vf[k]
+                y = top + (x - left) - k
+                if (left <= x <= right and top <= y <= bottom and (x, y) != (left, top)
+                        and (x, y) != (right, bottom) and (best is None or x + y > best[0] + best[1])):
+                    best = (x, y)
+            if best is not None:
+                return best, best, (best[0], best[1], 0)
+    return None
+
+def _myers_runs(a, b, cost_limit):
+    """Yields the diagonal runs (x, y, length) of an edit path from the start to the end of a and b, in order."""
+    stack = [("box", 0, 0, len(a), len(b))]
+    while stack:
+        item = stack.pop()
+        if item[0] == "run":
+            yield item[1:]
+            continue
+        _, left, top, right, bottom = item
+        prefix = 0
+        while left + prefix < right and top + prefix < bottom and a[left + prefix] == b[top + prefix]:
+            prefix += 1
+        suffix = 0
+        while (left + prefix < right - suffix and top + prefix < bottom - suffix
+               and a[right - 1 - suffix] == b[bottom - 1 - suffix]):
+            suffix += 1
+        if suffix:
+            stack.append(("run", right - suffix, bottom - suffix, suffix))
+        inner = (left + prefix, top + prefix, right - suffix, bottom - suffix)
+        if inner[0] < inner[2] and inner[1] < inner[3]:
+            start, finish, run = _myers_middle_snake(a, b, *inner, cost_limit)
+            stack.append(("box", finish[0], finish[1], inner[2], inner[3]))
+            if run[2]:
+                stack.append(("run",) + run)
+            stack.append(("box", inner[0], inner[1], start[0], start[1]))
+        if prefix:
+            stack.append(("run", left, top, prefix))
+
+def _myers_opcodes(a, b):
+    """Computes an edit script between two ID sequences with linear-space Myers.
+
+    Lines that occur in only one of the sequences can never match, so they are
+    dropped before the search, as GNU diff does; a rewrite without any common
+    line becomes a single replace in linear time. The search itself is bounded
+    by a cost limit of about the square root of the input size, so the script
+    is minimal unless the inputs differ a lot.
+    Returns difflib-style opcodes (tag, i1, i2, j1, j2).
+    """
+    import math
+    common = set(a).intersection(b)
+    a_index = [i for i, line in enumerate(a) if line in common]
+    b_index = [j for j, line in enumerate(b) if line in common]
+    fa = [a[i] for i in a_index]
+    fb = [b[j] for j in b_index]
+    cost_limit = max(DIFF_MIN_COST_LIMIT, math.isqrt(len(fa) + len(fb)))
+
+    ops = []
+    i = j = 0
+    for x, y, length in _myers_runs(fa, fb, cost_limit):
+        for offset in range(length):
+            ai = a_index[x + offset]
+            bj = b_index[y + offset]
+            if ai > i or bj > j:
+                tag = "replace" if ai > i and bj > j else ("delete" if ai > i else "insert")
+                ops.append((tag, i, ai, j, bj))
+            elif ops and ops[-1][0] == "equal":
+                ops[-1] = ("equal", ops[-1][1], ai + 1, ops[-1][3], bj + 1)
+                i = ai + 1
+                j = bj + 1
+                continue
+            ops.append(("equal", ai, ai + 1, bj, bj + 1))
+            i = ai + 1
+            j = bj + 1
+    n = len(a)
+    m = len(b)
+    if i < n or j < m:
+        tag = "replace" if i < n and j < m else ("delete" if i < n else "insert")
+        ops.append((tag, i, n, j, m))
+    return ops
+
+def _group_opcodes(opcodes, n=DIFF_CONTEXT):
+    """Groups opcodes into hunks with n lines of context, like difflib.SequenceMatcher.get_grouped_opcodes."""
+    codes = list(opcodes)
+    if not codes or (len(codes) == 1 and codes[0][0] == "equal"):
+        return
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+    nn = n + n
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+def _format_range(start, stop):
+    """Formats a hunk range the way difflib.unified_diff does."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+def _write_diff_line(out, prefix, line):
+    """Writes one prefixed diff line, marking a missing final newline like GNU diff."""
+    out.write(prefix + line)
+    if not line.endswith(b"\n"):
+        out.write(b"\n\\ No newline at end of file\n")
+
+def compare_files(file1_path, file2_path):
+    """Compares two text files and prints the differences as a unified diff."""
+    try:
+        ids = {}
+        lines = []
+        a = _read_line_ids(file1_path, ids, lines)
+        b = _read_line_ids(file2_path, ids, lines)
+        del ids
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+        first = True
+        for group in _group_opcodes(_myers_opcodes(a, b)):
+            if first:
+                out.write(f"--- {file1_path}\n+++ {file2_path}\n".encode())
+                first = False
+            out.write(f"@@ -{_format_range(group[0][1], group[-1][2])} "
+                      f"+{_format_range(group[0][3], group[-1][4])} @@\n".encode())
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    for i in range(i1, i2):
+                        _write_diff_line(out, b" ", lines[a[i]])
+                    continue
+                for i in range(i1, i2):
+                    _write_diff_line(out, b"-", lines[a[i]])
+                for j in range(j1, j2):
+                    _write_diff_line(out, b"+", lines[b[j]])
+        out.flush()
+    except FileNotFoundError:
+        _print_error("Error: One or both files not found.")
+    except IsADirectoryError:
+        _print_error("Error: One of the paths is a directory. Use 'diff -r' to compare directories.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def compare_directories(dir1_path, dir2_path):
+    """Compares two directory trees and reports files that differ or exist on one side only.
+
+    Files with different sizes differ; files with equal size and mtime are
+    assumed equal; only the remaining files are hashed.
+    """
+    try:
+        for path in (dir1_path, dir2_path):
+            if not os.path.isdir(path):
+                _print_error(f"Error: Directory '{path}' not found.")
+                return
+        differences = 0
+        stack = [(dir1_path, dir2_path)]
+        while stack:
+            left, right = stack.pop()
+            with os.scandir(left) as it:
+                left_entries = {e.name: e for e in it}
+            with os.scandir(right) as it:
+                right_entries = {e.name: e for e in it}
+            subdirs = []
+            for name in sorted(left_entries.keys() | right_entries.keys()):
+                l = left_entries.get(name)
+                r = right_entries.get(name)
+                if r is None or l is None:
+                    print(f"Only in {left if r is None else right}: {name}")
+                    differences += 1
+                    continue
+                l_dir = l.is_dir(follow_symlinks=False)
+                r_dir = r.is_dir(follow_symlinks=False)
+                if l_dir and r_dir:
+                    subdirs.append((l.path, r.path))
+                elif l_dir != r_dir:
+                    print(f"File {l.path} is {'a directory' if l_dir else 'a file'} while file {r.path} is {'a directory' if r_dir else 'a file'}")
+                    differences += 1
+                else:
+                    ls = l.stat(follow_symlinks=False)
+                    rs = r.stat(follow_symlinks=False)
+                    if ls.st_size != rs.st_size:
+                        same = False
+                    elif ls.st_mtime_ns == rs.st_mtime_ns:
+                        same = True
+                    elif l.is_symlink() or r.is_symlink():
+                        same = l.is_symlink() and r.is_symlink() and os.readlink(l.path) == os.readlink(r.path)
+                    else:
+                        same = _hash_file(l.path, "blake2b") == _hash_file(r.path, "blake2b")
+                    if not same:
+                        print(f"Files {l.path} and {r.path} differ")
+                        differences += 1
+            stack.extend(reversed(subdirs))
+        if not differences:
+            print(f"Directories '{dir1_path}' and '{dir2_path}' are identical.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+STAT_FIELDS = ("path", "type", "size", "mode", "uid", "gid", "nlink", "ino", "dev", "mtime_ns", "atime_ns", "ctime_ns")
+STAT_DEFAULT_FIELDS = ("path", "type", "size", "mode", "mtime_ns")
+STAT_FORMATS = ("table", "csv", "ndjson")
+_STAT_COLUMN_WIDTHS = {"type": 7, "size": 14, "mode": 10, "uid": 6, "gid": 6, "nlink": 5, "ino": 12, "dev": 8,
+                       "mtime_ns": 19, "atime_ns": 19, "ctime_ns": 19}
+
+def display_metadata(path):
+    """Displays metadata of a file or directory."""
+    try:
+        stats = os.stat(path)
+        print(f"Metadata for '{path}':")
+        print(f"  Size: {stats.st_size} bytes")
+        print(f"  Last modified: {stats.st_mtime}")
+        print(f"  Last accessed: {stats.st_atime}")
+        print(f"  Creation time: {stats.st_ctime}")
+        print(f"  Mode: {oct(stats.st_mode)}")
+        print(f"  Inode: {stats.st_ino}")
+        print(f"  Device: {stats.st_dev}")
+        print(f"  Number of links: {stats.st_nlink}")
+        print(f"  Owner UID: {stats.st_uid}")
+        print(f"  Group GID: {stats.st_gid}")
+    except FileNotFoundError:
+        _print_error(f"Error: '{path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _iter_stat_targets(specs, recursive=False):
+    """Yields (path, stat_result or OSError) for paths and globs, and with recursive for everything below directories.
+
+    Every entry costs exactly one lstat; entries found while walking reuse
+    their scandir DirEntry for it.
+    """
+    import glob
+    import stat
+    for spec in specs:
+        paths = sorted(glob.iglob(spec, recursive=True)) if glob.has_magic(spec) else [spec]
+        if not paths:
+            yield spec, FileNotFoundError(f"No match for '{spec}'")
+        for path in paths:
+            try:
+                st = os.lstat(path)
+            except OSError as e:
+                yield path, e
+                continue
+            yield path, st
+            if not (recursive and stat.S_ISDIR(st.st_mode)):
+                continue
+            stack = [path]
+            while stack:
+                dir_path = stack.pop()
+                try:
+                    with os.scandir(dir_path) as it:
+                        entries = sorted(it, key=lambda e: e.name)
+                except OSError as e:
+                    yield dir_path, e
+                    continue
+                subdirs = []
+                for entry in entries:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError as e:
+                        yield entry.path, e
+                        continue
+                    yield entry.path, st
+                    if stat.S_ISDIR(st.st_mode):
+                        subdirs.append(entry.path)
+                stack.extend(reversed(subdirs))
+
+def _stat_record(path, st, fields):
+    """Builds an output record with the selected fields from one stat result."""
+    import stat
+    mode = st.st_mode
+    values = {
+        "path": path,
+        "type": ("dir" if stat.S_ISDIR(mode) else "file" if stat.S_ISREG(mode)
+                 else "symlink" if stat.S_ISLNK(mode) else "other"),
+        "size": st.st_size, "mode": oct(mode), "uid": st.st_uid, "gid": st.st_gid, "nlink": st.st_nlink,
+        "ino": st.st_ino, "dev": st.st_dev,
+        "mtime_ns": st.st_mtime_ns, "atime_ns": st.st_atime_ns, "ctime_ns": st.st_ctime_ns,
+    }
+    return {field: values[field] for field in fields}
+
+def _csv_field(value):
+    """Quotes one CSV field if needed."""
+    value = str(value)
+    if any(c in value for c in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def stat_paths(specs, recursive=False, fmt="table", fields=STAT_DEFAULT_FIELDS):
+    """Streams metadata for many paths, globs or directory trees as a table, CSV or NDJSON.
+
+    Symlinks are reported, not followed. Timestamps are integer nanoseconds.
+    """
+    try:
+        def table_row(record):
+            return "  ".join(str(record[f]).rjust(_STAT_COLUMN_WIDTHS[f]) for f in fields if f != "path") \
+                + ("  " + record["path"] if "path" in fields else "")
+
+        def csv_row(record):
+            return ",".join(_csv_field(record[f]) for f in fields)
+
+        with _RecordWriter("ndjson" if fmt == "ndjson" else "plain") as out:
+            if fmt == "table":
+                out.header(table_row({f: f for f in fields}).rstrip())
+            elif fmt == "csv":
+                out.header(",".join(fields))
+            for path, st in _iter_stat_targets(specs, recursive):
+                if isinstance(st, OSError):
+                    out.error(f"Error: '{path}': {st.strerror or st}")
+                    continue
+                out.write(_stat_record(path, st, fields), csv_row if fmt == "csv" else table_row)
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+_grep_patterns = {}
+
+def _walk_files(root, include=None, exclude=None):
+    """Yields (path, DirEntry) for every regular file below root, in sorted, stable order.
+
+    include and exclude are lists of glob patterns matched against entry names;
+    exclude also prunes directories.
+    """
+    import fnmatch
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if exclude and any(fnmatch.fnmatch(entry.name, g) for g in exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if include and not any(fnmatch.fnmatch(entry.name, g) for g in include):
+                        continue
+                    yield entry.path, entry
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+def _grep_file(path, pattern):
+    """Scans one file for a bytes pattern; returns a list of (line_number, line) or None for binary files.
+
+    Matches are line-bounded like grep: a match that spans a newline only counts
+    if the pattern also matches within the line on its own.
+    """
+    import mmap
+    import re
+    regex = _grep_patterns.get(pattern)
+    if regex is None:
+        regex = _grep_patterns[pattern] = re.compile(pattern, re.MULTILINE)
+    matches = []
+    _bump("grep.files_scanned")
+    with open(path, 'rb') as f:
+        if b"\0" in f.read(8192):
+            return None
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return matches
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            line_num = 1
+            counted = 0
+            pos = 0
+            while pos <= size:
+                m = regex.search(mm, pos)
+                if m is None:
+                    break
+                line_start = mm.rfind(b"\n", 0, m.start()) + 1
+                line_end = mm.find(b"\n", m.start())
+                if line_end == -1:
+                    line_end = size
+                if m.end() > line_end and regex.search(mm, line_start, line_end) is None:
+                    # Classes like \s or [^z] can run across a newline; such a match
+                    # says nothing about the line it started on, so retry from the next one.
+                    pos = line_end + 1
+                    continue
+                line_num += mm[counted:line_start].count(b"\n")
+                counted = line_start
+                matches.append((line_num, mm[line_start:line_end]))
+                pos = line_end + 1
+            if _counters is not None:
+                # Newlines up to the last match are already counted; only the tail is left.
+                lines = line_num - 1 + sum(mm[i:min(i + LINE_INDEX_BLOCK_SIZE, size)].count(b"\n")
+                                           for i in range(counted, size, LINE_INDEX_BLOCK_SIZE))
+                _bump("grep.lines_scanned", lines + (mm[size - 1] != 10))
+                _bump("grep.bytes_scanned", size)
+    return matches
+
+GREP_CHUNK_SIZE = 16
+
+def _grep_worker(paths, pattern, counting=False):
+    """Process pool entry point for recursive grep; scans a chunk of files, returning errors instead of raising.
+
+    Returns (results, counters) so instrumentation counters reach the parent.
+    """
+    if counting and _counters is None:
+        _enable_counters()
+    results = []
+    for path in paths:
+        try:
+            results.append((path, _grep_file(path, pattern), None))
+        except OSError as e:
+            results.append((path, None, str(e)))
+    return results, _take_counters()
+
+def _iter_grep_results(files, pattern, jobs=None):
+    """Greps files on a process pool and yields (path, matches, error) in input order.
+
+    Only a bounded window of chunks is in flight at once, so memory stays flat
+    however many files the walk produces.
+    """
+    import collections
+    import concurrent.futures
+    import itertools
+    jobs = jobs or os.cpu_count() or 1
+    files = iter(files)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        window = collections.deque()
+        while True:
+            while len(window) < jobs * 4:
+                chunk = list(itertools.islice(files, GREP_CHUNK_SIZE))
+                if not chunk:
+                    break
+                window.append(executor.submit(_grep_worker, chunk, pattern, _counters is not None))
+            if not window:
+                return
+            results, counters = window.popleft().result()
+            _merge_counters(counters)
+            yield from results
+
+def _grep_records(path, matches):
+    """Turns _grep_file matches into output records."""
+    for line_num, line in matches or ():
+        yield {"path": path, "line": line_num, "text": line.decode('utf-8', 'replace')}
+
+def _format_grep_match(record):
+    return f"{record['path']}:{record['line']}: {record['text'].strip()}"
+
+def _format_grep_match_nul(record):
+    # Like 'grep -Z': the file name is NUL-terminated, then the line itself.
+    return f"{record['path']}\0{record['line']}:{record['text']}"
+
+def grep_file_content(path, pattern, recursive=False, include=None, exclude=None, jobs=None, fmt="plain"):
+    """Searches for a pattern within the content of a file, or recursively within a directory tree."""
+    import re
+    try:
+        pattern_bytes = pattern.encode('utf-8', 'surrogateescape')
+        re.compile(pattern_bytes)
+        if os.path.isdir(path):
+            if not recursive:
+                _print_error(f"Error: '{path}' is a directory. Use -r to search recursively.")
+                return
+            files = (p for p, _ in _walk_files(path, include, exclude))
+            results = _iter_grep_results(files, pattern_bytes, jobs)
+        else:
+            results = [(path, _grep_file(path, pattern_bytes), None)]
+        with _RecordWriter(fmt) as out:
+            for file_path, matches, error in results:
+                if error:
+                    out.error(f"Error reading '{file_path}': {error}")
+                    continue
+                for record in _grep_records(file_path, matches):
+                    out.write(record, _format_grep_match, _format_grep_match_nul)
+    except FileNotFoundError:
+        _print_error(f"Error: File '{path}' not found.")
+    except re.error as e:
+        _print_error(f"Error: Invalid pattern '{pattern}': {e}")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+HASH_ALGORITHMS = ("md5", "sha1", "sha256", "sha512", "blake2b")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def _hash_file(path, algorithm, chunk_size=HASH_CHUNK_SIZE):
+    """Returns the hex digest of a file, read in large chunks into a reused buffer."""
+    import hashlib
+    hasher = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    total = 0
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+            total += n
+    _bump("hash.files_hashed")
+    _bump("hash.bytes_hashed", total)
+    return hasher.hexdigest()
+
+def _load_hash_cache(cache_path):
+    """Loads the hash cache file, returning an empty cache if it is missing or unreadable."""
+    import json
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        if cache.get("version") == 1:
+            return cache["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def generate_hash(path, algorithm):
+    """Generates the hash of a file using the specified algorithm."""
+    try:
+        if algorithm not in HASH_ALGORITHMS:
+            _print_error(f"Error: Unsupported hash algorithm '{algorithm}'. Use one of: {', '.join(HASH_ALGORITHMS)}.")
+            return
+        print(f"Hash of '{path}' ({algorithm}): {_hash_file(path, algorithm)}")
+    except FileNotFoundError:
+        _print_error(f"Error: File '{path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def hash_files(paths, algorithm, jobs=None, cache_path=None):
+    """Hashes many files or directory trees in parallel and prints a checksum manifest.
+
+    With cache_path, digests are kept in a sidecar cache keyed by path and
+    (inode, size, mtime_ns), so unchanged files are not read again.
+    """
+    import collections
+    import concurrent.futures
+    import json
+    try:
+        if algorithm not in HASH_ALGORITHMS:
+            _print_error(f"Error: Unsupported hash algorithm '{algorithm}'. Use one of: {', '.join(HASH_ALGORITHMS)}.")
+            return
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend((p, entry.stat(follow_symlinks=False)) for p, entry in _walk_files(path))
+            elif os.path.isfile(path):
+                files.append((path, os.stat(path)))
+            else:
+                _print_error(f"Error: '{path}' not found.")
+        cache = _load_hash_cache(cache_path) if cache_path else {}
+
+        def digest(item):
+            file_path, st = item
+            key = os.path.abspath(file_path)
+            signature = [st.st_ino, st.st_size, st.st_mtime_ns]
+            cached = cache.get(key)
+            if cached and cached[0] == signature and algorithm in cached[1]:
+                return key, signature, cached[1][algorithm], None
+            try:
+                return key, signature, _hash_file(file_path, algorithm), None
+            except OSError as e:
+                return key, signature, None, e
+
+        hashed = 0
+        def digests():
+            # A bounded window of files in flight keeps output streaming and lets a closed
+            # pipe stop the run early, instead of queuing a future for every file upfront.
+            window = collections.deque()
+            for item in files:
+                window.append((item[0], executor.submit(digest, item)))
+                if len(window) >= workers * 4:
+                    file_path, future = window.popleft()
+                    yield file_path, future.result()
+            while window:
+                file_path, future = window.popleft()
+                yield file_path, future.result()
+
+        workers = jobs or os.cpu_count() or 1
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            with _RecordWriter() as out:
+                for file_path, (key, signature, hexdigest, error) in digests():
+                    if error:
+                        out.error(f"Error reading '{file_path}': {error}")
+                        continue
+                    out.write({"path": file_path, "digest": hexdigest}, lambda r: f"{r['digest']}  {r['path']}")
+                    cached = cache.get(key)
+                    if not cached or cached[0] != signature:
+                        cache[key] = cached = [signature, {}]
+                    if algorithm not in cached[1]:
+                        cached[1][algorithm] = hexdigest
+                        hashed += 1
+        finally:
+            executor.shutdown(cancel_futures=True)
+        if cache_path:
+            _atomic_write(cache_path, json.dumps({"version": 1, "files": cache}).encode())
+            print(f"({hashed} of {len(files)} files hashed, the rest from cache)", file=sys.stderr)
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+DEDUP_EDGE_SIZE = 64 * 1024
+FICLONE = 0x40049409
+
+def _hash_edges(path, edge_size=DEDUP_EDGE_SIZE):
+    """Hashes the first and last edge_size bytes of a file, a cheap pre-filter for duplicates."""
+    import hashlib
+    hasher = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        hasher.update(f.read(edge_size))
+        size = os.fstat(f.fileno()).st_size
+        if size > edge_size:
+            f.seek(max(size - edge_size, edge_size))
+            hasher.update(f.read(edge_size))
+    return hasher.hexdigest()
+
+def _refine_groups(groups, key_func, jobs):
+    """Splits each group of paths by key_func, computed in parallel; drops groups with a single member.
+
+    Every path of every group is submitted as one batch, so the pool stays busy
+    across many small groups instead of waiting at the end of each group.
+    """
+    import concurrent.futures
+    candidates = [(index, path) for index, group in enumerate(groups) for path in group]
+    buckets = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or _default_jobs()) as executor:
+        keys = executor.map(key_func, [path for _, path in candidates])
+        for (index, path), key in zip(candidates, keys):
+            if key is not None:
+                buckets.setdefault((index, key), []).append(path)
+    return [b for b in buckets.values() if len(b) > 1]
+
+def _dedup_identity(st):
+    """The stat fields dedup expects to be unchanged between hashing a file and linking it."""
+    return st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino
+
+def _replace_with_link(original, duplicate, link_mode):
+    """Atomically replaces duplicate with a hardlink or reflink to original."""
+    import shutil
+    tmp_path = os.path.join(os.path.dirname(duplicate), f".{os.path.basename(duplicate)}.dedup.tmp")
+    try:
+        if link_mode == "hard":
+            os.link(original, tmp_path)
+        else:
+            import fcntl # Unix-only, so imported only when reflinks are requested
+            with open(original, 'rb') as src, open(tmp_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(original, tmp_path)
+        os.replace(tmp_path, duplicate)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def find_duplicates(directory, link_mode=None, jobs=None):
+    """Finds identical files in stages: size, then first/last block hash, then a full hash.
+
+    With link_mode "hard" or "reflink", every duplicate is replaced by a link to
+    the first file of its group.
+    """
+    try:
+        if not os.path.isdir(directory):
+            _print_error(f"Error: Directory '{directory}' not found.")
+            return
+        by_size = {}
+        seen_inodes = set()
+        scanned = {}
+        for path, entry in _walk_files(directory):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_size == 0 or (st.st_dev, st.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((st.st_dev, st.st_ino))
+            scanned[path] = _dedup_identity(st)
+            by_size.setdefault(st.st_size, []).append(path)
+        groups = [g for g in by_size.values() if len(g) > 1]
+
+        def edges(path):
+            try:
+                return _hash_edges(path)
+            except OSError:
+                return None
+
+        def full(path):
+            try:
+                return _hash_file(path, "blake2b")
+            except OSError:
+                return None
+
+        groups = _refine_groups(groups, edges, jobs)
+        # Files no larger than two edge blocks were already read in full.
+        small = [g for g in groups if os.path.getsize(g[0]) <= 2 * DEDUP_EDGE_SIZE]
+        groups = small + _refine_groups([g for g in groups if os.path.getsize(g[0]) > 2 * DEDUP_EDGE_SIZE], full, jobs)
+
+        if not groups:
+            print(f"No duplicate files found in '{directory}'.")
+            return
+        wasted = 0
+        for group in sorted(groups):
+            group.sort()
+            size = scanned[group[0]][0]
+            wasted += size * (len(group) - 1)
+            print(f"{len(group)} identical files of {size} bytes:")
+            for path in group:
+                print(f"- {path}")
+            if link_mode:
+                for duplicate in group[1:]:
+                    try:
+                        # Both files were hashed a while ago; do not link over one that changed since.
+                        if any(_dedup_identity(os.stat(p, follow_symlinks=False)) != scanned[p]
+                               for p in (group[0], duplicate)):
+                            _print_error(f"Skipped '{duplicate}': it or '{group[0]}' changed during the scan.")
+                            continue
+                        _replace_with_link(group[0], duplicate, link_mode)
+                    except OSError as e:
+                        _print_error(f"Error linking '{duplicate}' to '{group[0]}': {e}")
+        action = "reclaimed" if link_mode else "reclaimable"
+        print(f"{len(groups)} duplicate groups, {wasted} bytes {action}.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _sample_processes(procs):
+    """Refreshes a pid -> psutil.Process map and returns (pid, process, cpu_percent, rss) rows.
+
+    Process objects are kept between calls so cpu_percent measures the time
+    since the previous sample; processes seen for the first time report 0.0.
+    """
+    import psutil
+    current = set(psutil.pids())
+    for pid in list(procs):
+        if pid not in current:
+            del procs[pid]
+    rows = []
+    for pid in current:
+        proc = procs.get(pid)
+        try:
+            if proc is None:
+                proc = procs[pid] = psutil.Process(pid)
+            with proc.oneshot():
+                rows.append((pid, proc, proc.cpu_percent(None), proc.memory_info().rss))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            procs.pop(pid, None)
+    return rows
+
+def _print_process_table(rows, total_memory, sort="cpu", limit=None):
+    """Prints the top processes by CPU or memory; names are only looked up for the rows shown."""
+    import psutil
+    key = (lambda r: r[2]) if sort == "cpu" else (lambda r: r[3])
+    rows = sorted(rows, key=key, reverse=True)
+    if limit:
+        rows = rows[:limit]
+    print("PID\tName\tCPU%\tMEM%")
+    print("--------------------------------------------------")
+    for pid, proc, cpu, rss in rows:
+        try:
+            name = proc.name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+        print(f"{pid}\t{name}\t{cpu:.1f}\t{rss * 100 / total_memory:.1f}")
+
+def list_processes(sort="cpu", limit=None, watch=False, interval=1.0):
+    """Lists running processes sorted by CPU or memory use, optionally refreshing like top.
+
+    CPU usage is measured over interval seconds between two samples of the same
+    Process objects, since psutil's first sample of a process is always 0.0.
+    """
+    import psutil
+    import time
+    total_memory = psutil.virtual_memory().total
+    procs = {}
+    _sample_processes(procs)
+    try:
+        while True:
+            time.sleep(interval)
+            rows = _sample_processes(procs)
+            if not watch:
+                _print_process_table(rows, total_memory, sort, limit)
+                return
+            sys.stdout.write("\033[H\033[J")
+            print(f"{time.strftime('%H:%M:%S')}  {len(rows)} processes, top {limit or len(rows)} by {sort}, "
+                  f"refresh every {interval:g}s (Ctrl+C to stop)\n")
+            _print_process_table(rows, total_memory, sort, limit)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+def ping_host(host):
+    """Pings a host and displays the output."""
+    import subprocess
+    try:
+        # Use platform-specific ping command
+        if sys.platform.startswith('win'):
+            command = ['ping', '-n', '1', host] # Ping once on Windows
+        else:
+            command = ['ping', '-c', '1', host] # Ping once on Linux/macOS
+        
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        print(result.stdout)
+    except subprocess.CalledProcessError as e:
+        _print_error(f"Error pinging '{host}': {e.stderr}")
+    except FileNotFoundError:
+        _print_error(f"Error: 'ping' command not found. Make sure it's in your system's PATH.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _ping_command(host, count):
+    """Builds the platform ping command line for count echo requests."""
+    if sys.platform.startswith('win'):
+        return ['ping', '-n', str(count), host]
+    return ['ping', '-c', str(count), host]
+
+def _parse_ping_output(text):
+    """Extracts packet loss and round-trip times from Linux, macOS or Windows ping output."""
+    import re
+    result = {"transmitted": None, "received": None, "loss_percent": None,
+              "rtt_min_ms": None, "rtt_avg_ms": None, "rtt_max_ms": None}
+    m = re.search(r"(\d+) packets transmitted, (\d+) (?:packets )?received", text)
+    if m:
+        result["transmitted"], result["received"] = int(m.group(1)), int(m.group(2))
+    m = re.search(r"Sent = (\d+), Received = (\d+)", text)
+    if m:
+        result["transmitted"], result["received"] = int(m.group(1)), int(m.group(2))
+    m = re.search(r"([\d.]+)% (?:packet )?loss", text)
+    if m:
+        result["loss_percent"] = float(m.group(1))
+    m = re.search(r"= ([\d.]+)/([\d.]+)/([\d.]+)", text)
+    if m:
+        result["rtt_min_ms"], result["rtt_avg_ms"], result["rtt_max_ms"] = (float(g) for g in m.groups())
+    m = re.search(r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms", text)
+    if m:
+        result["rtt_min_ms"], result["rtt_max_ms"], result["rtt_avg_ms"] = (float(g) for g in m.groups())
+    return result
+
+async def _ping_one(host, count, timeout):
+    """Pings one host through an asyncio subprocess, killing it after timeout seconds."""
+    import asyncio
+    try:
+        proc = await asyncio.create_subprocess_exec(*_ping_command(host, count),
+                                                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    except OSError as e:
+        return {"host": host, "status": "error", "error": str(e)}
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {"host": host, "status": "timeout"}
+    result = {"host": host}
+    result.update(_parse_ping_output(stdout.decode(errors="replace")))
+    if result["received"]:
+        result["status"] = "up"
+    elif result["transmitted"] is not None:
+        result["status"] = "down"
+    else:
+        result["status"] = "error"
+        result["error"] = (stderr or stdout).decode(errors="replace").strip()
+    return result
+
+def _expand_hosts(specs):
+    """Expands host names, addresses and CIDR ranges (e.g. 127.0.0.0/30) into an iterator of hosts.
+
+    All specs are validated upfront, but the addresses of a range are only
+    generated as the sweep consumes them, so a /8 or an IPv6 /64 costs no memory.
+    """
+    import ipaddress
+    import itertools
+    parts = []
+    for spec in specs:
+        if "/" in spec:
+            network = ipaddress.ip_network(spec, strict=False)
+            parts.append(map(str, network.hosts() if network.num_addresses > 2 else network))
+        else:
+            parts.append([spec])
+    return itertools.chain.from_iterable(parts)
+
+def ping_hosts(specs, count=1, timeout=5.0, concurrency=64, as_json=False):
+    """Pings many hosts concurrently and prints a summary table, or one JSON object per host.
+
+    A fixed pool of concurrency worker coroutines takes hosts from a shared
+    iterator, so no task exists for a host before a worker is free for it.
+    Results are printed in input order as soon as all earlier hosts are done.
+    """
+    import asyncio
+    import json
+    import shutil
+    try:
+        hosts = _expand_hosts(specs)
+        if shutil.which("ping") is None:
+            _print_error("Error: 'ping' command not found. Make sure it's in your system's PATH.")
+            return
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "-"
+
+        def emit(r):
+            if as_json:
+                print(json.dumps(r))
+            else:
+                print(f"{r['host']:<40} {r['status']:<8} {fmt(r.get('loss_percent'), '.0f'):>6} "
+                      f"{fmt(r.get('rtt_min_ms'), '.3f'):>9} {fmt(r.get('rtt_avg_ms'), '.3f'):>9} {fmt(r.get('rtt_max_ms'), '.3f'):>9}")
+
+        pending = enumerate(hosts)
+        finished = {}
+        totals = {"next": 0, "up": 0}
+
+        async def worker():
+            for index, host in pending:
+                try:
+                    result = await _ping_one(host, count, timeout)
+                except Exception as e:
+                    result = {"host": host, "status": "error", "error": str(e)}
+                finished[index] = result
+                # Results that arrive out of order wait here until the hosts before them are done.
+                while totals["next"] in finished:
+                    r = finished.pop(totals["next"])
+                    totals["next"] += 1
+                    totals["up"] += r["status"] == "up"
+                    emit(r)
+
+        async def sweep():
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+        if not as_json:
+            print(f"{'HOST':<40} {'STATUS':<8} {'LOSS%':>6} {'MIN ms':>9} {'AVG ms':>9} {'MAX ms':>9}")
+        asyncio.run(sweep())
+        if not as_json:
+            print(f"{totals['up']} of {totals['next']} hosts up.")
+    except ValueError as e:
+        _print_error(f"Error: {e}")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+DISK_USAGE_TIMEOUT = 2.0
+
+class _DiskProbe:
+    """A long-lived worker thread that measures the disk usage of one mount point on request.
+
+    A new measurement is only started once the previous one has finished, so a
+    hung mount (e.g. a dead NFS server) ties up this one thread instead of
+    leaking a thread per sample.
+    """
+
+    def __init__(self, mountpoint):
+        import threading
+        self.mountpoint = mountpoint
+        self._wake = threading.Event()
+        self._done = threading.Event()
+        self._done.set()
+        self._result = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        import psutil
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                usage = psutil.disk_usage(self.mountpoint)
+                result = {"total": usage.total, "used": usage.used, "free": usage.free, "percent": usage.percent}
+            except Exception as e:
+                result = {"error": str(e)}
+            self._result = result
+            self._done.set()
+
+    def start(self):
+        """Starts a measurement; returns False if the previous one is still outstanding."""
+        if not self._done.is_set():
+            return False
+        self._done.clear()
+        self._wake.set()
+        return True
+
+    def wait(self, timeout):
+        """Returns the result of the current measurement, or None if it is not done within timeout."""
+        return self._result if self._done.wait(timeout) else None
+
+_disk_probes = {}
+
+def _disk_usages(timeout=DISK_USAGE_TIMEOUT):
+    """Returns disk usage per mounted partition, querying all mounts concurrently.
+
+    Each mount has one _DiskProbe worker, so a hung mount costs at most timeout
+    seconds and is reported with "timeout": True; while its measurement is still
+    outstanding, later samples skip the mount instead of queuing another one.
+    """
+    import psutil
+    import time
+    started = []
+    results = []
+    for part in psutil.disk_partitions():
+        entry = {"device": part.device, "mountpoint": part.mountpoint}
+        results.append(entry)
+        probe = _disk_probes.get(part.mountpoint)
+        if probe is None:
+            probe = _disk_probes[part.mountpoint] = _DiskProbe(part.mountpoint)
+        if probe.start():
+            started.append((probe, entry))
+        else:
+            entry["timeout"] = True
+    deadline = time.monotonic() + timeout
+    for probe, entry in started:
+        result = probe.wait(max(0.0, deadline - time.monotonic()))
+        if result is None:
+            entry["timeout"] = True
+        else:
+            entry.update(result)
+    return results
+
+def _read_counters():
+    """Reads the cumulative counters that rates are computed from, without the slower disk queries."""
+    import psutil
+    import time
+    net = psutil.net_io_counters()
+    disk_io = psutil.disk_io_counters()
+    return {
+        "timestamp": time.time(),
+        "cpu": {"times": psutil.cpu_times()._asdict()},
+        "network": {"bytes_sent": net.bytes_sent, "bytes_recv": net.bytes_recv,
+                    "packets_sent": net.packets_sent, "packets_recv": net.packets_recv},
+        "disk_io": {"read_bytes": disk_io.read_bytes, "write_bytes": disk_io.write_bytes} if disk_io else {},
+    }
+
+def _cpu_total(times):
+    """Total CPU time of a cpu_times dict; guest time is already part of user time on Linux, as in psutil."""
+    return sum(times.values()) - times.get("guest", 0) - times.get("guest_nice", 0)
+
+def _collect_metrics(previous=None, disk_timeout=DISK_USAGE_TIMEOUT):
+    """Takes one metrics sample; CPU usage and byte rates are computed from counter deltas against previous.
+
+    previous may be an earlier sample or a _read_counters() result.
+    """
+    import psutil
+    mem = psutil.virtual_memory()
+    counters = _read_counters()
+    sample = {
+        "timestamp": counters["timestamp"],
+        "cpu": {
+            "physical_cores": psutil.cpu_count(logical=False),
+            "logical_cores": psutil.cpu_count(logical=True),
+            "times": counters["cpu"]["times"],
+            "percent": None,
+        },
+        "memory": {"total": mem.total, "available": mem.available, "used": mem.used, "percent": mem.percent},
+        "disks": _disk_usages(disk_timeout),
+        "network": counters["network"],
+        "disk_io": counters["disk_io"],
+        "rates": {},
+    }
+    if previous is not None:
+        elapsed = sample["timestamp"] - previous["timestamp"]
+        times = sample["cpu"]["times"]
+        old_times = previous["cpu"]["times"]
+        total = _cpu_total(times) - _cpu_total(old_times)
+        idle = sum(times.get(k, 0) - old_times.get(k, 0) for k in ("idle", "iowait"))
+        if total > 0:
+            sample["cpu"]["percent"] = round(100.0 * max(0.0, min(total, total - idle)) / total, 1)
+        if elapsed > 0:
+            for group in ("network", "disk_io"):
+                for key, value in sample[group].items():
+                    if key in previous[group]:
+                        sample["rates"][f"{group}_{key}_per_second"] = (value - previous[group][key]) / elapsed
+    return sample
+
+class MetricsSampler:
+    """Samples system metrics in a background thread every interval seconds.
+
+    latest() never blocks on a measurement; on_sample, if given, is called with
+    each new sample from the sampler thread.
+    """
+
+    def __init__(self, interval=5.0, disk_timeout=DISK_USAGE_TIMEOUT, on_sample=None):
+        import threading
+        self.interval = interval
+        self.disk_timeout = disk_timeout
+        self.on_sample = on_sample
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._latest = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def _run(self):
+        previous = _read_counters()
+        while not self._stop.wait(self.interval):
+            sample = _collect_metrics(previous, self.disk_timeout)
+            with self._lock:
+                self._latest = sample
+            previous = sample
+            if self.on_sample is not None:
+                self.on_sample(sample)
+
+def _prometheus_label(value):
+    """Escapes a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_prometheus(sample):
+    """Renders a metrics sample in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name, kind, help_text, values):
+        lines.append(f"# HELP my_cli_tool_{name} {help_text}")
+        lines.append(f"# TYPE my_cli_tool_{name} {kind}")
+        for labels, value in values:
+            if value is None:
+                continue
+            label_text = ",".join(f'{k}="{_prometheus_label(v)}"' for k, v in labels.items())
+            lines.append(f"my_cli_tool_{name}{{{label_text}}} {value}" if label_text else f"my_cli_tool_{name} {value}")
+
+    metric("cpu_percent", "gauge", "CPU utilisation over the last sampling interval.", [({}, sample["cpu"]["percent"])])
+    metric("cpu_cores", "gauge", "Number of CPU cores.",
+           [({"kind": "physical"}, sample["cpu"]["physical_cores"]), ({"kind": "logical"}, sample["cpu"]["logical_cores"])])
+    metric("memory_bytes", "gauge", "Memory in bytes.",
+           [({"kind": k}, sample["memory"][k]) for k in ("total", "available", "used")])
+    disks = [d for d in sample["disks"] if "total" in d]
+    metric("disk_bytes", "gauge", "Disk space per mount in bytes.",
+           [({"device": d["device"], "mountpoint": d["mountpoint"], "kind": k}, d[k]) for d in disks for k in ("total", "used", "free")])
+    metric("disk_usage_timeout", "gauge", "1 if the mount did not answer within the timeout.",
+           [({"device": d["device"], "mountpoint": d["mountpoint"]}, int(d.get("timeout", False))) for d in sample["disks"]])
+    metric("network_bytes_total", "counter", "Network bytes since boot.",
+           [({"direction": "sent"}, sample["network"]["bytes_sent"]), ({"direction": "received"}, sample["network"]["bytes_recv"])])
+    metric("disk_io_bytes_total", "counter", "Disk I/O bytes since boot.",
+           [({"direction": k.split("_")[0]}, v) for k, v in sample["disk_io"].items()])
+    metric("rate_per_second", "gauge", "Per-second rates computed from counter deltas.",
+           [({"counter": k[:-len("_per_second")]}, round(v, 3)) for k, v in sample["rates"].items()])
+    return "\n".join(lines) + "\n"
+
+def display_sysinfo(window=0.2, as_json=False, disk_timeout=DISK_USAGE_TIMEOUT):
+    """Displays detailed system information (CPU, memory, disk, network).
+
+    Rates are measured over a short window instead of blocking for a full second;
+    only the counters are read at its start, the full sample is taken once at its end.
+    """
+    import json
+    import time
+    first = _read_counters()
+    time.sleep(window)
+    sample = _collect_metrics(first, disk_timeout)
+    if as_json:
+        print(json.dumps(sample, indent=2))
+        return
+    print("\n--- System Information ---")
+    cpu = sample["cpu"]
+    print(f"CPU Cores: {cpu['physical_cores']} (Physical), {cpu['logical_cores']} (Logical)")
+    print(f"CPU Usage: {cpu['percent']}%")
+    mem = sample["memory"]
+    print(f"Total Memory: {mem['total'] / (1024**3):.2f} GB")
+    print(f"Available Memory: {mem['available'] / (1024**3):.2f} GB")
+    print(f"Used Memory: {mem['used'] / (1024**3):.2f} GB ({mem['percent']}%) ")
+    print("\n--- Disk Usage ---")
+    for d in sample["disks"]:
+        if "total" in d:
+            print(f"  {d['device']} ({d['mountpoint']}): Total={d['total'] / (1024**3):.2f} GB, Used={d['used'] / (1024**3):.2f} GB, Free={d['free'] / (1024**3):.2f} GB ({d['percent']}%) ")
+        elif d.get("timeout"):
+            print(f"  {d['device']} ({d['mountpoint']}): no answer within {disk_timeout:g}s")
+    print("\n--- Network Info ---")
+    net = sample["network"]
+    rates = sample["rates"]
+    print(f"Bytes Sent: {net['bytes_sent'] / (1024**2):.2f} MB ({rates.get('network_bytes_sent_per_second', 0) / 1024:.1f} KB/s)")
+    print(f"Bytes Received: {net['bytes_recv'] / (1024**2):.2f} MB ({rates.get('network_bytes_recv_per_second', 0) / 1024:.1f} KB/s)")
+    print("--------------------------")
+
+def export_metrics(prom_path, interval=15.0, disk_timeout=DISK_USAGE_TIMEOUT):
+    """Runs the background sampler and rewrites a Prometheus text file atomically after every sample."""
+    import threading
+    def write(sample):
+        try:
+            _atomic_write(prom_path, _format_prometheus(sample).encode())
+        except OSError as e:
+            _print_error(f"Error writing '{prom_path}': {e}", file=sys.stderr)
+    sampler = MetricsSampler(interval, disk_timeout, on_sample=write)
+    sampler.start()
+    print(f"Writing metrics to '{prom_path}' every {interval:g}s (Press Ctrl+C to stop).")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+class _Inotify:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask):
+        """Watches a path and returns the watch descriptor."""
+        import ctypes
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def remove_watch(self, wd):
+        """Stops watching a watch descriptor."""
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self):
+        """Returns the pending events as (wd, mask, cookie, name) tuples."""
+        import struct
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos < len(data):
+                wd, mask, cookie, length = struct.unpack_from("iIII", data, pos)
+                pos += 16
+                name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((wd, mask, cookie, name))
+
+    def close(self):
+        os.close(self.fd)
+
+def _read_last_lines(f, lines):
+    """Returns the last N lines of a binary file by scanning backwards in blocks."""
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    data = b""
+    # A trailing newline terminates the last line rather than starting a new one.
+    needed = lines + 1
+    while pos > 0 and data.count(b"\n") < needed:
+        step = min(TAIL_BLOCK_SIZE, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    f.seek(end)
+    if lines <= 0:
+        return b""
+    parts = data.split(b"\n")
+    if data.endswith(b"\n"):
+        return b"\n".join(parts[-lines - 1:])
+    return b"\n".join(parts[-lines:])
+
+class _Follower:
+    """Follows one file by path, reopening it after rotation and rewinding after truncation."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self._open()
+
+    def _open(self):
+        try:
+            self.file = open(self.path, 'rb')
+            self.inode = os.fstat(self.file.fileno()).st_ino
+        except FileNotFoundError:
+            self.file = None
+            self.inode = None
+
+    def read_new(self):
+        """Returns the data appended since the last call, handling rotation and truncation."""
+        data = b""
+        if self.file is None:
+            self._open()
+            if self.file is None:
+                return data
+            return self.file.read()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_ino == self.inode and st.st_size < self.file.tell():
+            self.file.seek(0)
+        data = self.file.read()
+        if st is None or st.st_ino != self.inode:
+            # Rotated or removed: drain the old file, then switch to the new one.
+            self.file.close()
+            self._open()
+            if self.file is not None:
+                data += self.file.read()
+        return data
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def tail_files(paths, lines=10, follow=False, poll_interval=1.0):
+    """Displays the last N lines of one or more files, and optionally follows new lines.
+
+    Following uses inotify where available and falls back to polling; rotated
+    or truncated files are reopened.
+    """
+    import select
+    import time
+    out = sys.stdout.buffer
+    followers = []
+    last_header = None
+    inotify = None
+    try:
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    if len(paths) > 1:
+                        separator = "" if last_header is None else "\n"
+                        out.write(f"{separator}==> {path} <==\n".encode())
+                        last_header = path
+                    out.write(_read_last_lines(f, lines))
+            except FileNotFoundError:
+                _print_error(f"Error: File '{path}' not found.")
+                if not follow:
+                    continue
+            except IsADirectoryError:
+                _print_error(f"Error: '{path}' is a directory, not a file.")
+                continue
+            if follow:
+                follower = _Follower(path)
+                if follower.file is not None:
+                    follower.file.seek(0, os.SEEK_END)
+                followers.append(follower)
+        out.flush()
+        if not followers:
+            return
+
+        print(f"\n--- Following new lines in {', '.join(repr(p) for p in paths)} (Press Ctrl+C to stop) ---", flush=True)
+        try:
+            inotify = _Inotify()
+            mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            for directory in {os.path.dirname(os.path.abspath(f.path)) for f in followers}:
+                inotify.add_watch(directory, mask)
+        except (OSError, AttributeError):
+            if inotify is not None:
+                inotify.close()
+            inotify = None
+        while True:
+            if inotify is not None:
+                # The timeout is only a safety net; events normally wake us immediately.
+                ready, _, _ = select.select([inotify], [], [], poll_interval)
+                if ready:
+                    inotify.read_events()
+            else:
+                time.sleep(poll_interval)
+            for follower in followers:
+                data = follower.read_new()
+                if data:
+                    if len(followers) > 1 and last_header != follower.path:
+                        out.write(f"\n==> {follower.path} <==\n".encode())
+                        last_header = follower.path
+                    out.write(data)
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+    finally:
+        for follower in followers:
+            follower.close()
+        if inotify is not None:
+            inotify.close()
+
+def tail_file(path, lines=10, follow=False):
+    """Displays the last N lines of a file, and optionally follows new lines."""
+    tail_files([path], lines=lines, follow=follow)
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+WATCH_RESCAN_INTERVAL = 30.0
+
+class _TreeModel:
+    """In-memory model of a directory tree for 'watch': file names and sizes per directory, with subtree totals.
+
+    Directories are keyed by their path relative to the root ("" is the root).
+    Totals are kept up to date by propagating each size change to the
+    ancestors, so du answers are a dictionary lookup. Like du, only regular
+    files are counted; unlike du, hard links are counted once per link.
+    """
+
+    def __init__(self, root, inotify=None):
+        self.root = os.path.abspath(root)
+        self.inotify = inotify
+        self.dirs = {}
+        self.wds = {}
+        self.rescans = 0
+
+    def _abs(self, rel):
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _propagate(self, rel, delta):
+        """Adds delta to the total of a directory and all of its ancestors."""
+        while True:
+            self.dirs[rel]["total"] += delta
+            if not rel:
+                return
+            rel = os.path.dirname(rel)
+
+    def rescan(self):
+        """Rebuilds the whole model from disk, e.g. after the inotify queue overflowed."""
+        self.dirs = {}
+        self.wds = {}
+        self._add_tree("")
+        self.rescans += 1
+
+    def _add_tree(self, rel):
+        """Scans a directory subtree into the model, watching each directory before listing it."""
+        scanned = []
+        stack = [rel]
+        while stack:
+            dir_rel = stack.pop()
+            node = {"files": {}, "subdirs": set(), "total": 0, "wd": None}
+            try:
+                if self.inotify is not None:
+                    node["wd"] = self.inotify.add_watch(self._abs(dir_rel), WATCH_MASK)
+                    self.wds[node["wd"]] = dir_rel
+                with os.scandir(self._abs(dir_rel)) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                node["subdirs"].add(entry.name)
+                            elif entry.is_file(follow_symlinks=False):
+                                node["files"][entry.name] = entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError:
+                if dir_rel == rel:
+                    return
+                continue
+            self.dirs[dir_rel] = node
+            scanned.append(dir_rel)
+            stack.extend(os.path.join(dir_rel, name) for name in node["subdirs"])
+        # Pre-order reversed visits children before their parents.
+        for dir_rel in reversed(scanned):
+            node = self.dirs[dir_rel]
+            node["subdirs"] = {name for name in node["subdirs"] if os.path.join(dir_rel, name) in self.dirs}
+            node["total"] = sum(node["files"].values()) + sum(self.dirs[os.path.join(dir_rel, name)]["total"] for name in node["subdirs"])
+        if rel:
+            parent = os.path.dirname(rel)
+            self.dirs[parent]["subdirs"].add(os.path.basename(rel))
+            self._propagate(parent, self.dirs[rel]["total"])
+
+    def _remove_tree(self, rel):
+        """Drops a directory subtree from the model and stops watching it."""
+        node = self.dirs.get(rel)
+        if node is None:
+            return
+        parent = os.path.dirname(rel)
+        self.dirs[parent]["subdirs"].discard(os.path.basename(rel))
+        self._propagate(parent, -node["total"])
+        stack = [rel]
+        while stack:
+            dir_rel = stack.pop()
+            node = self.dirs.pop(dir_rel)
+            if node["wd"] is not None:
+                self.wds.pop(node["wd"], None)
+                self.inotify.remove_watch(node["wd"])
+            stack.extend(os.path.join(dir_rel, name) for name in node["subdirs"])
+
+    def _update_file(self, dir_rel, name):
+        """Re-stats one directory entry and applies its size change."""
+        import stat
+        node = self.dirs.get(dir_rel)
+        if node is None:
+            return
+        try:
+            st = os.lstat(os.path.join(self._abs(dir_rel), name))
+            size = st.st_size if stat.S_ISREG(st.st_mode) else None
+        except OSError:
+            size = None
+        old = node["files"].get(name)
+        if size is None:
+            if old is not None:
+                del node["files"][name]
+                self._propagate(dir_rel, -old)
+        elif size != old:
+            node["files"][name] = size
+            self._propagate(dir_rel, size - (old or 0))
+
+    def apply_events(self, events):
+        """Applies a batch of inotify events; files touched several times are only re-stated once."""
+        touched = set()
+        for wd, mask, _, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self.rescan()
+                return
+            dir_rel = self.wds.get(wd)
+            if dir_rel is None:
+                continue
+            if mask & IN_IGNORED:
+                self.wds.pop(wd, None)
+                continue
+            if not name:
+                continue
+            rel = os.path.join(dir_rel, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and rel not in self.dirs:
+                    self._add_tree(rel)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._remove_tree(rel)
+            else:
+                touched.add((dir_rel, name))
+        for dir_rel, name in touched:
+            self._update_file(dir_rel, name)
+
+    def relative(self, path):
+        """Maps a path given by a client (absolute, or relative to the root) to a model key."""
+        path = os.path.normpath(os.path.join(self.root, path))
+        rel = os.path.relpath(path, self.root)
+        if rel == os.curdir:
+            return ""
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            raise ValueError(f"'{path}' is outside the watched tree '{self.root}'.")
+        return rel
+
+    def query(self, request):
+        """Answers one client request dict; returns the response dict."""
+        op = request.get("op")
+        if op == "du":
+            rel = self.relative(request.get("path", ""))
+            node = self.dirs.get(rel)
+            if node is None:
+                parent = self.dirs.get(os.path.dirname(rel))
+                size = parent["files"].get(os.path.basename(rel)) if parent else None
+                if size is None:
+                    raise ValueError(f"'{self._abs(rel)}' not found.")
+                return {"ok": True, "path": self._abs(rel), "size": size, "children": {}}
+            children = {name: self.dirs[os.path.join(rel, name)]["total"] for name in sorted(node["subdirs"])}
+            return {"ok": True, "path": self._abs(rel), "size": node["total"], "children": children}
+        if op == "find":
+            matches = _compile_name_matcher(request["term"], request.get("mode", "substring"))
+            return {"ok": True, "matches": [os.path.join(self._abs(dir_rel), name)
+                                            for dir_rel, node in self.dirs.items()
+                                            for name in node["files"] if matches(name)]}
+        if op == "status":
+            return {"ok": True, "root": self.root, "dirs": len(self.dirs),
+                    "files": sum(len(node["files"]) for node in self.dirs.values()),
+                    "size": self.dirs[""]["total"], "inotify": self.inotify is not None, "rescans": self.rescans}
+        raise ValueError(f"Unknown query '{op}'.")
+
+def _watch_socket_path(directory):
+    """Default Unix socket of the watch daemon for a directory."""
+    import hashlib
+    import tempfile
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    digest = hashlib.sha1(os.fsencode(os.path.abspath(directory))).hexdigest()[:12]
+    return os.path.join(runtime_dir, f"my_cli_tool-watch-{digest}.sock")
+
+def _watch_client_io(selector, conn, buffers, events, model, inotify):
+    """Reads requests from and writes responses to one non-blocking client connection."""
+    import json
+    import selectors
+    inbuf, outbuf = buffers
+    if events & selectors.EVENT_READ:
+        try:
+            data = conn.recv(64 * 1024)
+        except ConnectionError:
+            data = b""
+        if not data:
+            selector.unregister(conn)
+            conn.close()
+            return False
+        inbuf += data
+        if b"\n" in inbuf and inotify is not None:
+            # Answer from the freshest state: apply whatever is queued before replying.
+            model.apply_events(inotify.read_events())
+        while b"\n" in inbuf:
+            line, _, rest = bytes(inbuf).partition(b"\n")
+            inbuf[:] = rest
+            try:
+                response = model.query(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            outbuf += json.dumps(response).encode() + b"\n"
+    if outbuf:
+        try:
+            sent = conn.send(outbuf)
+            del outbuf[:sent]
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            selector.unregister(conn)
+            conn.close()
+            return False
+    selector.modify(conn, selectors.EVENT_READ | (selectors.EVENT_WRITE if outbuf else 0), "client")
+    return True
+
+def watch_directory(directory, socket_path=None, interval=WATCH_RESCAN_INTERVAL):
+    """Keeps an in-memory model of a directory tree up to date and serves du/find queries on a Unix socket.
+
+    Changes arrive through inotify; when the event queue overflows the tree
+    is rescanned. Without inotify the tree is rescanned every interval
+    seconds. Requests and responses are JSON lines.
+    """
+    import selectors
+    import socket
+    import time
+    socket_path = socket_path or _watch_socket_path(directory)
+    inotify = None
+    server = None
+    selector = selectors.DefaultSelector()
+    clients = {}
+    try:
+        if not os.path.isdir(directory):
+            _print_error(f"Error: '{directory}' is not a directory.")
+            return
+        try:
+            inotify = _Inotify()
+        except (OSError, AttributeError):
+            print(f"Note: inotify is not available; rescanning every {interval:g}s instead.")
+        model = _TreeModel(directory, inotify)
+        model.rescan()
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+                _print_error(f"Error: A watch daemon is already listening on '{socket_path}'.")
+                return
+            except OSError:
+                os.unlink(socket_path)
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen(64)
+        server.setblocking(False)
+        selector.register(server, selectors.EVENT_READ, "accept")
+        if inotify is not None:
+            selector.register(inotify, selectors.EVENT_READ, "inotify")
+        status = model.query({"op": "status"})
+        print(f"Watching '{directory}': {status['dirs']} directories, {status['files']} files, {status['size']} bytes. "
+              f"Listening on '{socket_path}' (Press Ctrl+C to stop).", flush=True)
+        next_rescan = time.monotonic() + interval
+        while True:
+            timeout = None if inotify is not None else max(0.0, next_rescan - time.monotonic())
+            for key, events in selector.select(timeout):
+                if key.data == "accept":
+                    conn, _ = server.accept()
+                    conn.setblocking(False)
+                    clients[conn] = (bytearray(), bytearray())
+                    selector.register(conn, selectors.EVENT_READ, "client")
+                elif key.data == "inotify":
+                    model.apply_events(inotify.read_events())
+                elif not _watch_client_io(selector, key.fileobj, clients[key.fileobj], events, model, inotify):
+                    del clients[key.fileobj]
+            if inotify is None and time.monotonic() >= next_rescan:
+                model.rescan()
+                next_rescan = time.monotonic() + interval
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+    finally:
+        for conn in clients:
+            conn.close()
+        selector.close()
+        if server is not None:
+            server.close()
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
+        if inotify is not None:
+            inotify.close()
+
+def query_watch(directory, request, socket_path=None):
+    """Sends one query to the watch daemon of a directory and prints the answer like du or find would."""
+    import json
+    import socket
+    socket_path = socket_path or _watch_socket_path(directory)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(socket_path)
+            conn.sendall(json.dumps(request).encode() + b"\n")
+            response = bytearray()
+            while not response.endswith(b"\n"):
+                data = conn.recv(64 * 1024)
+                if not data:
+                    break
+                response += data
+        response = json.loads(response)
+        if not response.get("ok"):
+            _print_error(f"Error: {response.get('error')}")
+        elif request["op"] == "du":
+            for name, size in response["children"].items():
+                print(f"  {size:>15} bytes  {name}/")
+            print(f"Size of '{response['path']}': {response['size']} bytes")
+        elif request["op"] == "find":
+            with _RecordWriter() as out:
+                for path in response["matches"]:
+                    if out.count == 0:
+                        out.header(f"Found files matching '{request['term']}' in '{directory}':")
+                    out.write({"path": path}, lambda r: f"- {r['path']}")
+                if out.count == 0:
+                    out.header(f"No files matching '{request['term']}' found in '{directory}'.")
+        else:
+            for key, value in response.items():
+                if key != "ok":
+                    print(f"{key}: {value}")
+    except (FileNotFoundError, ConnectionRefusedError):
+        _print_error(f"Error: No watch daemon is running for '{directory}' (socket '{socket_path}').")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def display_env_vars():
+    """Displays all environment variables."""
+    print("\n--- Environment Variables ---")
+    for key, value in os.environ.items():
+        print(f"{key}={value}")
+    print("-----------------------------")
+
+def set_env_var(key, value):
+    """Sets an environment variable."""
+    try:
+        os.environ[key] = value
+    except (OSError, ValueError) as e:
+        _print_error(f"Error: Cannot set environment variable '{key}': {e}")
+        return
+    print(f"Environment variable '{key}' set to '{value}'.")
+
+def unset_env_var(key):
+    """Deletes an environment variable."""
+    if key in os.environ:
+        del os.environ[key]
+        print(f"Environment variable '{key}' deleted.")
+    else:
+        _print_error(f"Error: Environment variable '{key}' not found.")
+
+class _ParallelGzipWriter:
+    """Write-only file object producing a standard gzip stream, compressed pigz-style on a thread pool.
+
+    Input is cut into fixed-size blocks that are deflated concurrently, each
+    primed with the last 32 KiB of the previous block, and joined into a
+    single deflate stream that any gzip reader accepts. With independent=True
+    blocks are not primed, so decompression can start at any block boundary;
+    checkpoints then lists (compressed_offset, uncompressed_offset) per block.
+    """
+
+    def __init__(self, fileobj, level=6, jobs=None, block_size=DEFLATE_BLOCK_SIZE, independent=False):
+        import struct
+        import time
+        self._fileobj = fileobj
+        self._block_size = block_size
+        self._independent = independent
+        self._pending = bytearray()
+        self._previous = None
+        self._crc = 0
+        self._size = 0
+        self._written = 0
+        self.checkpoints = []
+        self._compressor = _BlockCompressor(level, jobs, self._write_block)
+        xfl = 2 if level == 9 else 4 if level == 1 else 0
+        self._write_block(b"\x1f\x8b\x08\x00" + struct.pack("<I", int(time.time())) + bytes([xfl, 255]), None)
+
+    def _write_block(self, data, uncompressed_offset):
+        if uncompressed_offset is not None and self._independent:
+            self.checkpoints.append((self._written, uncompressed_offset))
+        self._fileobj.write(data)
+        self._written += len(data)
+
+    def write(self, data):
+        self._pending += data
+        while len(self._pending) >= self._block_size:
+            block = bytes(self._pending[:self._block_size])
+            del self._pending[:self._block_size]
+            self._submit(block, last=False)
+        return len(data)
+
+    def _submit(self, block, last):
+        import zlib
+        offset = self._size
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        self._compressor.submit(block, None if self._independent else self._previous, last, offset)
+        self._previous = block[-DEFLATE_DICT_SIZE:]
+
+    def close(self):
+        import struct
+        self._submit(bytes(self._pending), last=True)
+        self._pending = bytearray()
+        self._compressor.finish()
+        self._write_block(struct.pack("<II", self._crc, self._size & 0xFFFFFFFF), None)
+
+def _tar_paths(path, arcname):
+    """Yields (path, arcname) for a file or directory tree in the order tarfile.add would store it."""
+    yield path, arcname
+    if os.path.isdir(path) and not os.path.islink(path):
+        for name in sorted(os.listdir(path)):
+            yield from _tar_paths(os.path.join(path, name), f"{arcname}/{name}")
+
+ARCHIVE_INDEX_SUFFIX = ".idx"
+
+def create_tar_gz(source_path, output_filename, level=6, jobs=None, index=False):
+    """Compresses a file or directory into a .tar.gz archive, using all cores for compression.
+
+    With index=True, a sidecar '<archive>.idx' records gzip checkpoints and
+    member offsets so single members can later be extracted without
+    decompressing everything before them.
+    """
+    import json
+    import tarfile
+    try:
+        if not os.path.lexists(source_path):
+            raise FileNotFoundError(source_path)
+        members = []
+        with open(output_filename, 'wb') as raw:
+            writer = _ParallelGzipWriter(raw, level=level, jobs=jobs, independent=index)
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                for path, arcname in _tar_paths(source_path, os.path.basename(source_path)):
+                    header_offset = tar.offset
+                    tarinfo = tar.gettarinfo(path, arcname)
+                    if tarinfo.isreg():
+                        with open(path, 'rb') as f:
+                            tar.addfile(tarinfo, f)
+                    else:
+                        tar.addfile(tarinfo)
+                    if index:
+                        data_blocks = (tarinfo.size + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE if tarinfo.isreg() else 0
+                        members.append({
+                            "name": tarinfo.name,
+                            "type": "file" if tarinfo.isreg() else "dir" if tarinfo.isdir() else "symlink" if tarinfo.issym() else "other",
+                            "size": tarinfo.size if tarinfo.isreg() else 0,
+                            "mode": tarinfo.mode,
+                            "mtime": tarinfo.mtime,
+                            "offset": header_offset,
+                            "data_offset": tar.offset - data_blocks * tarfile.BLOCKSIZE,
+                        })
+            writer.close()
+        if index:
+            st = os.stat(output_filename)
+            sidecar = {"version": 1, "archive_size": st.st_size, "archive_mtime_ns": st.st_mtime_ns,
+                       "checkpoints": writer.checkpoints, "members": members}
+            _atomic_write(output_filename + ARCHIVE_INDEX_SUFFIX, json.dumps(sidecar).encode())
+        print(f"'{source_path}' compressed to '{output_filename}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Source '{source_path}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def _load_archive_index(archive_path):
+    """Returns the sidecar index of an archive, or None if it is missing or stale."""
+    import json
+    try:
+        with open(archive_path + ARCHIVE_INDEX_SUFFIX, 'r') as f:
+            index = json.load(f)
+        st = os.stat(archive_path)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != 1 or index["archive_size"] != st.st_size or index["archive_mtime_ns"] != st.st_mtime_ns:
+        return None
+    return index
+
+def _copy_indexed_member(archive_path, index, member, out):
+    """Streams one member's data out of an indexed .tar.gz, starting at the nearest gzip checkpoint."""
+    import bisect
+    import zlib
+    checkpoints = index["checkpoints"]
+    i = bisect.bisect_right([u for _, u in checkpoints], member["data_offset"]) - 1
+    compressed_offset, uncompressed_offset = checkpoints[i]
+    skip = member["data_offset"] - uncompressed_offset
+    remaining = member["size"]
+    decompressor = zlib.decompressobj(-15)
+    with open(archive_path, 'rb') as f:
+        f.seek(compressed_offset)
+        while remaining > 0:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError(f"'{archive_path}' ended before member '{member['name']}' was complete")
+            data = decompressor.decompress(chunk)
+            if skip:
+                dropped = min(skip, len(data))
+                data = data[dropped:]
+                skip -= dropped
+            if data:
+                data = data[:remaining]
+                out.write(data)
+                remaining -= len(data)
+
+def list_archive(archive_path):
+    """Lists the members of a .tar.gz or zip archive, using the sidecar index when there is one."""
+    import tarfile
+    import zipfile
+    try:
+        index = _load_archive_index(archive_path)
+        if index is not None:
+            for m in index["members"]:
+                print(f"{m['size']:>12}  {m['name']}{'/' if m['type'] == 'dir' else ''}")
+        elif zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as zf:
+                for info in zf.infolist():
+                    print(f"{info.file_size:>12}  {info.filename}")
+        else:
+            with tarfile.open(archive_path, "r|gz") as tar:
+                for tarinfo in tar:
+                    print(f"{tarinfo.size:>12}  {tarinfo.name}{'/' if tarinfo.isdir() else ''}")
+    except FileNotFoundError:
+        _print_error(f"Error: Archive '{archive_path}' not found.")
+    except tarfile.ReadError:
+        _print_error(f"Error: '{archive_path}' is not a valid .tar.gz or zip archive.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def extract_archive_member(archive_path, member_name, destination_path=None):
+    """Extracts a single member of an archive, streaming it straight to its destination ('-' for stdout).
+
+    Indexed .tar.gz archives are decompressed from the checkpoint nearest to the
+    member; other archives are scanned as a stream until the member is found.
+    """
+    import contextlib
+    import shutil
+    import tarfile
+    import zipfile
+    try:
+        if destination_path is None:
+            destination_path = os.path.basename(member_name)
+        elif os.path.isdir(destination_path):
+            destination_path = os.path.join(destination_path, os.path.basename(member_name))
+        to_stdout = destination_path == "-"
+
+        def open_destination():
+            if to_stdout:
+                sys.stdout.flush()
+                return contextlib.nullcontext(sys.stdout.buffer)
+            return open(destination_path, 'wb')
+
+        found = False
+        index = _load_archive_index(archive_path)
+        if index is not None:
+            member = next((m for m in index["members"] if m["name"] == member_name and m["type"] == "file"), None)
+            if member is not None:
+                found = True
+                with open_destination() as out:
+                    _copy_indexed_member(archive_path, index, member, out)
+        elif zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as zf:
+                if member_name in zf.namelist():
+                    found = True
+                    with zf.open(member_name) as src, open_destination() as out:
+                        shutil.copyfileobj(src, out, HASH_CHUNK_SIZE)
+        else:
+            with tarfile.open(archive_path, "r|gz") as tar:
+                for tarinfo in tar:
+                    if tarinfo.name == member_name and tarinfo.isreg():
+                        found = True
+                        with open_destination() as out:
+                            shutil.copyfileobj(tar.extractfile(tarinfo), out, HASH_CHUNK_SIZE)
+                        break
+        if not found:
+            _print_error(f"Error: Member '{member_name}' not found in '{archive_path}'.")
+        elif to_stdout:
+            sys.stdout.buffer.flush()
+        else:
+            print(f"'{member_name}' extracted from '{archive_path}' to '{destination_path}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Archive '{archive_path}' not found.")
+    except tarfile.ReadError:
+        _print_error(f"Error: '{archive_path}' is not a valid .tar.gz or zip archive.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def extract_tar_gz(source_path, destination_path):
+    """Decompresses a .tar.gz archive in a single streaming pass."""
+    import tarfile
+    try:
+        # Stream mode avoids the extra pass random-access mode makes to list members first.
+        with tarfile.open(source_path, "r|gz") as tar:
+            tar.extractall(path=destination_path)
+        print(f"'{source_path}' decompressed to '{destination_path}'.")
+    except FileNotFoundError:
+        _print_error(f"Error: Archive '{source_path}' not found.")
+    except tarfile.ReadError:
+        _print_error(f"Error: '{source_path}' is not a valid .tar.gz archive.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+CDC_MIN_SIZE = 16 * 1024
+CDC_AVG_SIZE = 64 * 1024
+CDC_MAX_SIZE = 256 * 1024
+# Normalized chunking: a stricter mask before the average size, a looser one after it.
+CDC_MASK_STRICT = ((1 << 18) - 1) << 14
+CDC_MASK_LOOSE = ((1 << 14) - 1) << 18
+CDC_READ_SIZE = 1024 * 1024
+# Positions hashed per step of _cdc_find; a boundary usually turns up within a few windows.
+CDC_SCAN_WINDOW = 16 * 1024
+# Each position's hash gets a 64-bit lane: the sum of 32 gear values shifted by 0..31 bits stays below 2**64.
+CDC_LANE_BYTES = 8
+_cdc_gear_table = None
+_cdc_gear_planes_table = None
+
+def _cdc_gear():
+    """The 256-entry gear table, derived from sha256 so chunk boundaries never change between versions."""
+    global _cdc_gear_table
+    if _cdc_gear_table is None:
+        import hashlib
+        _cdc_gear_table = tuple(int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "big") for i in range(256))
+    return _cdc_gear_table
+
+def _cdc_gear_planes():
+    """The gear table split into four bytes.translate tables, one per byte of the (little-endian) gear value."""
+    global _cdc_gear_planes_table
+    if _cdc_gear_planes_table is None:
+        gear = _cdc_gear()
+        _cdc_gear_planes_table = tuple(bytes((g >> (8 * k)) & 0xFF for g in gear) for k in range(4))
+    return _cdc_gear_planes_table
+
+def _cdc_find(buf, start, stop, mask):
+    """Returns the first position p in [start, stop) where the gear hash of buf[CDC_MIN_SIZE:p + 1] has no mask bits set, or -1.
+
+    The hash at p is sum(gear[buf[p - k]] << k for k < 32) mod 2**32, so it
+    only depends on the 32 bytes ending at p. Rather than rolling it byte by
+    byte, a window of gear values is packed into one integer, a lane per
+    position, and 5 shift-and-add doublings sum all 32 shifted terms into
+    every lane at once; the mask is then checked on whole byte planes with
+    translate and a single find, all at C speed.
+    """
+    planes = _cdc_gear_planes()
+    lane = CDC_LANE_BYTES
+    checks = [(k, m, None if m == 0xFF else bytes(x & m for x in range(256)))
+              for k, m in enumerate(mask.to_bytes(4, "little")) if m]
+    for lo in range(start, stop, CDC_SCAN_WINDOW):
+        hi = min(lo + CDC_SCAN_WINDOW, stop)
+        ctx = max(CDC_MIN_SIZE, lo - 31)
+        data = bytes(buf[ctx:hi])
+        lanes = len(data)
+        packed = bytearray(lane * lanes)
+        for k in range(4):
+            packed[k::lane] = data.translate(planes[k])
+        h = int.from_bytes(packed, "little")
+        # Lane j gains lane j - k shifted left by k, for every k < 32.
+        shift = lane * 8 + 1
+        for _ in range(5):
+            h += h << shift
+            shift *= 2
+        hashes = h.to_bytes(lane * (lanes + 31), "little")
+        acc = 0
+        for k, m, table in checks:
+            plane = hashes[k:lane * lanes:lane]
+            acc |= int.from_bytes(plane if table is None else plane.translate(table), "little")
+        hit = acc.to_bytes(lanes, "little").find(0, lo - ctx)
+        if hit >= 0:
+            return ctx + hit
+    return -1
+
+def _cdc_cut(buf):
+    """Returns the length of the next content-defined chunk at the start of buf.
+
+    A gear rolling hash is run from CDC_MIN_SIZE on (the bytes before it can
+    never hold a boundary, so they are not hashed at all) and a boundary is
+    cut where the masked hash bits are zero, or at CDC_MAX_SIZE.
+    """
+    n = min(len(buf), CDC_MAX_SIZE)
+    if n <= CDC_MIN_SIZE:
+        return n
+    normal = min(CDC_AVG_SIZE, n)
+    p = _cdc_find(buf, CDC_MIN_SIZE, normal, CDC_MASK_STRICT)
+    if p < 0:
+        p = _cdc_find(buf, normal, n, CDC_MASK_LOOSE)
+    return p + 1 if p >= 0 else n
+
+def _iter_cdc_chunks(f):
+    """Yields the content-defined chunks of a binary file object."""
+    buf = bytearray()
+    eof = False
+    while True:
+        while not eof and len(buf) < CDC_MAX_SIZE:
+            data = f.read(CDC_READ_SIZE)
+            eof = not data
+            buf += data
+        if not buf:
+            return
+        cut = _cdc_cut(memoryview(buf))
+        yield bytes(buf[:cut])
+        del buf[:cut]
+
+def _chunk_path(store, digest):
+    """Where a chunk with the given hex digest lives in a snapshot store."""
+    return os.path.join(store, "chunks", digest[:2], digest)
+
+def _store_file_chunks(path, store):
+    """Splits one file into chunks and stores the ones the store does not have yet.
+
+    Returns (digests, new_chunks, new_bytes, bytes_read). Runs in a worker
+    process; chunk writes are atomic, so concurrent writers of the same chunk
+    are harmless.
+    """
+    import hashlib
+    digests = []
+    new_chunks = 0
+    new_bytes = 0
+    bytes_read = 0
+    with open(path, 'rb') as f:
+        for chunk in _iter_cdc_chunks(f):
+            digest = hashlib.sha256(chunk).hexdigest()
+            digests.append(digest)
+            bytes_read += len(chunk)
+            chunk_path = _chunk_path(store, digest)
+            if not os.path.exists(chunk_path):
+                os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                _atomic_write(chunk_path, chunk)
+                new_chunks += 1
+                new_bytes += len(chunk)
+    return digests, new_chunks, new_bytes, bytes_read
+
+def _snapshot_entries(source):
+    """Yields (relative_path, DirEntry) for every entry below source, sorted, without following symlinks."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(source, rel_dir)) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            rel = os.path.join(rel_dir, entry.name)
+            yield rel, entry
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(rel)
+        stack.extend(reversed(subdirs))
+
+def _load_snapshots(store):
+    """Returns all snapshot manifests in a store, oldest first.
+
+    Manifests are ordered by their sequence number and creation time, not by
+    file name: IDs of snapshots taken within the same second get a numeric
+    suffix, and "ID-10" sorts before "ID-2" as a string.
+    """
+    import json
+    manifests = []
+    snapshot_dir = os.path.join(store, "snapshots")
+    try:
+        names = os.listdir(snapshot_dir)
+    except FileNotFoundError:
+        return manifests
+    for name in names:
+        if name.endswith(".json"):
+            with open(os.path.join(snapshot_dir, name), 'rb') as f:
+                manifests.append(json.load(f))
+    # Manifests written before sequence numbers existed count as 0 and keep their creation order.
+    manifests.sort(key=lambda m: (m.get("sequence", 0), m["created"]))
+    return manifests
+
+def create_snapshot(source_path, store_path, jobs=None):
+    """Records a deduplicated snapshot of a directory tree in a chunk store.
+
+    Files are split into content-defined chunks, each stored once under its
+    sha256 digest in <store>/chunks, and the snapshot itself is a JSON manifest
+    in <store>/snapshots. Files whose size and mtime match the previous
+    snapshot of the same source reuse its chunk list without being read.
+    """
+    import concurrent.futures
+    import json
+    import stat
+    import time
+    try:
+        if not os.path.isdir(source_path):
+            _print_error(f"Error: '{source_path}' is not a directory.")
+            return
+        source = os.path.abspath(source_path)
+        manifests = _load_snapshots(store_path)
+        sequence = max((m.get("sequence", 0) for m in manifests), default=0) + 1
+        previous = [m for m in manifests if m["source"] == source]
+        previous_files = {e["path"]: e for e in previous[-1]["entries"] if e["type"] == "file"} if previous else {}
+        entries = []
+        to_read = []
+        for rel, entry in _snapshot_entries(source):
+            st = entry.stat(follow_symlinks=False)
+            record = {"path": rel, "mode": stat.S_IMODE(st.st_mode), "mtime_ns": st.st_mtime_ns}
+            if stat.S_ISDIR(st.st_mode):
+                record["type"] = "dir"
+            elif stat.S_ISLNK(st.st_mode):
+                record["type"] = "symlink"
+                record["target"] = os.readlink(entry.path)
+            elif stat.S_ISREG(st.st_mode):
+                record.update(type="file", size=st.st_size)
+                old = previous_files.get(rel)
+                if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    record["chunks"] = old["chunks"]
+                else:
+                    to_read.append(record)
+            else:
+                continue
+            entries.append(record)
+        os.makedirs(os.path.join(store_path, "snapshots"), exist_ok=True)
+        new_chunks = new_bytes = bytes_read = 0
+        errors = []
+        if to_read:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {executor.submit(_store_file_chunks, os.path.join(source, r["path"]), store_path): r for r in to_read}
+                for future in concurrent.futures.as_completed(futures):
+                    record = futures[future]
+                    try:
+                        record["chunks"], n_chunks, n_bytes, n_read = future.result()
+                    except OSError as e:
+                        errors.append(record)
+                        _print_error(f"Error reading '{os.path.join(source_path, record['path'])}': {e}")
+                        continue
+                    new_chunks += n_chunks
+                    new_bytes += n_bytes
+                    bytes_read += n_read
+        entries = [e for e in entries if e["type"] != "file" or "chunks" in e]
+        snapshot_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        manifest_path = os.path.join(store_path, "snapshots", snapshot_id + ".json")
+        suffix = 1
+        while os.path.exists(manifest_path):
+            suffix += 1
+            manifest_path = os.path.join(store_path, "snapshots", f"{snapshot_id}-{suffix}.json")
+        snapshot_id = os.path.basename(manifest_path)[:-len(".json")]
+        files = [e for e in entries if e["type"] == "file"]
+        manifest = {"version": 1, "id": snapshot_id, "sequence": sequence, "source": source, "created": time.time(),
+                    "total_bytes": sum(e["size"] for e in files), "entries": entries}
+        _atomic_write(manifest_path, json.dumps(manifest, separators=(",", ":")).encode())
+        print(f"Snapshot '{snapshot_id}' of '{source_path}': {len(files)} files "
+              f"({len(files) - len(to_read)} unchanged, {len(to_read) - len(errors)} read, {bytes_read} bytes), "
+              f"{new_chunks} new chunks ({new_bytes} bytes) stored.")
+    except FileNotFoundError as e:
+        _print_error(f"Error: '{e.filename}' not found.")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def restore_snapshot(store_path, snapshot_id, destination_path):
+    """Restores a snapshot from a chunk store into a directory, verifying every chunk's digest."""
+    import hashlib
+    try:
+        manifests = _load_snapshots(store_path)
+        if snapshot_id == "latest":
+            manifest = manifests[-1] if manifests else None
+        else:
+            manifest = next((m for m in manifests if m["id"] == snapshot_id), None)
+        if manifest is None:
+            _print_error(f"Error: Snapshot '{snapshot_id}' not found in '{store_path}'.")
+            return
+        os.makedirs(destination_path, exist_ok=True)
+        restored = 0
+        failed = 0
+        dirs = []
+        for entry in manifest["entries"]:
+            target = os.path.join(destination_path, entry["path"])
+            if entry["type"] == "dir":
+                os.makedirs(target, exist_ok=True)
+                dirs.append(entry)
+                continue
+            if entry["type"] == "symlink":
+                if os.path.lexists(target):
+                    os.unlink(target)
+                os.symlink(entry["target"], target)
+                continue
+            try:
+                with open(target, 'wb') as out:
+                    for digest in entry["chunks"]:
+                        with open(_chunk_path(store_path, digest), 'rb') as f:
+                            chunk = f.read()
+                        if hashlib.sha256(chunk).hexdigest() != digest:
+                            raise ValueError(f"chunk {digest} is corrupt")
+                        out.write(chunk)
+                os.chmod(target, entry["mode"])
+                os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+                restored += 1
+            except (OSError, ValueError) as e:
+                failed += 1
+                _print_error(f"Error restoring '{entry['path']}': {e}")
+        for entry in reversed(dirs):
+            target = os.path.join(destination_path, entry["path"])
+            os.chmod(target, entry["mode"])
+            os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        print(f"Snapshot '{manifest['id']}' restored to '{destination_path}': {restored} files"
+              + (f", {failed} failed." if failed else "."))
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+def list_snapshots(store_path):
+    """Lists the snapshots in a chunk store."""
+    import time
+    try:
+        manifests = _load_snapshots(store_path)
+        if not manifests:
+            print(f"No snapshots in '{store_path}'.")
+            return
+        for m in manifests:
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(m["created"]))
+            files = sum(1 for e in m["entries"] if e["type"] == "file")
+            print(f"{m['id']:<20} {created}  {files:>8} files  {m['total_bytes']:>14} bytes  {m['source']}")
+    except Exception as e:
+        _print_error(f"An unexpected error occurred: {e}")
+
+COMMANDS = {}
+
+def command(name, *help_lines):
+    """Registers a command handler; help_lines are (usage, description) pairs shown by 'help'.
+
+    Handlers receive the arguments after the command name. They import their
+    heavy dependencies themselves, so running one command never pays for the others.
+    """
+    def register(handler):
+        COMMANDS[name] = (handler, help_lines)
+        return handler
+    return register
+
+def _pop_option(args, name, default=None, convert=str):
+    """Removes '<name> <value>' from args and returns the converted value, or default if absent.
+
+    Raises IndexError if the value is missing and ValueError if it does not convert.
+    """
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = convert(args[i + 1])
+    del args[i:i + 2]
+    return value
+
+def display_help():
+    """Displays the help message."""
+    print("Simple CLI File Manager")
+    print("Usage: python main.py [--timings] [--profile=<file>] [--trace-io] <command> [arguments]")
+    print("\nCommands:")
+    for _, help_lines in COMMANDS.values():
+        for usage, description in help_lines:
+            print(f"  {usage} - {description}")
+
+@command("list",
+         ("list [-0 | --ndjson] [path]", "List contents of a directory. Defaults to current directory."))
+def cmd_list(args):
+    fmt = _pop_output_format(args)
+    path = args[0] if args else "."
+    list_directory_contents(path, fmt)
+
+@command("mkdir",
+         ("mkdir <path> <name>", "Create a new folder."))
+def cmd_mkdir(args):
+    if len(args) < 2:
+        _print_error("Usage: mkdir <path> <name>")
+        return
+    path = args[0]
+    name = args[1]
+    create_folder(path, name)
+
+def _cmd_write_batch(kind, args):
+    """Handles 'echo --batch' and 'touch --batch'."""
+    usage = f"Usage: {kind} --batch [--fsync none|batch|each] [--interval <seconds>] [--max-open <n>]"
+    args.remove("--batch")
+    try:
+        fsync = _pop_option(args, "--fsync", "batch")
+        interval = _pop_option(args, "--interval", GROUP_COMMIT_INTERVAL, float)
+        max_open = _pop_option(args, "--max-open", WRITE_MAX_OPEN, int)
+    except (IndexError, ValueError):
+        _print_error(usage)
+        return
+    for arg in list(args):
+        if arg.startswith("--fsync="):
+            fsync = arg.split("=", 1)[1]
+            args.remove(arg)
+    if args or fsync not in FSYNC_MODES or interval <= 0 or max_open < 1:
+        _print_error(usage)
+        return
+    write_batch(kind, fsync, interval, max_open)
+
+@command("touch",
+         ("touch <path> <name>", "Create a new empty file. Not fsynced."),
+         ("touch --batch [--fsync none|batch|each] [--interval <seconds>]",
+          "Create files from JSONL {\"path\", \"name\"} records on stdin, fsyncing their directories in groups."))
+def cmd_touch(args):
+    if "--batch" in args:
+        _cmd_write_batch("touch", args)
+        return
+    if len(args) < 2:
+        _print_error("Usage: touch <path> <name>")
+        return
+    path = args[0]
+    name = args[1]
+    create_empty_file(path, name)
+
+@command("rm",
+         ("rm <path>", "Delete a file or an empty directory."),
+         ("rm -r [-j <jobs>] [--dry-run] <path>", "Recursively delete a directory and its contents, subtrees in parallel; --dry-run only counts."))
+def cmd_rm(args):
+    usage = "Usage: rm [-r] [-j <jobs>] [--dry-run] <path>"
+    try:
+        jobs = _pop_option(args, "-j", convert=int)
+    except (IndexError, ValueError):
+        _print_error(usage)
+        return
+    dry_run = "--dry-run" in args
+    if dry_run:
+        args.remove("--dry-run")
+    recursive = "-r" in args
+    if recursive:
+        args.remove("-r")
+    if len(args) < 1:
+        _print_error(usage)
+        return
+    delete_item(args[0], recursive=recursive, jobs=jobs, dry_run=dry_run)
+
+@command("mv",
+         ("mv <old_path> <new_path>", "Rename or move a file or directory."))
+def cmd_mv(args):
+    if len(args) < 2:
+        _print_error("Usage: mv <old_path> <new_path>")
+        return
+    old_path = args[0]
+    new_path = args[1]
+    rename_item(old_path, new_path)
+
+@command("cat",
+         ("cat [--offset <bytes>] [--length <bytes>] [--lines <first>:<last>] [--index] <path>",
+          "Display the content of a file, or a byte or line range of it; --index caches line offsets."))
+def cmd_cat(args):
+    usage = "Usage: cat [--offset <bytes>] [--length <bytes>] [--lines <first>:<last>] [--index] <path>"
+    try:
+        offset = _pop_option(args, "--offset", 0, int)
+        length = _pop_option(args, "--length", None, int)
+        lines = _pop_option(args, "--lines", None, _parse_line_range)
+    except (IndexError, ValueError):
+        _print_error(usage)
+        return
+    use_index = "--index" in args
+    if use_index:
+        args.remove("--index")
+    if len(args) < 1 or offset < 0 or (length is not None and length < 0):
+        _print_error(usage)
+        return
+    path = args[0]
+    display_file_content(path, offset, length, lines, use_index)
+
+@command("find",
+         ("find [--index <file>] [--glob | --regex] [-0 | --ndjson] <directory> <search_term>", "Search for files by name in a directory."))
+def cmd_find(args):
+    index_path = None
+    mode = "substring"
+    fmt = _pop_output_format(args)
+    if "--index" in args:
+        i = args.index("--index")
+        if i + 1 >= len(args):
+            _print_error("Usage: find [--index <file>] [--glob | --regex] [-0 | --ndjson] <directory> <search_term>")
+            return
+        index_path = args[i + 1]
+        del args[i:i + 2]
+    for flag in ("--glob", "--regex"):
+        if flag in args:
+            mode = flag[2:]
+            args.remove(flag)
+    if len(args) < 2:
+        _print_error("Usage: find [--index <file>] [--glob | --regex] [-0 | --ndjson] <directory> <search_term>")
+        return
+    directory = args[0]
+    search_term = args[1]
+    find_files(directory, search_term, mode=mode, index_path=index_path, fmt=fmt)
+
+@command("index",
+         ("index build <directory> <file>", "Build a filename index for 'find --index'."),
+         ("index update <file>", "Refresh an index, rescanning only changed directories."))
+def cmd_index(args):
+    if len(args) >= 3 and args[0] == "build":
+        build_index(args[1], args[2])
+    elif len(args) >= 2 and args[0] == "update":
+        update_index(args[1])
+    else:
+        _print_error("Usage: index build <directory> <file> | index update <file>")
+
+@command("cp",
+         ("cp <source> <destination>", "Copy a file or directory."),
+         ("cp --sync [-j <jobs>] <source> <destination>", "Copy only changed files of a directory tree, resuming interrupted copies."))
+def cmd_cp(args):
+    if "--sync" in args:
+        args.remove("--sync")
+        jobs = None
+        if "-j" in args:
+            try:
+                i = args.index("-j")
+                jobs = int(args[i + 1])
+                del args[i:i + 2]
+            except (ValueError, IndexError):
+                _print_error("Usage: cp --sync [-j <jobs>] <source> <destination>")
+                return
+        if len(args) < 2:
+            _print_error("Usage: cp --sync [-j <jobs>] <source> <destination>")
+            return
+        sync_tree(args[0], args[1], jobs=jobs)
+        return
+    if len(args) < 2:
+        _print_error("Usage: cp <source> <destination>")
+        return
+    source_path = args[0]
+    destination_path = args[1]
+    copy_item(source_path, destination_path)
+
+@command("echo",
+         ("echo [-a] <path> <content>", "Write content to a file. Use -a to append. Not fsynced."),
+         ("echo --batch [--fsync none|batch|each] [--interval <seconds>] [--max-open <n>]",
+          "Apply JSONL {\"path\", \"content\", \"append\"} records from stdin with buffered, group-committed appends."))
+def cmd_echo(args):
+    if "--batch" in args:
+        _cmd_write_batch("echo", args)
+        return
+    if len(args) < 2:
+        _print_error("Usage: echo [-a] <path> <content>")
+        return
+    append_mode = False
+    start_index = 0
+    if args[0] == "-a":
+        append_mode = True
+        start_index = 1
+    
+    if len(args) < start_index + 2:
+        _print_error("Usage: echo [-a] <path> <content>")
+        return
+    
+    path = args[start_index]
+    content = " ".join(args[start_index + 1:])
+    edit_file_content(path, content, append_mode)
+
+@command("chmod",
+         ("chmod <path> <mode>", "Change permissions of a file or directory (e.g., 755 or u+rwX,go-w)."),
+         ("chmod -R [--files <mode>] [--dirs <mode>] [-j <jobs>] <path> [<mode>]",
+          "Change permissions of a whole tree, skipping entries that already match."))
+def cmd_chmod(args):
+    usage = "Usage: chmod [-R] [--files <mode>] [--dirs <mode>] [-j <jobs>] <path> [<mode>]"
+    try:
+        file_mode_str = _pop_option(args, "--files")
+        dir_mode_str = _pop_option(args, "--dirs")
+        jobs = _pop_option(args, "-j", None, int)
+    except (IndexError, ValueError):
+        _print_error(usage)
+        return
+    recursive = "-R" in args
+    if recursive:
+        args.remove("-R")
+    if len(args) < 1 or (len(args) < 2 and not (file_mode_str or dir_mode_str)):
+        _print_error(usage)
+        return
+    path = args[0]
+    mode_str = args[1] if len(args) > 1 else None
+    change_permissions(path, mode_str, recursive, file_mode_str, dir_mode_str, jobs)
+
+@command("zip",
+         ("zip [-l <level>] [-j <jobs>] <source> <output_filename>", "Compress a file or directory into a zip archive, in parallel."))
+def cmd_zip(args):
+    usage = "Usage: zip [-l <level>] [-j <jobs>] <source> <output_filename>"
+    try:
+        level = _pop_option(args, "-l", 6, int)
+        jobs = _pop_option(args, "-j", None, int)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if len(args) < 2:
+        _print_error(usage)
+        return
+    source_path = args[0]
+    output_filename = args[1]
+    zip_item(source_path, output_filename, level=level, jobs=jobs)
+
+@command("unzip",
+         ("unzip <source> <destination>", "Decompress a zip archive."))
+def cmd_unzip(args):
+    if len(args) < 2:
+        _print_error("Usage: unzip <source> <destination>")
+        return
+    source_path = args[0]
+    destination_path = args[1]
+    unzip_item(source_path, destination_path)
+
+@command("du",
+         ("du [--cache <file>] [-j <jobs>] <path>", "Display the size of a file or directory, with per-subdirectory totals."))
+def cmd_du(args):
+    cache_path = None
+    jobs = None
+    try:
+        if "--cache" in args:
+            i = args.index("--cache")
+            cache_path = args[i + 1]
+            del args[i:i + 2]
+        if "-j" in args:
+            i = args.index("-j")
+            jobs = int(args[i + 1])
+            del args[i:i + 2]
+    except (ValueError, IndexError):
+        _print_error("Usage: du [--cache <file>] [-j <jobs>] <path>")
+        return
+    if len(args) < 1:
+        _print_error("Usage: du [--cache <file>] [-j <jobs>] <path>")
+        return
+    display_size(args[0], jobs=jobs, cache_path=cache_path)
+
+@command("diff",
+         ("diff <file1> <file2>", "Compare two text files."),
+         ("diff -r <dir1> <dir2>", "Report files that differ between two directory trees."))
+def cmd_diff(args):
+    if len(args) >= 3 and args[0] == "-r":
+        compare_directories(args[1], args[2])
+        return
+    if len(args) < 2:
+        _print_error("Usage: diff [-r] <file1> <file2>")
+        return
+    file1_path = args[0]
+    file2_path = args[1]
+    compare_files(file1_path, file2_path)
+
+@command("stat",
+         ("stat <path>", "Display metadata of a file or directory."),
+         ("stat [-r] [--format table|csv|ndjson] [--fields <field,...>] <path|glob>...",
+          "List metadata for many paths in one pass, with nanosecond timestamps."))
+def cmd_stat(args):
+    import glob
+    usage = "Usage: stat [-r] [--format table|csv|ndjson] [--fields <field,...>] <path|glob>..."
+    try:
+        fmt = _pop_option(args, "--format")
+        fields = _pop_option(args, "--fields", None, lambda s: tuple(s.split(",")))
+    except IndexError:
+        _print_error(usage)
+        return
+    recursive = "-r" in args
+    if recursive:
+        args.remove("-r")
+    if len(args) < 1:
+        _print_error(usage)
+        return
+    if len(args) == 1 and not (recursive or fmt or fields) and not glob.has_magic(args[0]):
+        display_metadata(args[0])
+        return
+    if (fmt or "table") not in STAT_FORMATS or any(f not in STAT_FIELDS for f in fields or ()):
+        _print_error(f"{usage}\nFields: {', '.join(STAT_FIELDS)}")
+        return
+    stat_paths(args, recursive, fmt or "table", fields or STAT_DEFAULT_FIELDS)
+
+@command("grep",
+         ("grep [-r] [--include <glob>] [--exclude <glob>] [-j <jobs>] [-0 | --ndjson] <path> <pattern>", "Search for a pattern in a file or, with -r, a directory tree."))
+def cmd_grep(args):
+    usage = "Usage: grep [-r] [--include <glob>] [--exclude <glob>] [-j <jobs>] [-0 | --ndjson] <path> <pattern>"
+    fmt = _pop_output_format(args)
+    recursive = False
+    include = []
+    exclude = []
+    jobs = None
+    positional = []
+    i = 0
+    try:
+        while i < len(args):
+            if args[i] == "-r":
+                recursive = True
+            elif args[i] == "--include":
+                i += 1
+                include.append(args[i])
+            elif args[i] == "--exclude":
+                i += 1
+                exclude.append(args[i])
+            elif args[i] == "-j":
+                i += 1
+                jobs = int(args[i])
+            else:
+                positional.append(args[i])
+            i += 1
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if len(positional) < 2:
+        _print_error(usage)
+        return
+    path = positional[0]
+    pattern = positional[1]
+    grep_file_content(path, pattern, recursive, include, exclude, jobs, fmt)
+
+@command("hash",
+         ("hash [--cache <file>] [-j <jobs>] <path>... <algorithm>", "Hash files or directory trees (md5, sha1, sha256, sha512, blake2b)."))
+def cmd_hash(args):
+    usage = "Usage: hash [--cache <file>] [-j <jobs>] <path>... <algorithm>"
+    cache_path = None
+    jobs = None
+    try:
+        if "--cache" in args:
+            i = args.index("--cache")
+            cache_path = args[i + 1]
+            del args[i:i + 2]
+        if "-j" in args:
+            i = args.index("-j")
+            jobs = int(args[i + 1])
+            del args[i:i + 2]
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if len(args) < 2:
+        _print_error(usage)
+        return
+    paths = args[:-1]
+    algorithm = args[-1]
+    if len(paths) == 1 and not cache_path and not os.path.isdir(paths[0]):
+        generate_hash(paths[0], algorithm)
+    else:
+        hash_files(paths, algorithm, jobs=jobs, cache_path=cache_path)
+
+@command("dedup",
+         ("dedup [--link hard|reflink] [-j <jobs>] <directory>", "Find duplicate files, optionally replacing them with links."))
+def cmd_dedup(args):
+    usage = "Usage: dedup [--link hard|reflink] [-j <jobs>] <directory>"
+    link_mode = None
+    jobs = None
+    try:
+        if "--link" in args:
+            i = args.index("--link")
+            link_mode = args[i + 1]
+            del args[i:i + 2]
+            if link_mode not in ("hard", "reflink"):
+                raise ValueError(link_mode)
+        if "-j" in args:
+            i = args.index("-j")
+            jobs = int(args[i + 1])
+            del args[i:i + 2]
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if len(args) < 1:
+        _print_error(usage)
+        return
+    find_duplicates(args[0], link_mode=link_mode, jobs=jobs)
+
+@command("ps",
+         ("ps [--watch] [-n <count>] [--sort cpu|mem] [-i <seconds>]", "List running processes by CPU or memory use; --watch refreshes like top."))
+def cmd_ps(args):
+    usage = "Usage: ps [--watch] [-n <count>] [--sort cpu|mem] [-i <seconds>]"
+    watch = "--watch" in args
+    if watch:
+        args.remove("--watch")
+    try:
+        limit = _pop_option(args, "-n", 20 if watch else None, int)
+        sort = _pop_option(args, "--sort", "cpu")
+        interval = _pop_option(args, "-i", 2.0 if watch else 0.5, float)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if sort not in ("cpu", "mem") or args:
+        _print_error(usage)
+        return
+    list_processes(sort=sort, limit=limit, watch=watch, interval=interval)
+
+@command("ping",
+         ("ping <host>", "Ping a host (e.g., google.com or 8.8.8.8)."),
+         ("ping [-c <count>] [-t <timeout>] [-j <concurrency>] [--json] [-f <hosts_file>] <host|cidr>...", "Ping many hosts or address ranges concurrently and summarise loss and RTT."))
+def cmd_ping(args):
+    usage = "Usage: ping [-c <count>] [-t <timeout>] [-j <concurrency>] [--json] [-f <hosts_file>] <host|cidr>..."
+    if len(args) == 1 and "/" not in args[0] and not args[0].startswith("-"):
+        ping_host(args[0])
+        return
+    as_json = "--json" in args
+    if as_json:
+        args.remove("--json")
+    try:
+        count = _pop_option(args, "-c", 1, int)
+        timeout = _pop_option(args, "-t", 5.0, float)
+        concurrency = _pop_option(args, "-j", 64, int)
+        hosts_file = _pop_option(args, "-f")
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    hosts = list(args)
+    if hosts_file:
+        try:
+            with open(hosts_file, 'r') as f:
+                hosts.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+        except FileNotFoundError:
+            _print_error(f"Error: Hosts file '{hosts_file}' not found.")
+            return
+    if not hosts:
+        _print_error(usage)
+        return
+    ping_hosts(hosts, count=count, timeout=timeout, concurrency=concurrency, as_json=as_json)
+
+@command("sysinfo",
+         ("sysinfo [--json] [--window <seconds>] [--timeout <seconds>]", "Display detailed system information, or dump it as JSON."),
+         ("sysinfo --prom <file> [--interval <seconds>] [--timeout <seconds>]", "Sample metrics in the background and keep a Prometheus text file up to date."))
+def cmd_sysinfo(args):
+    usage = "Usage: sysinfo [--json] [--window <seconds>] | sysinfo --prom <file> [--interval <seconds>] [--timeout <seconds>]"
+    as_json = "--json" in args
+    if as_json:
+        args.remove("--json")
+    try:
+        prom_path = _pop_option(args, "--prom")
+        window = _pop_option(args, "--window", 0.2, float)
+        interval = _pop_option(args, "--interval", 15.0, float)
+        disk_timeout = _pop_option(args, "--timeout", DISK_USAGE_TIMEOUT, float)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if args:
+        _print_error(usage)
+        return
+    if prom_path:
+        export_metrics(prom_path, interval, disk_timeout)
+    else:
+        display_sysinfo(window, as_json, disk_timeout)
+
+@command("tail",
+         ("tail [-f] [-n <lines>] <path>...", "Display the last lines of files, optionally follow new lines (handles rotation)."))
+def cmd_tail(args):
+    usage = "Usage: tail [-f] [-n <lines>] <path>..."
+    follow_mode = False
+    num_lines = 10
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] == "-f":
+            follow_mode = True
+        elif args[i] == "-n":
+            try:
+                num_lines = int(args[i + 1])
+            except (ValueError, IndexError):
+                _print_error("Error: Invalid number of lines for -n.")
+                return
+            i += 1
+        else:
+            paths.append(args[i])
+        i += 1
+    if not paths:
+        _print_error(usage)
+        return
+    tail_files(paths, lines=num_lines, follow=follow_mode)
+
+@command("watch",
+         ("watch [--socket <path>] [--interval <seconds>] <directory>", "Keep du/find results for a tree up to date with inotify and serve them on a Unix socket."),
+         ("watch query [--socket <path>] <directory> du [<path>] | find [--glob | --regex] <term> | status", "Ask a running watch daemon."))
+def cmd_watch(args):
+    usage = ("Usage: watch [--socket <path>] [--interval <seconds>] <directory>"
+             " | watch query [--socket <path>] <directory> du [<path>] | find [--glob | --regex] <term> | status")
+    try:
+        socket_path = _pop_option(args, "--socket")
+        interval = _pop_option(args, "--interval", WATCH_RESCAN_INTERVAL, float)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if args[:1] != ["query"]:
+        if len(args) < 1:
+            _print_error(usage)
+            return
+        watch_directory(args[0], socket_path, interval)
+        return
+    mode = "substring"
+    for flag in ("--glob", "--regex"):
+        if flag in args:
+            mode = flag[2:]
+            args.remove(flag)
+    if len(args) >= 3 and args[2] == "du":
+        request = {"op": "du", "path": os.path.abspath(args[3] if len(args) > 3 else args[1])}
+    elif len(args) >= 4 and args[2] == "find":
+        request = {"op": "find", "term": args[3], "mode": mode}
+    elif len(args) >= 3 and args[2] == "status":
+        request = {"op": "status"}
+    else:
+        _print_error(usage)
+        return
+    query_watch(args[1], request, socket_path)
+
+@command("env",
+         ("env [list | set <key> <value> | unset <key>]", "Manage environment variables."))
+def cmd_env(args):
+    if len(args) < 1:
+        _print_error("Usage: env [list | set <key> <value> | unset <key>]")
+        return
+    subcommand = args[0]
+    if subcommand == "list":
+        display_env_vars()
+    elif subcommand == "set":
+        if len(args) < 3:
+            _print_error("Usage: env set <key> <value>")
+            return
+        key = args[1]
+        value = args[2]
+        set_env_var(key, value)
+    elif subcommand == "unset":
+        if len(args) < 2:
+            _print_error("Usage: env unset <key>")
+            return
+        key = args[1]
+        unset_env_var(key)
+    else:
+        _print_error(f"Unknown env subcommand: {subcommand}\nUsage: env [list | set <key> <value> | unset <key>]")
+
+@command("tar.gz",
+         ("tar.gz [-l <level>] [-j <jobs>] [--index] <source> <output_filename>", "Compress a file or directory into a .tar.gz archive, in parallel; --index writes a sidecar index for 'archive get'."))
+def cmd_tar_gz(args):
+    usage = "Usage: tar.gz [-l <level>] [-j <jobs>] [--index] <source> <output_filename>"
+    index = "--index" in args
+    if index:
+        args.remove("--index")
+    try:
+        level = _pop_option(args, "-l", 6, int)
+        jobs = _pop_option(args, "-j", None, int)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if len(args) < 2:
+        _print_error(usage)
+        return
+    source_path = args[0]
+    output_filename = args[1]
+    create_tar_gz(source_path, output_filename, level=level, jobs=jobs, index=index)
+
+@command("untar.gz",
+         ("untar.gz <source> <destination>", "Decompress a .tar.gz archive."))
+def cmd_untar_gz(args):
+    if len(args) < 2:
+        _print_error("Usage: untar.gz <source> <destination>")
+        return
+    source_path = args[0]
+    destination_path = args[1]
+    extract_tar_gz(source_path, destination_path)
+
+@command("archive",
+         ("archive ls <archive>", "List the members of a .tar.gz or zip archive."),
+         ("archive get <archive> <member> [destination|-]", "Extract a single member, using the sidecar index of a .tar.gz when present."))
+def cmd_archive(args):
+    usage = "Usage: archive ls <archive> | archive get <archive> <member> [destination|-]"
+    if len(args) >= 2 and args[0] == "ls":
+        list_archive(args[1])
+    elif len(args) >= 3 and args[0] == "get":
+        extract_archive_member(args[1], args[2], args[3] if len(args) > 3 else None)
+    else:
+        _print_error(usage)
+
+@command("snapshot",
+         ("snapshot create [-j <jobs>] <directory> <store>", "Store a deduplicated snapshot of a directory; unchanged files and chunks are not stored again."),
+         ("snapshot restore <store> <snapshot_id|latest> <destination>", "Restore a snapshot, verifying every chunk."),
+         ("snapshot list <store>", "List the snapshots in a store."))
+def cmd_snapshot(args):
+    usage = "Usage: snapshot create [-j <jobs>] <directory> <store> | snapshot restore <store> <snapshot_id|latest> <destination> | snapshot list <store>"
+    try:
+        jobs = _pop_option(args, "-j", None, int)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if args[:1] == ["create"] and len(args) >= 3:
+        create_snapshot(args[1], args[2], jobs)
+    elif args[:1] == ["restore"] and len(args) >= 4:
+        restore_snapshot(args[1], args[2], args[3])
+    elif args[:1] == ["list"] and len(args) >= 2:
+        list_snapshots(args[1])
+    else:
+        _print_error(usage)
+
+STARTUP_BUDGET_MS = 10.0
+STARTUP_HEAVY_MODULES = ("psutil", "tarfile", "subprocess", "hashlib", "shutil", "concurrent.futures", "json", "threading")
+
+def _measure_startup(argv):
+    """Runs a Python command under -X importtime; returns (wall_ms, import_ms, imported_module_names)."""
+    import subprocess
+    import time
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + argv, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        import_us += int(self_us)
+        modules.add(name.strip())
+    return wall_ms, import_us / 1000, modules
+
+def benchmark_startup(runs=5, budget_ms=STARTUP_BUDGET_MS):
+    """Checks that 'python main.py list' stays within an import-time budget.
+
+    The budget applies to imports beyond a bare interpreter start, measured with
+    -X importtime; any heavy module imported by 'list' is reported as a failure.
+    Returns True if the check passes.
+    """
+    import statistics
+    import tempfile
+    with tempfile.TemporaryDirectory() as empty_dir:
+        baseline = [_measure_startup(["-c", "pass"]) for _ in range(runs)]
+        main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        samples = [_measure_startup([main_script, "list", empty_dir]) for _ in range(runs)]
+    wall_ms = statistics.median(s[0] for s in samples)
+    base_wall_ms = statistics.median(b[0] for b in baseline)
+    import_ms = statistics.median(s[1] for s in samples) - statistics.median(b[1] for b in baseline)
+    heavy = sorted(m for m in samples[0][2] if m.split(".")[0] in STARTUP_HEAVY_MODULES or m in STARTUP_HEAVY_MODULES)
+    print(f"'main.py list' wall time: {wall_ms:.1f} ms (bare interpreter: {base_wall_ms:.1f} ms)")
+    print(f"Import time beyond interpreter startup: {import_ms:.1f} ms (budget: {budget_ms:.1f} ms)")
+    if os.environ.get("PYTHONDONTWRITEBYTECODE"):
+        print("Note: PYTHONDONTWRITEBYTECODE is set, so my_cli_tool.py is recompiled on every run.")
+    ok = import_ms <= budget_ms and not heavy
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+    print("PASS" if ok else "FAIL")
+    return ok
+
+def benchmark_compression(source_path, level=6, jobs=None):
+    """Times the parallel tar.gz and zip writers against the single-threaded tarfile/zipfile paths."""
+    import tarfile
+    import tempfile
+    import time
+    import zipfile
+    with tempfile.TemporaryDirectory() as tmp:
+        def timed(label, func, path):
+            start = time.perf_counter()
+            func(path)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<28} {elapsed * 1000:10.1f} ms  {os.path.getsize(path):>12} bytes")
+            return elapsed
+
+        def tar_single(path):
+            with tarfile.open(path, "w:gz", compresslevel=level) as tar:
+                tar.add(source_path, arcname=os.path.basename(source_path))
+
+        def tar_parallel(path):
+            with open(path, 'wb') as raw:
+                writer = _ParallelGzipWriter(raw, level=level, jobs=jobs)
+                with tarfile.open(fileobj=writer, mode="w|") as tar:
+                    tar.add(source_path, arcname=os.path.basename(source_path))
+                writer.close()
+
+        def zip_single(path):
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+                for arcname, member_path, _ in _archive_members(source_path):
+                    zf.write(member_path, arcname)
+
+        def zip_parallel(path):
+            with open(path, 'wb') as out:
+                _write_parallel_zip(out, _archive_members(source_path), level, jobs)
+
+        print(f"Compression benchmark for '{source_path}' (level {level}, {jobs or os.cpu_count()} jobs):")
+        t1 = timed("tar.gz single-threaded", tar_single, os.path.join(tmp, "a.tar.gz"))
+        t2 = timed("tar.gz parallel", tar_parallel, os.path.join(tmp, "b.tar.gz"))
+        z1 = timed("zip single-threaded", zip_single, os.path.join(tmp, "a.zip"))
+        z2 = timed("zip parallel", zip_parallel, os.path.join(tmp, "b.zip"))
+        print(f"Speedup: tar.gz {t1 / t2:.2f}x, zip {z1 / z2:.2f}x")
+
+BENCH_SIZE_DISTRIBUTIONS = {
+    # (min_size, max_size, weight) buckets.
+    "small": ((0, 512, 6), (512, 4096, 3), (4096, 32768, 1)),
+    "mixed": ((0, 4096, 5), (4096, 65536, 4), (65536, 1024 * 1024, 1)),
+    "large": ((4096, 65536, 3), (65536, 1024 * 1024, 5), (1024 * 1024, 8 * 1024 * 1024, 2)),
+}
+BENCH_WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+               "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa")
+BENCH_NEEDLE = "needle"
+BENCH_CASES = ("du", "find", "grep", "hash", "cp", "rm", "tar.gz", "diff", "snapshot")
+BENCH_MTIME = 1_600_000_000
+BENCH_TREE_CONFIG = "tree.json"
+
+def _bench_corpus(rng, size=256 * 1024):
+    """Builds a block of word lines, every 100th containing BENCH_NEEDLE, to cut file contents from."""
+    lines = []
+    total = 0
+    while total < size:
+        words = [rng.choice(BENCH_WORDS) for _ in range(8)]
+        if len(lines) % 100 == 99:
+            words[rng.randrange(8)] = BENCH_NEEDLE
+        line = " ".join(words) + "\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()
+
+def generate_bench_tree(root, seed=42, fanout=4, depth=3, files=20, sizes="small"):
+    """Deterministically creates a synthetic tree for benchmarks; returns (file_count, total_bytes).
+
+    Every directory down to depth has fanout subdirectories and files files;
+    sizes pick from BENCH_SIZE_DISTRIBUTIONS. The same arguments always produce
+    the same names, contents and mtimes. Two text files for the diff benchmark
+    are written next to the tree as root + '.diff-a' / '.diff-b'.
+    """
+    import random
+    rng = random.Random(seed)
+    corpus = _bench_corpus(rng)
+    buckets = BENCH_SIZE_DISTRIBUTIONS[sizes]
+    file_count = 0
+    total_bytes = 0
+    pending = [(root, 0)]
+    while pending:
+        dir_path, level = pending.pop()
+        os.makedirs(dir_path, exist_ok=True)
+        for i in range(files):
+            low, high, _ = rng.choices(buckets, weights=[b[2] for b in buckets])[0]
+            size = rng.randint(low, high)
+            start = rng.randrange(len(corpus))
+            data = corpus[start:start + size]
+            while len(data) < size:
+                data += corpus[:size - len(data)]
+            path = os.path.join(dir_path, f"file_{i:04d}.txt")
+            with open(path, 'wb') as f:
+                f.write(data)
+            os.utime(path, (BENCH_MTIME, BENCH_MTIME))
+            file_count += 1
+            total_bytes += size
+        if level < depth:
+            pending.extend((os.path.join(dir_path, f"dir_{i:02d}"), level + 1) for i in range(fanout))
+    lines = corpus.splitlines(keepends=True)
+    a = [lines[rng.randrange(len(lines))] for _ in range(20000)]
+    b = list(a)
+    for _ in range(200):
+        i = rng.randrange(len(b))
+        if rng.random() < 0.5:
+            b[i] = lines[rng.randrange(len(lines))]
+        else:
+            b.insert(i, lines[rng.randrange(len(lines))])
+    for suffix, content in ((".diff-a", a), (".diff-b", b)):
+        with open(root + suffix, 'wb') as f:
+            f.writelines(content)
+    return file_count, total_bytes
+
+def _percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    import math
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def _bench_cases(tree, scratch):
+    """Returns {name: (argv, setup)} for the commands benchmarked by 'bench run'."""
+    import shutil
+    copy_dst = os.path.join(scratch, "copy")
+    victim = os.path.join(scratch, "victim")
+    archive = os.path.join(scratch, "tree.tar.gz")
+    store = os.path.join(scratch, "store")
+
+    def clear_copy():
+        shutil.rmtree(copy_dst, ignore_errors=True)
+
+    def make_victim():
+        shutil.rmtree(victim, ignore_errors=True)
+        shutil.copytree(tree, victim)
+
+    def clear_store():
+        shutil.rmtree(store, ignore_errors=True)
+
+    return {
+        "du": (["du", tree], None),
+        "find": (["find", tree, "file_001"], None),
+        "grep": (["grep", "-r", tree, BENCH_NEEDLE], None),
+        "hash": (["hash", tree, "sha256"], None),
+        "cp": (["cp", tree, copy_dst], clear_copy),
+        "rm": (["rm", "-r", victim], make_victim),
+        "tar.gz": (["tar.gz", tree, archive], None),
+        "diff": (["diff", tree + ".diff-a", tree + ".diff-b"], None),
+        "snapshot": (["snapshot", "create", tree, store], clear_store),
+    }
+
+def run_benchmarks(config, cases=BENCH_CASES, runs=5, warmup=1, work_dir=None):
+    """Times commands on a generated tree; returns a JSON-ready dict with per-command samples, median and p95.
+
+    Commands run in this process with stdout sent to /dev/null, so the numbers
+    cover the work and output formatting but not interpreter startup. A tree
+    kept in work_dir is reused only if BENCH_TREE_CONFIG there records the same
+    config; otherwise it is rebuilt. Raises ValueError if a command fails.
+    """
+    import contextlib
+    import json
+    import shutil
+    import statistics
+    import tempfile
+    import time
+    with contextlib.ExitStack() as stack:
+        if work_dir is None:
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        tree = os.path.join(work_dir, "tree")
+        scratch = os.path.join(work_dir, "scratch")
+        fingerprint_path = os.path.join(work_dir, BENCH_TREE_CONFIG)
+        os.makedirs(scratch, exist_ok=True)
+        try:
+            with open(fingerprint_path) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            recorded = None
+        if recorded != config or not os.path.isdir(tree):
+            if os.path.lexists(fingerprint_path):
+                os.unlink(fingerprint_path)
+            shutil.rmtree(tree, ignore_errors=True)
+            generate_bench_tree(tree, **config)
+            _atomic_write(fingerprint_path, json.dumps(config, sort_keys=True).encode())
+        devnull = stack.enter_context(open(os.devnull, "w"))
+        results = {}
+        for name, (argv, setup) in _bench_cases(tree, scratch).items():
+            if name not in cases:
+                continue
+            samples = []
+            for i in range(warmup + runs):
+                if setup:
+                    setup()
+                with contextlib.redirect_stdout(devnull):
+                    start = time.perf_counter()
+                    ok = run_command(argv)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                if not ok:
+                    raise ValueError(f"benchmark '{name}' failed: {' '.join(argv)}")
+                if i >= warmup:
+                    samples.append(round(elapsed_ms, 3))
+            results[name] = {"samples_ms": samples,
+                             "median_ms": round(statistics.median(samples), 3),
+                             "p95_ms": round(_percentile(samples, 0.95), 3)}
+            print(f"  {name:<8} median {results[name]['median_ms']:10.1f} ms   p95 {results[name]['p95_ms']:10.1f} ms",
+                  file=sys.stderr)
+    return {"version": 1, "config": config, "runs": runs, "warmup": warmup,
+            "python": sys.version.split()[0], "results": results}
+
+def compare_benchmarks(report, baseline, threshold=0.10, file=None):
+    """Prints each command's median against a baseline report; returns the names that regressed beyond threshold."""
+    file = file or sys.stdout
+    if baseline.get("config") != report["config"]:
+        print("Warning: the baseline was recorded with a different tree configuration.", file=file)
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"  {name:<8} (not in baseline)", file=file)
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<8} {base['median_ms']:10.1f} ms -> {result['median_ms']:10.1f} ms  "
+              f"({(ratio - 1) * 100:+.1f}%){'  REGRESSION' if regressed else ''}", file=file)
+    return regressions
+
+def _bench_tree_or_run(args, usage):
+    """Handles 'bench tree' and 'bench run'."""
+    import json
+    try:
+        config = {
+            "seed": _pop_option(args, "--seed", 42, int),
+            "fanout": _pop_option(args, "--fanout", 4, int),
+            "depth": _pop_option(args, "--depth", 3, int),
+            "files": _pop_option(args, "--files", 20, int),
+            "sizes": _pop_option(args, "--sizes", "small"),
+        }
+        runs = _pop_option(args, "--runs", 5, int)
+        warmup = _pop_option(args, "--warmup", 1, int)
+        only = _pop_option(args, "--only", ",".join(BENCH_CASES)).split(",")
+        work_dir = _pop_option(args, "--dir")
+        out_path = _pop_option(args, "--out")
+        baseline_path = _pop_option(args, "--baseline")
+        threshold = _pop_option(args, "--threshold", 10.0, float)
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if config["sizes"] not in BENCH_SIZE_DISTRIBUTIONS or runs < 1 or any(c not in BENCH_CASES for c in only):
+        _print_error(usage)
+        return
+    if args[0] == "tree":
+        if len(args) < 2:
+            _print_error(usage)
+            return
+        file_count, total_bytes = generate_bench_tree(args[1], **config)
+        print(f"Generated '{args[1]}': {file_count} files, {total_bytes} bytes.")
+        return
+    as_json = "--json" in args
+    try:
+        baseline = None
+        if baseline_path:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        print(f"Benchmarking on a synthetic tree ({', '.join(f'{k}={v}' for k, v in config.items())}), "
+              f"{runs} runs after {warmup} warm-up:", file=sys.stderr)
+        report = run_benchmarks(config, only, runs, warmup, work_dir)
+        regressions = []
+        if baseline is not None:
+            # With --json the comparison goes to stderr and into the report, keeping stdout one document.
+            text = sys.stderr if as_json else sys.stdout
+            print(f"Against baseline '{baseline_path}' (threshold {threshold:g}%):", file=text)
+            regressions = compare_benchmarks(report, baseline, threshold / 100, file=text)
+            print(f"FAIL: slower than baseline: {', '.join(regressions)}" if regressions else "PASS", file=text)
+            report["baseline"] = {"path": baseline_path, "threshold_percent": threshold, "regressions": regressions}
+        if out_path:
+            _atomic_write(out_path, json.dumps(report, indent=2).encode())
+        if as_json:
+            print(json.dumps(report, indent=2))
+    except (OSError, ValueError) as e:
+        _print_error(f"Error: {e}")
+        return
+    if regressions:
+        sys.exit(1)
+
+@command("bench",
+         ("bench startup [--runs <n>] [--budget-ms <ms>]", "Check that CLI startup stays within its import-time budget."),
+         ("bench compress [-l <level>] [-j <jobs>] <source>", "Compare parallel and single-threaded tar.gz/zip compression."),
+         ("bench tree [<tree options>] <directory>", "Generate a deterministic synthetic tree (--seed, --fanout, --depth, --files, --sizes small|mixed|large)."),
+         ("bench run [<tree options>] [--runs <n>] [--warmup <n>] [--only <cmd,...>] [--dir <work_dir>] [--out <file>] [--json] [--baseline <file> [--threshold <percent>]]",
+          "Time du, find, grep, hash, cp, rm, tar.gz, diff and snapshot on a synthetic tree; fail on regressions against a baseline."))
+def cmd_bench(args):
+    usage = ("Usage: bench startup [--runs <n>] [--budget-ms <ms>] | bench compress [-l <level>] [-j <jobs>] <source>"
+             " | bench tree [<tree options>] <directory> | bench run [<options>]")
+    if len(args) < 1 or args[0] not in ("startup", "compress", "tree", "run"):
+        _print_error(usage)
+        return
+    if args[0] in ("tree", "run"):
+        _bench_tree_or_run(args, usage)
+        return
+    if args[0] == "compress":
+        try:
+            level = _pop_option(args, "-l", 6, int)
+            jobs = _pop_option(args, "-j", None, int)
+        except (ValueError, IndexError):
+            _print_error(usage)
+            return
+        if len(args) < 2:
+            _print_error(usage)
+            return
+        benchmark_compression(args[1], level=level, jobs=jobs)
+        return
+    runs = 5
+    budget_ms = STARTUP_BUDGET_MS
+    try:
+        if "--runs" in args:
+            runs = int(args[args.index("--runs") + 1])
+        if "--budget-ms" in args:
+            budget_ms = float(args[args.index("--budget-ms") + 1])
+    except (ValueError, IndexError):
+        _print_error(usage)
+        return
+    if not benchmark_startup(runs, budget_ms):
+        sys.exit(1)
+
+class _ThreadLocalStream:
+    """Stands in for sys.stdout/sys.stderr and routes output to a per-thread capture buffer if one is set."""
+
+    def __init__(self, default):
+        import threading
+        self._default = default
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "stream", None) or self._default
+
+    def start_capture(self):
+        import io
+        self._local.stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", errors="replace", write_through=True)
+
+    def stop_capture(self):
+        """Ends capturing for the current thread and returns the captured text."""
+        stream = self._local.stream
+        self._local.stream = None
+        stream.flush()
+        return stream.buffer.getvalue().decode("utf-8", "replace")
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+def _run_batch_record(line):
+    """Runs one JSONL batch record and returns its result as a dict."""
+    import json
+    import time
+    start = time.perf_counter()
+    result = {}
+    try:
+        record = json.loads(line)
+        if "request_id" in record:
+            result["request_id"] = record["request_id"]
+        argv = record.get("argv") or [record["command"]] + list(record.get("args", []))
+        result["command"] = argv[0]
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        result.update(ok=False, error=f"Invalid batch record: {e}")
+        return result
+    sys.stdout.start_capture()
+    sys.stderr.start_capture()
+    try:
+        result["ok"] = run_command([str(a) for a in argv])
+    except SystemExit as e:
+        result["ok"] = not e.code
+        result["exit_code"] = e.code
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["stdout"] = sys.stdout.stop_capture()
+        result["stderr"] = sys.stderr.stop_capture()
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+def run_batch(source, jobs=1):
+    """Runs a JSONL stream of commands in this process and writes one JSON result per line.
+
+    Each record is {"request_id": ..., "command": ..., "args": [...]} (or {"argv": [...]}).
+    With jobs > 1, up to that many commands run concurrently on threads; results
+    are still written in input order.
+    """
+    import collections
+    import concurrent.futures
+    import json
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = _ThreadLocalStream(stdout)
+    sys.stderr = _ThreadLocalStream(stderr)
+    f = None
+    try:
+        f = sys.stdin if source == "-" else open(source, 'r')
+        lines = (line for line in f if line.strip())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            window = collections.deque()
+            for line in lines:
+                window.append(executor.submit(_run_batch_record, line))
+                while len(window) > 2 * jobs or (window and window[0].done()):
+                    stdout.write(json.dumps(window.popleft().result()) + "\n")
+            while window:
+                stdout.write(json.dumps(window.popleft().result()) + "\n")
+        stdout.flush()
+    except FileNotFoundError:
+        _print_error(f"Error: Batch file '{source}' not found.", file=stdout)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        if f is not None and f is not sys.stdin:
+            f.close()
+
+@command("batch",
+         ("batch [-j <jobs>] <file|->", "Run JSONL commands in one process, writing one JSON result per line."))
+def cmd_batch(args):
+    usage = "Usage: batch [-j <jobs>] <file|->"
+    jobs = 1
+    if "-j" in args:
+        try:
+            i = args.index("-j")
+            jobs = int(args[i + 1])
+            del args[i:i + 2]
+        except (ValueError, IndexError):
+            _print_error(usage)
+            return
+    if len(args) < 1:
+        _print_error(usage)
+        return
+    run_batch(args[0], jobs=jobs)
+
+@command("help",
+         ("help", "Display this help message."))
+def cmd_help(args):
+    display_help()
+
+def _pop_global_flags(argv):
+    """Strips the instrumentation flags that precede the command name; returns (argv, options)."""
+    options = {"timings": False, "profile": None, "trace_io": False}
+    argv = list(argv)
+    while argv and argv[0].startswith("--"):
+        flag = argv[0]
+        if flag == "--timings":
+            options["timings"] = True
+        elif flag == "--trace-io":
+            options["trace_io"] = True
+        elif flag.startswith("--profile="):
+            options["profile"] = flag.split("=", 1)[1]
+        elif flag == "--profile" and len(argv) > 1:
+            options["profile"] = argv.pop(1)
+        else:
+            break
+        argv.pop(0)
+    return argv, options
+
+def _format_bytes(n):
+    """Formats a byte count with a binary unit."""
+    if n < 1024:
+        return f"{n} B"
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        n /= 1024
+        if n < 1024 or unit == "TiB":
+            return f"{n:.1f} {unit}"
+
+def run_instrumented(argv, timings=False, profile=None, trace_io=False):
+    """Runs a command line and reports wall/CPU time and command counters on stderr.
+
+    profile writes cProfile stats for the main thread to a file (view them with
+    'python -m pstats <file>'). trace_io reports syscall-level read/write counts
+    and bytes from psutil's process I/O counters.
+    """
+    import time
+    _enable_counters()
+    io_before = None
+    if trace_io:
+        try:
+            import psutil
+            process = psutil.Process()
+            io_before = process.io_counters()
+        except (ImportError, AttributeError, OSError):
+            print("Note: I/O counters are not available on this platform (needs psutil).", file=sys.stderr)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    times_before = os.times()
+    start = time.perf_counter()
+    try:
+        if profiler:
+            profiler.enable()
+        return run_command(argv)
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        times_after = os.times()
+        user = (times_after.user - times_before.user) + (times_after.children_user - times_before.children_user)
+        system = (times_after.system - times_before.system) + (times_after.children_system - times_before.children_system)
+        sys.stdout.flush()
+        name = argv[0] if argv else "help"
+        print(f"--- {name} ---", file=sys.stderr)
+        print(f"wall: {wall * 1000:.1f} ms  cpu: {(user + system) * 1000:.1f} ms "
+              f"(user {user * 1000:.1f} ms, system {system * 1000:.1f} ms)", file=sys.stderr)
+        if io_before is not None:
+            io_after = process.io_counters()
+            reads = io_after.read_count - io_before.read_count
+            writes = io_after.write_count - io_before.write_count
+            read_bytes = getattr(io_after, "read_chars", io_after.read_bytes) - getattr(io_before, "read_chars", io_before.read_bytes)
+            write_bytes = getattr(io_after, "write_chars", io_after.write_bytes) - getattr(io_before, "write_chars", io_before.write_bytes)
+            print(f"io: {reads} reads ({_format_bytes(read_bytes)}), {writes} writes ({_format_bytes(write_bytes)})", file=sys.stderr)
+            if hasattr(io_after, "read_chars"):
+                disk_read = io_after.read_bytes - io_before.read_bytes
+                disk_write = io_after.write_bytes - io_before.write_bytes
+                print(f"storage: {_format_bytes(disk_read)} read, {_format_bytes(disk_write)} written", file=sys.stderr)
+        for counter, value in sorted((_take_counters() or {}).items()):
+            print(f"{counter}: {value}", file=sys.stderr)
+        if profiler:
+            profiler.dump_stats(profile)
+            print(f"Profile written to '{profile}' (view with: python -m pstats {profile})", file=sys.stderr)
+
+def run_command(argv):
+    """Runs one command line (command name first, then its arguments).
+
+    Returns False for unknown commands and for commands that returned False or
+    reported an error through _print_error, True otherwise.
+    """
+    import _thread
+    if not argv:
+        display_help()
+        return True
+    entry = COMMANDS.get(argv[0])
+    if entry is None:
+        print(f"Unknown command: {argv[0]}")
+        display_help()
+        return False
+    handler, _ = entry
+    thread_id = _thread.get_ident()
+    _failed_threads.discard(thread_id)
+    try:
+        status = handler(argv[1:])
+    finally:
+        failed = thread_id in _failed_threads
+        _failed_threads.discard(thread_id)
+    return status is not False and not failed
+
+def main():
+    argv, options = _pop_global_flags(sys.argv[1:])
+    try:
+        if any(options.values()):
+            run_instrumented(argv, **options)
+        else:
+            run_command(argv)
+    except BrokenPipeError:
+        # Output piped into e.g. 'head' that exited early; _RecordWriter does the same for its commands.
+        _RecordWriter._silence_stdout()
+
+if __name__ == "__main__":
+    main()
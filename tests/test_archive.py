@@ -0,0 +1,82 @@
+import os
+import random
+import struct
+import zipfile
+
+import pytest
+
+import my_cli_tool
+
+
+@pytest.fixture
+def tree(tmp_path):
+    rng = random.Random(7)
+    root = tmp_path / "src"
+    (root / "sub").mkdir(parents=True)
+    # Larger than several deflate blocks, half random and half compressible.
+    big = rng.randbytes(300_000) + b"abc" * 100_000
+    (root / "big.bin").write_bytes(big)
+    (root / "sub" / "small.txt").write_bytes(b"hello\n")
+    (root / "sub" / "empty").write_bytes(b"")
+    return root
+
+
+def test_zip_round_trip(tree, tmp_path, capsys):
+    archive = str(tmp_path / "out.zip")
+    my_cli_tool.zip_item(str(tree), archive, jobs=2)
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.testzip() is None
+        assert zf.read("src/big.bin") == (tree / "big.bin").read_bytes()
+    my_cli_tool.unzip_item(archive, str(tmp_path / "dst"))
+    for name in ("big.bin", "sub/small.txt", "sub/empty"):
+        assert (tmp_path / "dst" / "src" / name).read_bytes() == (tree / name).read_bytes()
+
+
+def test_zip64_local_headers_are_readable(tree, tmp_path):
+    # Pretend big.bin is over 4 GiB so its local header and data descriptor take the ZIP64 form.
+    members = []
+    for arcname, path, st in my_cli_tool._archive_members(str(tree)):
+        if arcname == "src/big.bin":
+            fields = list(st[:10])
+            fields[6] = my_cli_tool.ZIP64_LIMIT
+            st = os.stat_result(fields)
+        members.append((arcname, path, st))
+    archive = tmp_path / "out.zip"
+    with open(archive, "wb") as out:
+        my_cli_tool._write_parallel_zip(out, members, 6, 2)
+    with zipfile.ZipFile(archive) as zf:
+        info = zf.getinfo("src/big.bin")
+        assert zf.testzip() is None
+        assert zf.read(info) == (tree / "big.bin").read_bytes()
+        data = archive.read_bytes()
+        header = data[info.header_offset:info.header_offset + 30]
+        version, = struct.unpack_from("<H", header, 4)
+        extra_len, = struct.unpack_from("<H", header, 28)
+        extra = data[info.header_offset + 30 + len(info.filename):][:extra_len]
+        assert version == 45 and struct.unpack_from("<H", extra)[0] == 1
+
+
+def test_tar_gz_member_extraction_via_index(tree, tmp_path, monkeypatch, capsys):
+    archive = str(tmp_path / "out.tar.gz")
+    my_cli_tool.create_tar_gz(str(tree), archive, jobs=2, index=True)
+    index = my_cli_tool._load_archive_index(archive)
+    assert index is not None and len(index["checkpoints"]) > 1
+    copied = []
+    copy = my_cli_tool._copy_indexed_member
+    monkeypatch.setattr(my_cli_tool, "_copy_indexed_member",
+                        lambda a, i, member, out: copied.append(member["name"]) or copy(a, i, member, out))
+    for name in ("big.bin", "sub/small.txt", "sub/empty"):
+        dest = tmp_path / name.replace("/", "_")
+        my_cli_tool.extract_archive_member(archive, f"src/{name}", str(dest))
+        assert dest.read_bytes() == (tree / name).read_bytes()
+    assert copied == ["src/big.bin", "src/sub/small.txt", "src/sub/empty"]
+
+
+def test_stale_tar_gz_index_falls_back_to_streaming(tree, tmp_path, capsys):
+    archive = str(tmp_path / "out.tar.gz")
+    my_cli_tool.create_tar_gz(str(tree), archive, index=True)
+    os.utime(archive, ns=(0, 0))
+    assert my_cli_tool._load_archive_index(archive) is None
+    dest = tmp_path / "small"
+    my_cli_tool.extract_archive_member(archive, "src/sub/small.txt", str(dest))
+    assert dest.read_bytes() == b"hello\n"
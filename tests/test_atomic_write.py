@@ -0,0 +1,33 @@
+import os
+import stat
+
+import my_cli_tool
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_gets_umask_mode(tmp_path):
+    target = tmp_path / "out.bin"
+    old_umask = os.umask(0o027)
+    try:
+        my_cli_tool._atomic_write(str(target), b"data")
+    finally:
+        os.umask(old_umask)
+    assert target.read_bytes() == b"data"
+    assert _mode(target) == 0o640
+
+
+def test_existing_file_keeps_mode(tmp_path):
+    target = tmp_path / "out.bin"
+    target.write_bytes(b"old")
+    os.chmod(target, 0o604)
+    my_cli_tool._atomic_write(str(target), b"new")
+    assert target.read_bytes() == b"new"
+    assert _mode(target) == 0o604
+
+
+def test_no_temporary_files_left(tmp_path):
+    my_cli_tool._atomic_write(str(tmp_path / "a"), b"x")
+    assert sorted(os.listdir(tmp_path)) == ["a"]
@@ -0,0 +1,26 @@
+import json
+
+import my_cli_tool
+
+
+def test_run_command_reports_failures(tmp_path, capsys):
+    assert my_cli_tool.run_command(["list", str(tmp_path)]) is True
+    assert my_cli_tool.run_command(["cat", str(tmp_path / "missing")]) is False
+    assert my_cli_tool.run_command(["mkdir"]) is False
+    assert my_cli_tool.run_command(["no-such-command"]) is False
+    assert my_cli_tool.run_command(["list", str(tmp_path)]) is True
+
+
+def test_batch_ok_follows_command_status(tmp_path, capfd):
+    (tmp_path / "f.txt").write_text("hello\n")
+    records = [
+        {"request_id": 1, "command": "cat", "args": [str(tmp_path / "f.txt")]},
+        {"request_id": 2, "command": "cat", "args": [str(tmp_path / "missing")]},
+        {"request_id": 3, "command": "mkdir"},
+    ]
+    source = tmp_path / "batch.jsonl"
+    source.write_text("".join(json.dumps(r) + "\n" for r in records))
+    my_cli_tool.run_batch(str(source), jobs=2)
+    results = [json.loads(line) for line in capfd.readouterr().out.splitlines()]
+    assert [(r["request_id"], r["ok"]) for r in results] == [(1, True), (2, False), (3, False)]
+    assert results[0]["stdout"] == "hello\n"
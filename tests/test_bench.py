@@ -0,0 +1,37 @@
+import json
+import os
+
+import pytest
+
+import my_cli_tool
+
+CONFIG = {"seed": 1, "fanout": 1, "depth": 0, "files": 3, "sizes": "small"}
+
+
+def test_failed_command_aborts_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(my_cli_tool, "run_command", lambda argv: False)
+    with pytest.raises(ValueError, match="du"):
+        my_cli_tool.run_benchmarks(CONFIG, ("du",), runs=1, warmup=0, work_dir=str(tmp_path))
+
+
+def test_kept_tree_is_rebuilt_when_config_changes(tmp_path):
+    my_cli_tool.run_benchmarks(CONFIG, ("du",), runs=1, warmup=0, work_dir=str(tmp_path))
+    tree = tmp_path / "tree"
+    assert len(os.listdir(tree)) == 3
+    (tree / "stray.txt").write_text("left over")
+    my_cli_tool.run_benchmarks(dict(CONFIG, files=5), ("du",), runs=1, warmup=0, work_dir=str(tmp_path))
+    assert sorted(os.listdir(tree)) == [f"file_{i:04d}.txt" for i in range(5)]
+    assert json.loads((tmp_path / my_cli_tool.BENCH_TREE_CONFIG).read_text())["files"] == 5
+
+
+def test_json_with_baseline_keeps_stdout_a_single_document(tmp_path, capsys):
+    args = ["--seed", "1", "--fanout", "1", "--depth", "0", "--files", "3", "--only", "du",
+            "--runs", "1", "--warmup", "0", "--dir", str(tmp_path)]
+    my_cli_tool.run_command(["bench", "run", *args, "--out", str(tmp_path / "base.json")])
+    capsys.readouterr()
+    my_cli_tool.run_command(["bench", "run", *args, "--json", "--baseline", str(tmp_path / "base.json"),
+                             "--threshold", "100000"])
+    captured = capsys.readouterr()
+    report = json.loads(captured.out)
+    assert report["baseline"]["regressions"] == []
+    assert "PASS" in captured.err
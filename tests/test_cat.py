@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+import my_cli_tool
+
+LINES = [b"line %d %s\n" % (i, b"x" * (i % 17)) for i in range(1, 401)]
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(tmp_path, monkeypatch):
+    # Small index blocks so line ranges cross many block boundaries.
+    monkeypatch.setattr(my_cli_tool, "LINE_INDEX_BLOCK_SIZE", 100)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def _cat(capfdbinary, path, **kwargs):
+    my_cli_tool.display_file_content(str(path), **kwargs)
+    return capfdbinary.readouterr().out
+
+
+def test_binary_content_and_byte_ranges(tmp_path, capfdbinary):
+    data = random.Random(5).randbytes(300_000) + b"\0\r\n\xff"
+    path = tmp_path / "blob"
+    path.write_bytes(data)
+    assert _cat(capfdbinary, path) == data
+    assert _cat(capfdbinary, path, offset=12345, length=1000) == data[12345:13345]
+    assert _cat(capfdbinary, path, offset=len(data) - 3) == data[-3:]
+    assert _cat(capfdbinary, path, offset=len(data) + 10, length=5) == b""
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+@pytest.mark.parametrize("first,last", [(1, 1), (1, 400), (7, 93), (150, None), (399, 500), (401, None), (2, 2)])
+def test_line_ranges(tmp_path, capfdbinary, use_index, first, last):
+    path = tmp_path / "log"
+    path.write_bytes(b"".join(LINES))
+    expected = b"".join(LINES[first - 1:last])
+    assert _cat(capfdbinary, path, lines=(first, last), use_index=use_index) == expected
+
+
+def test_line_index_follows_appends_and_rewrites(tmp_path, capfdbinary):
+    path = tmp_path / "log"
+    path.write_bytes(b"".join(LINES[:200]))
+    assert _cat(capfdbinary, path, lines=(150, 151), use_index=True) == b"".join(LINES[149:151])
+    with open(path, "ab") as f:
+        f.write(b"".join(LINES[200:]))
+    assert _cat(capfdbinary, path, lines=(300, 302), use_index=True) == b"".join(LINES[299:302])
+    rewritten = [b"short %d\n" % i for i in range(1, 401)]
+    path.write_bytes(b"".join(rewritten))
+    assert _cat(capfdbinary, path, lines=(300, 302), use_index=True) == b"".join(rewritten[299:302])
+
+
+def test_missing_final_newline(tmp_path, capfdbinary):
+    path = tmp_path / "log"
+    path.write_bytes(b"a\nb\nc")
+    assert _cat(capfdbinary, path, lines=(3, None)) == b"c"
+    assert _cat(capfdbinary, path, lines=(2, 3), use_index=True) == b"b\nc"
@@ -0,0 +1,62 @@
+import os
+import random
+import shutil
+import stat
+import subprocess
+
+import pytest
+
+import my_cli_tool
+
+
+@pytest.mark.parametrize("spec,mode,is_dir,expected", [
+    ("755", 0o600, False, 0o755),
+    ("0640", 0o777, False, 0o640),
+    ("u+x", 0o644, False, 0o744),
+    ("go-w", 0o666, False, 0o644),
+    ("a=r", 0o755, False, 0o444),
+    ("=rw", 0o700, False, 0o666),
+    ("u+rwX,go-w", 0o664, False, 0o644),
+    ("u+rwX,go-w", 0o764, False, 0o744),
+    ("a+X", 0o644, True, 0o755),
+    ("a+X", 0o644, False, 0o644),
+    ("o=g", 0o750, False, 0o755),
+    ("g=u-w", 0o700, False, 0o750),
+    ("u+s,g+s", 0o755, False, 0o6755),
+    ("+t", 0o777, True, 0o1777),
+    ("u=rwx", 0o2755, True, 0o2755),
+    ("u=rwx", 0o4755, False, 0o755),
+    ("g=rx,o=", 0o2777, True, 0o2750),
+])
+def test_parse_mode(spec, mode, is_dir, expected):
+    assert my_cli_tool._parse_mode(spec)(mode, is_dir) == expected
+
+
+@pytest.mark.parametrize("spec", ["u+q", "x+r", "u+rw,", "8", "u"])
+def test_invalid_mode(spec):
+    with pytest.raises(ValueError):
+        my_cli_tool._parse_mode(spec)
+
+
+@pytest.mark.skipif(shutil.which("chmod") is None, reason="needs chmod(1)")
+def test_matches_chmod_command(tmp_path):
+    rng = random.Random(11)
+    file_path = tmp_path / "f"
+    dir_path = tmp_path / "d"
+    file_path.touch()
+    dir_path.mkdir()
+    for _ in range(200):
+        clauses = []
+        for _ in range(rng.randint(1, 3)):
+            who = "".join(rng.sample("ugoa", rng.randint(0, 2)))
+            actions = "".join(rng.choice("+-=") + (rng.choice("ugo") if rng.random() < 0.2
+                                                   else "".join(rng.sample("rwxXst", rng.randint(0, 3))))
+                              for _ in range(rng.randint(1, 2)))
+            clauses.append(who + actions)
+        spec = ",".join(clauses)
+        start = rng.randrange(0o10000)
+        for path, is_dir in ((file_path, False), (dir_path, True)):
+            os.chmod(path, start)
+            subprocess.run(["sh", "-c", 'umask 0 && chmod "$0" "$1"', spec, str(path)], check=True)
+            expected = stat.S_IMODE(os.stat(path).st_mode)
+            assert my_cli_tool._parse_mode(spec)(start, is_dir) == expected, (spec, oct(start), is_dir)
@@ -0,0 +1,52 @@
+import os
+
+import my_cli_tool
+
+
+def _tree(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).write_bytes(b"same content" * 1000)
+    (tmp_path / "d").write_bytes(b"other")
+    return tmp_path
+
+
+def test_duplicates_are_hardlinked(tmp_path, capsys):
+    _tree(tmp_path)
+    my_cli_tool.find_duplicates(str(tmp_path), "hard", jobs=1)
+    assert "3 identical files" in capsys.readouterr().out
+    assert os.stat(tmp_path / "a").st_ino == os.stat(tmp_path / "b").st_ino == os.stat(tmp_path / "c").st_ino
+    assert os.stat(tmp_path / "d").st_nlink == 1
+
+
+def test_file_changed_after_hashing_is_not_linked(tmp_path, monkeypatch, capsys):
+    _tree(tmp_path)
+    refine = my_cli_tool._refine_groups
+
+    def refine_then_modify(groups, key_func, jobs):
+        result = refine(groups, key_func, jobs)
+        (tmp_path / "b").write_bytes(b"rewritten!!!" * 1000)
+        return result
+
+    monkeypatch.setattr(my_cli_tool, "_refine_groups", refine_then_modify)
+    assert my_cli_tool.run_command(["dedup", str(tmp_path), "--link", "hard"]) is False
+    assert "Skipped" in capsys.readouterr().out
+    assert (tmp_path / "b").read_bytes() == b"rewritten!!!" * 1000
+    assert os.stat(tmp_path / "a").st_ino == os.stat(tmp_path / "c").st_ino
+
+
+def test_unreadable_entry_is_skipped(tmp_path, monkeypatch, capsys):
+    _tree(tmp_path)
+    walk = my_cli_tool._walk_files
+
+    class Vanished:
+        def stat(self, follow_symlinks=True):
+            raise FileNotFoundError("gone")
+
+    def walk_with_vanished(directory):
+        yield os.path.join(directory, "gone"), Vanished()
+        yield from walk(directory)
+
+    monkeypatch.setattr(my_cli_tool, "_walk_files", walk_with_vanished)
+    my_cli_tool.find_duplicates(str(tmp_path))
+    out = capsys.readouterr().out
+    assert "3 identical files" in out and "unexpected" not in out
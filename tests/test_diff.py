@@ -0,0 +1,119 @@
+import difflib
+import random
+
+import pytest
+
+import my_cli_tool
+
+
+def _diff(tmp_path, capfdbinary, old, new):
+    path1 = tmp_path / "a.txt"
+    path2 = tmp_path / "b.txt"
+    path1.write_bytes(old)
+    path2.write_bytes(new)
+    my_cli_tool.compare_files(str(path1), str(path2))
+    return capfdbinary.readouterr().out, str(path1), str(path2)
+
+
+def _check_opcodes(a, b, ops):
+    rebuilt = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in ops:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        rebuilt.extend(b[j1:j2])
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    assert rebuilt == b
+
+
+@pytest.mark.parametrize("old,new", [
+    (b"a\nb\nc\n", b"a\nb\nc\n"),
+    (b"a\nb\nc\n", b"a\nx\nc\n"),
+    (b"".join(b"%d\n" % i for i in range(40)), b"".join(b"%d\n" % i for i in range(40) if i not in (5, 30)) + b"new\n"),
+    (b"one\ntwo\n", b"three\nfour\nfive\n"),
+    (b"", b"a\nb\n"),
+    (b"a\nb\n", b""),
+])
+def test_unified_diff_matches_difflib(tmp_path, capfdbinary, old, new):
+    out, path1, path2 = _diff(tmp_path, capfdbinary, old, new)
+    expected = b"".join(difflib.diff_bytes(
+        difflib.unified_diff, old.splitlines(True), new.splitlines(True),
+        path1.encode(), path2.encode(), lineterm=b"\n"))
+    assert out == expected
+
+
+def test_missing_final_newline_is_marked(tmp_path, capfdbinary):
+    out, _, _ = _diff(tmp_path, capfdbinary, b"a\nb", b"a\nc")
+    assert out.endswith(b"-b\n\\ No newline at end of file\n+c\n\\ No newline at end of file\n")
+
+
+def test_opcodes_are_minimal():
+    rng = random.Random(7)
+    for _ in range(300):
+        a = [rng.randrange(5) for _ in range(rng.randrange(25))]
+        b = [x for x in a if rng.random() < 0.7] + [rng.randrange(5) for _ in range(rng.randrange(4))]
+        if rng.random() < 0.3:
+            rng.shuffle(b)
+        ops = my_cli_tool._myers_opcodes(a, b)
+        _check_opcodes(a, b, ops)
+        matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+        ours = sum(i2 - i1 for tag, i1, i2, _, _ in ops if tag == "equal")
+        assert ours >= sum(block.size for block in matcher.get_matching_blocks())
+
+
+def test_large_rewrite_is_fast():
+    a = list(range(20000))
+    b = list(range(20000, 40000))
+    assert my_cli_tool._myers_opcodes(a, b) == [("replace", 0, 20000, 0, 20000)]
+
+
+def test_cost_limit_keeps_script_valid():
+    rng = random.Random(3)
+    a = [rng.randrange(30) for _ in range(2000)]
+    b = [rng.randrange(30) for _ in range(2000)]
+    _check_opcodes(a, b, my_cli_tool._myers_opcodes(a, b))
+
+
+def _apply_unified(old_lines, diff):
+    """Applies a unified diff to a list of lines, checking every context and removed line."""
+    result = []
+    pos = 0
+    for line in diff.splitlines(True)[2:]:
+        if line.startswith(b"@@"):
+            start = int(line.split()[1][1:].split(b",")[0])
+            # A zero-length hunk range names the line before the hunk.
+            count = line.split()[1].split(b",")
+            start = start - 1 if len(count) == 1 or int(count[1]) else start
+            result.extend(old_lines[pos:start])
+            pos = start
+        elif line.startswith(b"\\"):
+            continue
+        elif line[:1] in (b" ", b"-"):
+            assert old_lines[pos] == line[1:]
+            pos += 1
+            if line[:1] == b" ":
+                result.append(line[1:])
+        else:
+            result.append(line[1:])
+    return result + old_lines[pos:]
+
+
+def test_diff_hitting_cost_limit_still_applies(tmp_path, capfdbinary, monkeypatch):
+    rng = random.Random(11)
+    old = [b"line %d\n" % rng.randrange(40) for _ in range(3000)]
+    new = [b"line %d\n" % rng.randrange(40) for _ in range(3000)]
+    gave_up = []
+    snake = my_cli_tool._myers_middle_snake
+
+    def spy(*args):
+        result = snake(*args)
+        if result is not None and result[0] == result[1] and result[2][2] == 0:
+            gave_up.append(result)
+        return result
+
+    monkeypatch.setattr(my_cli_tool, "_myers_middle_snake", spy)
+    out, _, _ = _diff(tmp_path, capfdbinary, b"".join(old), b"".join(new))
+    assert gave_up, "inputs this different should exceed the cost limit"
+    assert _apply_unified(old, out) == new
@@ -0,0 +1,67 @@
+import os
+
+import my_cli_tool
+
+
+def test_unreadable_directory_is_skipped(tmp_path, monkeypatch):
+    (tmp_path / "ok").mkdir()
+    (tmp_path / "ok" / "f").write_bytes(b"x" * 10)
+    locked = tmp_path / "locked"
+    locked.mkdir()
+    (locked / "g").write_bytes(b"y" * 5)
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if path == str(locked):
+            raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    totals, scanned, errors = my_cli_tool._directory_sizes(str(tmp_path))
+    assert totals[str(tmp_path)] == 10
+    assert [d for d, _ in errors] == [str(locked)]
+
+
+def test_failing_scan_does_not_abort_walk(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+
+    def scan(path):
+        if path.endswith("a"):
+            raise PermissionError(13, "Permission denied", path)
+        return None, [e.path for e in os.scandir(path) if e.is_dir()]
+
+    results = my_cli_tool._parallel_scan(str(tmp_path), scan, jobs=2)
+    assert sorted(results) == [str(tmp_path), str(tmp_path / "b")]
+
+
+def _sample_tree(root):
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "f").write_bytes(b"x" * 10)
+    (root / "a" / "b" / "g").write_bytes(b"y" * 5)
+    os.link(root / "a" / "f", root / "a" / "b" / "f-link")
+
+
+def test_no_cache_keeps_only_sizes(tmp_path, monkeypatch):
+    _sample_tree(tmp_path)
+    entries = []
+    scan = my_cli_tool._scan_du_dir
+
+    def recording_scan(path, cache=None):
+        entry, children = scan(path, cache)
+        entries.append(entry)
+        return entry, children
+
+    monkeypatch.setattr(my_cli_tool, "_scan_du_dir", recording_scan)
+    totals, _, _ = my_cli_tool._directory_sizes(str(tmp_path))
+    assert totals[str(tmp_path)] == 15 and totals[str(tmp_path / "a" / "b")] == 5
+    assert entries and all("subdirs" not in e and "mtime_ns" not in e for e in entries)
+
+
+def test_cache_reuses_unchanged_directories(tmp_path):
+    _sample_tree(tmp_path / "tree")
+    cache = str(tmp_path / "du.cache")
+    first, scanned, _ = my_cli_tool._directory_sizes(str(tmp_path / "tree"), cache_path=cache)
+    assert scanned == 3
+    second, scanned, _ = my_cli_tool._directory_sizes(str(tmp_path / "tree"), cache_path=cache)
+    assert scanned == 0 and second == first
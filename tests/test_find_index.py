@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+import my_cli_tool
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    for rel in ["a.txt", "b.py", "sub/a.py", "sub/deep/ab.txt", "sub/deep/x y.py", "é/café.py", "a/b/c.txt"]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    index_path = tmp_path / "tree.idx"
+    my_cli_tool.build_index(str(root), str(index_path))
+    return str(root), str(index_path)
+
+
+@pytest.mark.parametrize("mode,term", [
+    ("substring", "a"), ("substring", "a.p"), ("substring", "é"), ("substring", "sub"),
+    ("substring", ""), ("glob", "*.py"), ("glob", "?.txt"), ("regex", "^a"), ("regex", r"\s"),
+])
+def test_index_matches_walk(tree, mode, term):
+    root, index_path = tree
+    matches = my_cli_tool._compile_name_matcher(term, mode)
+    index = my_cli_tool._read_index(index_path)
+    from_index = sorted(my_cli_tool._iter_found_files(root, matches, index, term, mode))
+    from_walk = sorted(my_cli_tool._iter_found_files(root, matches))
+    assert from_index == from_walk
+
+
+def test_update_picks_up_changes(tree):
+    root, index_path = tree
+    os.remove(os.path.join(root, "sub", "a.py"))
+    open(os.path.join(root, "sub", "new.py"), "w").close()
+    my_cli_tool.update_index(index_path)
+    matches = my_cli_tool._compile_name_matcher(".py")
+    index = my_cli_tool._read_index(index_path)
+    found = sorted(os.path.relpath(p, root) for p in my_cli_tool._iter_found_files(root, matches, index, ".py"))
+    assert found == ["b.py", "sub/deep/x y.py", "sub/new.py", "é/café.py"]
+
+
+def test_auto_built_index_keeps_nul_output_clean(tree, tmp_path, capsys):
+    root, _ = tree
+    fresh = str(tmp_path / "fresh.idx")
+    my_cli_tool.find_files(root, ".py", index_path=fresh, fmt="nul")
+    captured = capsys.readouterr()
+    assert "Indexed" in captured.err
+    found = sorted(os.path.relpath(p, root) for p in captured.out.split("\0") if p)
+    assert found == ["b.py", "sub/a.py", "sub/deep/x y.py", "é/café.py"]
@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+import my_cli_tool
+
+TEXT = b"foo\nbar\n\n  baz qux\nfoo bar\nzzz\nlast line without newline"
+
+
+def _reference(pattern, data):
+    regex = re.compile(pattern)
+    return [(i, line) for i, line in enumerate(data.split(b"\n"), 1) if regex.search(line)]
+
+
+@pytest.mark.parametrize("pattern", [
+    rb"foo\s+bar", rb"o[^z]*r", rb"\s", rb"^$", rb"$", rb"^\s*b", rb"bar$", rb"a", rb"[^a-z]+",
+    rb"line", rb"r\nb", rb"\n", rb"z+",
+])
+def test_matches_are_line_bounded(tmp_path, pattern):
+    path = tmp_path / "g.txt"
+    path.write_bytes(TEXT)
+    found = [(n, bytes(line)) for n, line in my_cli_tool._grep_file(str(path), pattern)]
+    assert found == _reference(pattern, TEXT)
+
+
+def test_no_cross_line_match(tmp_path):
+    path = tmp_path / "g.txt"
+    path.write_bytes(b"foo\nbar\n")
+    assert my_cli_tool._grep_file(str(path), rb"foo\s+bar") == []
+    assert my_cli_tool._grep_file(str(path), rb"o[^z]*r") == []
+
+
+def test_binary_file_is_skipped(tmp_path):
+    path = tmp_path / "b.bin"
+    path.write_bytes(b"foo\0bar")
+    assert my_cli_tool._grep_file(str(path), rb"foo") is None
+
+
+@pytest.mark.parametrize("pattern", [rb"foo", rb"line", rb"nomatch"])
+@pytest.mark.parametrize("data", [TEXT, TEXT + b"\n"])
+def test_lines_scanned_counter(tmp_path, monkeypatch, pattern, data):
+    path = tmp_path / "g.txt"
+    path.write_bytes(data)
+    monkeypatch.setattr(my_cli_tool, "_counters", None)
+    my_cli_tool._enable_counters()
+    my_cli_tool._grep_file(str(path), pattern)
+    counters = my_cli_tool._take_counters()
+    assert counters["grep.lines_scanned"] == len(data.rstrip(b"\n").split(b"\n"))
+    assert counters["grep.bytes_scanned"] == len(data)
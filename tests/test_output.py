@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import my_cli_tool
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def test_hash_into_closed_pipe_is_quiet(tmp_path):
+    for i in range(3000):
+        (tmp_path / f"f{i:04d}").write_bytes(b"%d" % i)
+    proc = subprocess.Popen([sys.executable, MAIN, "hash", str(tmp_path), "md5"],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert proc.stdout.readline().endswith(b"f0000\n")
+    proc.stdout.close()
+    stderr = proc.stderr.read()
+    proc.wait()
+    assert b"Traceback" not in stderr
+
+
+@pytest.mark.parametrize("argv", [
+    ["archive", "ls", "{archive}"], ["tail", "-n", "100000", "{big}"], ["stat", "-r", "{tree}"],
+    ["cat", "{big}"], ["sysinfo", "--json"],
+])
+def test_commands_into_closed_pipe_are_quiet(tmp_path, argv):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(2000):
+        (tree / f"f{i:04d}").write_bytes(b"%d" % i)
+    big = tmp_path / "big.txt"
+    big.write_bytes(b"".join(b"line %d\n" % i for i in range(100000)))
+    archive = tmp_path / "tree.tar.gz"
+    my_cli_tool.run_command(["tar.gz", str(tree), str(archive)])
+    argv = [a.format(archive=archive, big=big, tree=tree) for a in argv]
+    proc = subprocess.Popen([sys.executable, MAIN, *argv], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    proc.stdout.read(1)
+    proc.stdout.close()
+    stderr = proc.stderr.read()
+    proc.wait()
+    assert b"Traceback" not in stderr and b"Broken pipe" not in stderr
+
+
+def test_record_writer_ndjson(capfdbinary):
+    with my_cli_tool._RecordWriter("ndjson") as out:
+        out.write({"path": "a b"}, lambda r: r["path"])
+        out.write({"path": "c"}, lambda r: r["path"])
+    lines = capfdbinary.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [{"path": "a b"}, {"path": "c"}]
+
+
+def test_stat_and_env_usage_errors_mark_failure(capsys):
+    assert my_cli_tool.run_command(["stat", "--format", "xml", "."]) is False
+    assert my_cli_tool.run_command(["env", "bogus"]) is False
+    assert my_cli_tool.run_command(["env", "set", "a=b", "x"]) is False
+    out = capsys.readouterr().out
+    assert "Unknown env subcommand: bogus" in out
+    assert "Cannot set environment variable 'a=b'" in out
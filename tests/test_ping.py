@@ -0,0 +1,56 @@
+import json
+import shutil
+import sys
+
+import my_cli_tool
+
+FAKE_PING = """
+import sys, time
+host = sys.argv[1]
+if host.startswith("down"):
+    print("1 packets transmitted, 0 received, 100% packet loss, time 0ms")
+    sys.exit(1)
+if host == "slow":
+    time.sleep(0.2)
+print("64 bytes from %s: icmp_seq=1 ttl=64 time=0.040 ms" % host)
+print("1 packets transmitted, 1 received, 0% packet loss, time 0ms")
+print("rtt min/avg/max/mdev = 0.040/0.040/0.040/0.000 ms")
+"""
+
+
+def _fake_ping(monkeypatch):
+    def command(host, count):
+        if host == "boom":
+            return ["/nonexistent/ping-binary", host]
+        return [sys.executable, "-c", FAKE_PING, host]
+
+    monkeypatch.setattr(my_cli_tool, "_ping_command", command)
+    monkeypatch.setattr(shutil, "which", lambda name: "/usr/bin/" + name)
+
+
+def test_failing_host_does_not_abort_sweep(monkeypatch, capsys):
+    _fake_ping(monkeypatch)
+    my_cli_tool.ping_hosts(["slow", "boom", "downhost", "ok"], timeout=5, concurrency=2, as_json=True)
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["host"], r["status"]) for r in results] == [
+        ("slow", "up"), ("boom", "error"), ("downhost", "down"), ("ok", "up")]
+    assert "No such file" in results[1]["error"]
+
+
+def test_cidr_expansion(monkeypatch, capsys):
+    _fake_ping(monkeypatch)
+    my_cli_tool.ping_hosts(["10.0.0.0/30", "10.0.1.7/32"], concurrency=3)
+    out = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in out[1:-1]] == ["10.0.0.1", "10.0.0.2", "10.0.1.7"]
+    assert out[-1] == "3 of 3 hosts up."
+
+
+def test_large_ranges_are_expanded_lazily():
+    hosts = my_cli_tool._expand_hosts(["10.0.0.0/8", "2001:db8::/64"])
+    assert [next(hosts) for _ in range(2)] == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_invalid_range_is_rejected_before_pinging(monkeypatch, capsys):
+    _fake_ping(monkeypatch)
+    my_cli_tool.ping_hosts(["ok", "10.0.0.0/33"])
+    assert capsys.readouterr().out.startswith("Error:")
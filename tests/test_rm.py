@@ -0,0 +1,41 @@
+import os
+import sys
+
+import my_cli_tool
+
+
+def _deep_tree(root, depth):
+    os.makedirs(root)
+    fd = os.open(root, os.O_RDONLY)
+    try:
+        for _ in range(depth):
+            os.mkdir("d", dir_fd=fd)
+            sub = os.open("d", os.O_RDONLY, dir_fd=fd)
+            os.close(fd)
+            fd = sub
+        os.close(os.open("f", os.O_WRONLY | os.O_CREAT, dir_fd=fd))
+    finally:
+        os.close(fd)
+
+
+def test_deep_tree_does_not_recurse(tmp_path):
+    root = str(tmp_path / "deep")
+    _deep_tree(root, 300)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        stats = my_cli_tool.remove_tree(root, jobs=1)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert not os.path.exists(root)
+    assert (stats.files, stats.dirs, stats.errors) == (1, 301, [])
+
+
+def test_dry_run_without_recursive_refuses_non_empty_directory(tmp_path, capsys):
+    (tmp_path / "full" / "sub").mkdir(parents=True)
+    (tmp_path / "empty").mkdir()
+    assert not my_cli_tool.run_command(["rm", "--dry-run", str(tmp_path / "full")])
+    assert "would not be deleted" in capsys.readouterr().out
+    assert my_cli_tool.run_command(["rm", "--dry-run", str(tmp_path / "empty")])
+    assert "Would delete empty directory" in capsys.readouterr().out
+    assert os.path.isdir(tmp_path / "full" / "sub") and os.path.isdir(tmp_path / "empty")
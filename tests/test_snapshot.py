@@ -0,0 +1,97 @@
+import os
+import random
+import time
+
+import pytest
+
+import my_cli_tool
+
+
+@pytest.fixture
+def same_second(monkeypatch):
+    # Every snapshot gets the same timestamp ID, as when several are taken within one second.
+    monkeypatch.setattr(time, "strftime", lambda fmt, t=None: "20260101T000000Z")
+
+
+def _snapshot(source, store, content, capsys):
+    (source / "data.txt").write_bytes(content)
+    my_cli_tool.create_snapshot(str(source), str(store), jobs=1)
+    out = capsys.readouterr().out
+    assert out.startswith("Snapshot '")
+    return out.split("'")[1]
+
+
+def test_latest_is_last_snapshot_within_one_second(tmp_path, capsys, same_second):
+    source = tmp_path / "src"
+    source.mkdir()
+    store = tmp_path / "store"
+    ids = [_snapshot(source, store, b"version %d\n" % i, capsys) for i in range(3)]
+    assert ids == ["20260101T000000Z", "20260101T000000Z-2", "20260101T000000Z-3"]
+    assert [m["id"] for m in my_cli_tool._load_snapshots(str(store))] == ids
+
+    my_cli_tool.restore_snapshot(str(store), "latest", str(tmp_path / "latest"))
+    assert (tmp_path / "latest" / "data.txt").read_bytes() == b"version 2\n"
+    for i, snapshot_id in enumerate(ids):
+        dest = tmp_path / f"restore{i}"
+        my_cli_tool.restore_snapshot(str(store), snapshot_id, str(dest))
+        assert (dest / "data.txt").read_bytes() == b"version %d\n" % i
+
+
+def test_suffix_ten_sorts_after_two(tmp_path, capsys, same_second):
+    source = tmp_path / "src"
+    source.mkdir()
+    store = tmp_path / "store"
+    ids = [_snapshot(source, store, b"v%d" % i, capsys) for i in range(11)]
+    assert ids[-1] == "20260101T000000Z-11"
+    assert [m["id"] for m in my_cli_tool._load_snapshots(str(store))] == ids
+    my_cli_tool.restore_snapshot(str(store), "latest", str(tmp_path / "out"))
+    assert (tmp_path / "out" / "data.txt").read_bytes() == b"v10"
+
+
+def test_unchanged_files_reuse_previous_chunks(tmp_path, capsys):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "sub" / "big.bin").write_bytes(os.urandom(200000))
+    store = tmp_path / "store"
+    _snapshot(source, store, b"one", capsys)
+    first, = my_cli_tool._load_snapshots(str(store))
+    (source / "data.txt").write_bytes(b"two")
+    my_cli_tool.create_snapshot(str(source), str(store), jobs=1)
+    assert "1 unchanged, 1 read" in capsys.readouterr().out
+    second = my_cli_tool._load_snapshots(str(store))[-1]
+    big = [e for m in (first, second) for e in m["entries"] if e["path"] == os.path.join("sub", "big.bin")]
+    assert big[0]["chunks"] == big[1]["chunks"]
+
+
+def _rolling_cut(buf):
+    """The byte-at-a-time gear hash _cdc_cut must agree with."""
+    n = min(len(buf), my_cli_tool.CDC_MAX_SIZE)
+    if n <= my_cli_tool.CDC_MIN_SIZE:
+        return n
+    gear = my_cli_tool._cdc_gear()
+    h = 0
+    normal = min(my_cli_tool.CDC_AVG_SIZE, n)
+    for i in range(my_cli_tool.CDC_MIN_SIZE, n):
+        h = ((h << 1) + gear[buf[i]]) & 0xFFFFFFFF
+        if not h & (my_cli_tool.CDC_MASK_STRICT if i < normal else my_cli_tool.CDC_MASK_LOOSE):
+            return i + 1
+    return n
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_cdc_cut_matches_rolling_hash(seed):
+    rng = random.Random(seed)
+    size = rng.choice([100, my_cli_tool.CDC_MIN_SIZE + 1, 70000, 300000])
+    buf = rng.randbytes(size) if seed % 4 else bytes(size)
+    assert my_cli_tool._cdc_cut(memoryview(bytearray(buf))) == _rolling_cut(buf)
+
+
+def test_cdc_cut_outruns_rolling_hash():
+    buf = random.Random(1).randbytes(my_cli_tool.CDC_MAX_SIZE)
+    start = time.perf_counter()
+    _rolling_cut(buf)
+    rolling = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(3):
+        my_cli_tool._cdc_cut(buf)
+    assert (time.perf_counter() - start) / 3 < rolling / 2
@@ -0,0 +1,58 @@
+import os
+
+import my_cli_tool
+
+
+def _part(dest, name, st):
+    return dest / my_cli_tool._sync_part_name(name, st)
+
+
+def test_resumes_partial_copy(tmp_path, capsys):
+    src = tmp_path / "src"
+    dest = tmp_path / "dst"
+    src.mkdir()
+    dest.mkdir()
+    data = os.urandom(100000)
+    (src / "f").write_bytes(data)
+    _part(dest, "f", os.stat(src / "f")).write_bytes(data[:40000])
+    my_cli_tool.sync_tree(str(src), str(dest))
+    assert "1 files copied (60000 bytes)" in capsys.readouterr().out
+    assert (dest / "f").read_bytes() == data
+    assert sorted(os.listdir(dest)) == ["f"]
+
+
+def test_stale_parts_are_removed_and_unrelated_ones_kept(tmp_path, capsys):
+    src = tmp_path / "src"
+    dest = tmp_path / "dst"
+    src.mkdir()
+    dest.mkdir()
+    (src / "f").write_bytes(b"new content")
+    (src / ".keep.1-2.part").write_bytes(b"a source file")
+    (dest / ".f.999-1.part").write_bytes(b"old")
+    (dest / ".unrelated.5-5.part").write_bytes(b"not ours")
+    my_cli_tool.sync_tree(str(src), str(dest))
+    assert "0 errors" in capsys.readouterr().out
+    assert sorted(os.listdir(dest)) == [".keep.1-2.part", ".unrelated.5-5.part", "f"]
+    assert (dest / "f").read_bytes() == b"new content"
+
+
+def test_failing_entry_does_not_stop_directory(tmp_path, capsys, monkeypatch):
+    src = tmp_path / "src"
+    dest = tmp_path / "dst"
+    src.mkdir()
+    for name in ("a", "b", "c"):
+        (src / name).write_bytes(name.encode())
+    os.symlink("a", src / "link")
+    real_readlink = os.readlink
+
+    def readlink(path, *args, **kwargs):
+        if str(path) == str(src / "link"):
+            raise PermissionError(13, "Permission denied", path)
+        return real_readlink(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "readlink", readlink)
+    my_cli_tool.sync_tree(str(src), str(dest))
+    out = capsys.readouterr().out
+    assert f"Error syncing '{src / 'link'}'" in out
+    assert "3 files copied" in out and "1 errors" in out
+    assert sorted(os.listdir(dest)) == ["a", "b", "c"]
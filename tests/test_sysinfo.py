@@ -0,0 +1,37 @@
+import threading
+import time
+
+import pytest
+
+import my_cli_tool
+
+psutil = pytest.importorskip("psutil")
+
+
+def test_hung_mount_does_not_leak_threads(monkeypatch):
+    mountpoint = psutil.disk_partitions()[0].mountpoint
+    release = threading.Event()
+    real_disk_usage = psutil.disk_usage
+
+    def disk_usage(path):
+        if path == mountpoint:
+            release.wait()
+        return real_disk_usage(path)
+
+    monkeypatch.setattr(psutil, "disk_usage", disk_usage)
+    monkeypatch.setattr(my_cli_tool, "_disk_probes", {})
+    try:
+        counts = []
+        for _ in range(4):
+            usages = my_cli_tool._disk_usages(timeout=0.05)
+            assert [d for d in usages if d["mountpoint"] == mountpoint][0]["timeout"]
+            counts.append(threading.active_count())
+        assert len(set(counts)) == 1
+    finally:
+        release.set()
+        time.sleep(0.05)
+
+
+def test_cpu_total_ignores_guest_time():
+    times = {"user": 10.0, "system": 5.0, "idle": 80.0, "guest": 4.0, "guest_nice": 1.0}
+    assert my_cli_tool._cpu_total(times) == 95.0
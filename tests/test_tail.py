@@ -0,0 +1,76 @@
+import os
+import select
+import subprocess
+import sys
+import time
+
+import my_cli_tool
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def test_follower_drains_rotated_file_then_reads_new_one(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"old 1\n")
+    follower = my_cli_tool._Follower(str(log))
+    follower.file.seek(0, os.SEEK_END)
+    with open(log, "ab") as f:
+        f.write(b"old 2\n")
+        os.rename(log, tmp_path / "app.log.1")
+        f.write(b"old 3\n")
+    log.write_bytes(b"new 1\n")
+    assert follower.read_new() == b"old 2\nold 3\nnew 1\n"
+    with open(log, "ab") as f:
+        f.write(b"new 2\n")
+    assert follower.read_new() == b"new 2\n"
+    follower.close()
+
+
+def test_follower_rewinds_after_truncation(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"a long first line\n")
+    follower = my_cli_tool._Follower(str(log))
+    follower.file.seek(0, os.SEEK_END)
+    log.write_bytes(b"short\n")
+    assert follower.read_new() == b"short\n"
+    follower.close()
+
+
+def test_follower_waits_for_missing_file(tmp_path):
+    log = tmp_path / "app.log"
+    follower = my_cli_tool._Follower(str(log))
+    assert follower.read_new() == b""
+    log.write_bytes(b"appeared\n")
+    assert follower.read_new() == b"appeared\n"
+    follower.close()
+
+
+def _read_until(stream, needle, timeout=10):
+    data = b""
+    deadline = time.monotonic() + timeout
+    while needle not in data and time.monotonic() < deadline:
+        ready, _, _ = select.select([stream], [], [], 0.1)
+        if ready:
+            chunk = os.read(stream.fileno(), 65536)
+            if not chunk:
+                break
+            data += chunk
+    return data
+
+
+def test_tail_follow_across_rotation(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"before\n")
+    proc = subprocess.Popen([sys.executable, MAIN, "tail", "-f", str(log)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        assert b"Following" in _read_until(proc.stdout, b"Ctrl+C")
+        with open(log, "ab") as f:
+            f.write(b"appended\n")
+        assert _read_until(proc.stdout, b"appended\n").endswith(b"appended\n")
+        os.rename(log, tmp_path / "app.log.1")
+        log.write_bytes(b"rotated\n")
+        assert _read_until(proc.stdout, b"rotated\n").endswith(b"rotated\n")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import my_cli_tool
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "a" / "deep").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "one.txt").write_bytes(b"x" * 100)
+    (root / "a" / "deep" / "two.txt").write_bytes(b"y" * 20)
+    (root / "b" / "three.log").write_bytes(b"z" * 3)
+    return root
+
+
+@pytest.fixture
+def model(tree):
+    try:
+        inotify = my_cli_tool._Inotify()
+    except (OSError, AttributeError):
+        pytest.skip("inotify is not available")
+    model = my_cli_tool._TreeModel(str(tree), inotify)
+    model.rescan()
+    yield model
+    inotify.close()
+
+
+def _sync(model):
+    model.apply_events(model.inotify.read_events())
+
+
+def _find(model, term):
+    return sorted(os.path.relpath(p, model.root) for p in model.query({"op": "find", "term": term})["matches"])
+
+
+def test_file_delete_and_rename(model, tree):
+    os.remove(tree / "a" / "deep" / "two.txt")
+    os.rename(tree / "b" / "three.log", tree / "a" / "three.txt")
+    _sync(model)
+    assert model.query({"op": "du", "path": "a"})["size"] == 103
+    assert model.query({"op": "du", "path": "b"})["size"] == 0
+    assert model.query({"op": "du"})["size"] == 103
+    assert _find(model, ".txt") == ["a/one.txt", "a/three.txt"]
+
+
+def test_directory_rename_and_delete(model, tree):
+    os.rename(tree / "a" / "deep", tree / "b" / "moved")
+    _sync(model)
+    assert model.query({"op": "du"})["children"] == {"a": 100, "b": 23}
+    assert _find(model, "two") == ["b/moved/two.txt"]
+    (tree / "b" / "moved" / "new.txt").write_bytes(b"n" * 7)
+    _sync(model)
+    assert model.query({"op": "du", "path": "b/moved"})["size"] == 27
+    os.remove(tree / "b" / "moved" / "two.txt")
+    os.remove(tree / "b" / "moved" / "new.txt")
+    os.rmdir(tree / "b" / "moved")
+    _sync(model)
+    assert model.query({"op": "du", "path": "b"}) == {"ok": True, "path": str(tree / "b"), "size": 3, "children": {}}
+    with pytest.raises(ValueError):
+        model.query({"op": "du", "path": "b/moved"})
+
+
+def test_daemon_answers_after_rename(model, tree, tmp_path, capsys):
+    socket_path = str(tmp_path / "watch.sock")
+    daemon = subprocess.Popen([sys.executable, MAIN, "watch", "--socket", socket_path, str(tree)],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        assert b"Listening" in daemon.stdout.readline()
+        os.rename(tree / "a", tree / "renamed")
+        my_cli_tool.query_watch(str(tree), {"op": "find", "term": "one"}, socket_path)
+        my_cli_tool.query_watch(str(tree), {"op": "du", "path": str(tree)}, socket_path)
+        out = capsys.readouterr().out
+        assert f"- {tree / 'renamed' / 'one.txt'}" in out
+        assert "120 bytes  renamed/" in out and "a/" not in out
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
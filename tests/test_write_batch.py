@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import my_cli_tool
+
+
+@pytest.fixture
+def syncs(monkeypatch):
+    """Records the fds passed to fsync/fdatasync, as the paths they refer to."""
+    synced = []
+
+    def record(fd):
+        synced.append(os.readlink(f"/proc/self/fd/{fd}"))
+
+    monkeypatch.setattr(os, "fsync", record)
+    monkeypatch.setattr(os, "fdatasync", record, raising=False)
+    return synced
+
+
+def test_fsync_none_never_syncs(tmp_path, syncs):
+    writer = my_cli_tool._GroupCommitWriter("none")
+    writer.append(str(tmp_path / "a"), b"1\n")
+    writer.close()
+    assert syncs == []
+    assert (tmp_path / "a").read_bytes() == b"1\n"
+
+
+def test_fsync_batch_syncs_at_commit(tmp_path, syncs):
+    writer = my_cli_tool._GroupCommitWriter("batch")
+    writer.append(str(tmp_path / "a"), b"1\n")
+    writer.append(str(tmp_path / "b"), b"2\n")
+    assert syncs == []
+    writer.commit()
+    assert sorted(syncs) == sorted([str(tmp_path / "a"), str(tmp_path / "b"), str(tmp_path)])
+    syncs.clear()
+    writer.commit()
+    assert syncs == []
+    writer.close()
+
+
+def test_fsync_each_syncs_every_write(tmp_path, syncs):
+    writer = my_cli_tool._GroupCommitWriter("each")
+    writer.append(str(tmp_path / "a"), b"1\n")
+    assert syncs == [str(tmp_path / "a"), str(tmp_path)]
+    writer.append(str(tmp_path / "a"), b"2\n")
+    assert syncs[2:] == [str(tmp_path / "a")]
+    writer.close()
+
+
+def test_evicted_files_are_synced_at_commit(tmp_path, syncs):
+    writer = my_cli_tool._GroupCommitWriter("batch", max_open=1)
+    writer.append(str(tmp_path / "a"), b"1\n")
+    writer.append(str(tmp_path / "b"), b"2\n")
+    writer.commit()
+    assert sorted(syncs) == sorted([str(tmp_path / "a"), str(tmp_path / "b"), str(tmp_path)])
+    writer.close()
+
+
+def test_path_aliases_share_one_handle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.symlink("a", "link")
+    writer = my_cli_tool._GroupCommitWriter("none")
+    writer.append("a", b"1\n")
+    writer.append("./a", b"2\n")
+    writer.append(str(tmp_path / "a"), b"3\n")
+    writer.append("link", b"4\n")
+    writer.append("./a", b"5\n", truncate=True)
+    writer.append("a", b"6\n")
+    assert len(writer.handles) == 1
+    writer.close()
+    assert (tmp_path / "a").read_bytes() == b"5\n6\n"